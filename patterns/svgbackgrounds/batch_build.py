@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Parallel batch catalog builder.
+
+Fans pattern generation and extraction out across a process pool in chunked
+work units. Output order always matches input order, and a pattern that fails
+to build is reported instead of aborting the run.
+
+Usage:
+    python batch_build.py                         # the svgbackgrounds generators
+    python batch_build.py ../../public/svelte_patterns.json -o out.json
+"""
+
+import argparse
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from catalog_io import format_for_path, write_patterns
+from catalogs import iter_catalog_records
+from create_svg_patterns import PATTERN_CREATORS, build_pattern
+from tracing import disable, enable, get_tracer, span, trace_run
+
+DEFAULT_CHUNK_SIZE = 64
+
+
+def generator_jobs(creators=None):
+    """Return build jobs for registered pattern creators"""
+    creators = PATTERN_CREATORS if creators is None else creators
+    return [(pattern_id, metadata, None) for pattern_id, metadata in creators.items()]
+
+
+def catalog_jobs(path):
+    """Return build jobs that re-extract every pattern in a shipped catalog"""
+    jobs = []
+    for record in iter_catalog_records(path):
+        metadata = {
+            "name": record["name"],
+            "tags": record["tags"],
+            "description": record["description"],
+            "source": record["source"],
+        }
+        if record.get("mode"):
+            metadata["mode"] = record["mode"]
+        jobs.append((record["id"], metadata, record["svg"]))
+    return jobs
+
+
+def run_job(job):
+    """Build one pattern; return (pattern_id, pattern, error)"""
+    pattern_id, metadata, svg_content = job
+    try:
+        if svg_content is None:
+            with span("generate", pattern_id):
+                svg_content = metadata["svg_func"]()
+        return pattern_id, build_pattern(pattern_id, metadata, svg_content), None
+    except Exception as exc:
+        return pattern_id, None, f"{type(exc).__name__}: {exc}"
+
+
+def _run_chunk(chunk, trace=False):
+    """Build every job in a chunk; returns (results, trace events recorded in a worker)"""
+    if not trace:
+        return [run_job(job) for job in chunk], []
+    # A forked worker inherits the parent's tracer, so record into a fresh one
+    tracer = enable()
+    try:
+        return [run_job(job) for job in chunk], tracer.events
+    finally:
+        disable()
+
+
+def _chunked(jobs, size):
+    """Split jobs into lists of at most size items"""
+    jobs = iter(jobs)
+    while True:
+        chunk = list(islice(jobs, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def build_catalog(jobs, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Build all jobs and return (patterns, failures), in job order.
+
+    ``workers=1`` builds in-process; otherwise chunks are spread across a
+    process pool of ``workers`` processes (default: one per CPU).
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunked(jobs, chunk_size)
+    if workers == 1:
+        results = map(_run_chunk, chunks)
+        return _collect(results)
+    run_chunk = functools.partial(_run_chunk, trace=get_tracer().enabled)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map() yields chunk results in submission order
+        return _collect(executor.map(run_chunk, chunks))
+
+
+def _collect(chunk_results):
+    """Flatten chunk results into (patterns, failures), merging worker trace events"""
+    patterns = []
+    failures = []
+    tracer = get_tracer()
+    for results, events in chunk_results:
+        tracer.extend(events)
+        for pattern_id, pattern, error in results:
+            if error is None:
+                patterns.append(pattern)
+            else:
+                failures.append({"id": pattern_id, "error": error})
+    return patterns, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build pattern catalogs in parallel")
+    parser.add_argument("catalogs", nargs="*",
+                        help="catalog files to re-extract (default: the svgbackgrounds generators)")
+    parser.add_argument("-o", "--output", help="write the built patterns to this JSON file")
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--trace", metavar="PATH",
+                        help="record per-pattern stage spans to a Chrome trace JSON file")
+    parser.add_argument("--top", type=int, metavar="N",
+                        help="print stage totals and the N slowest and largest patterns")
+    args = parser.parse_args()
+    trace_run(args.trace, args.top)
+
+    jobs = []
+    for path in args.catalogs:
+        jobs.extend(catalog_jobs(path))
+    if not args.catalogs:
+        jobs = generator_jobs()
+
+    patterns, failures = build_catalog(jobs, args.workers, args.chunk_size)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            write_patterns(patterns, f, format_for_path(args.output))
+
+    print(f"Built {len(patterns)} of {len(jobs)} patterns")
+    for failure in failures:
+        print(f"- FAILED {failure['id']}: {failure['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark batch_build scaling over a seeded synthetic corpus.
+
+Builds the same corpus with 1, 2, 4, ... workers up to the CPU count, checks
+that every run produces identical output, and reports speedup per worker
+count.
+
+Usage: python bench_batch.py [--count 10000] [--chunk-size 64] [--seed 0]
+"""
+
+import argparse
+import os
+import time
+
+from batch_build import DEFAULT_CHUNK_SIZE, build_catalog
+from synthetic_corpus import iter_synthetic
+
+
+def worker_counts(max_workers):
+    """Return 1, 2, 4, ... capped at and including max_workers"""
+    counts = []
+    workers = 1
+    while workers < max_workers:
+        counts.append(workers)
+        workers *= 2
+    counts.append(max_workers)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel catalog builds")
+    parser.add_argument("--count", type=int, default=10_000)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    jobs = list(iter_synthetic(args.count, args.seed))
+    baseline_time = None
+    baseline_ids = None
+
+    print(f"{args.count} synthetic patterns, chunk size {args.chunk_size}")
+    print(f"{'workers':>7} {'seconds':>8} {'patterns/s':>10} {'speedup':>7} {'efficiency':>10}")
+    for workers in worker_counts(args.max_workers):
+        start = time.perf_counter()
+        patterns, failures = build_catalog(jobs, workers, args.chunk_size)
+        elapsed = time.perf_counter() - start
+
+        ids = [pattern["id"] for pattern in patterns]
+        if baseline_ids is None:
+            baseline_time, baseline_ids = elapsed, ids
+        elif ids != baseline_ids:
+            raise SystemExit(f"output order differs with {workers} workers")
+
+        speedup = baseline_time / elapsed
+        print(f"{workers:7} {elapsed:8.2f} {len(patterns) / elapsed:10.0f} "
+              f"{speedup:7.2f} {speedup / workers:10.0%}")
+        if failures:
+            print(f"        {len(failures)} failures, first: {failures[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming extract_svg_data against the old regex scanner
+on the catalogs shipped under public/.
+
+Usage: python bench_extract.py [--repeat N] [--catalog-dir DIR]
+"""
+
+import argparse
+import re
+import time
+import tracemalloc
+
+from catalogs import CATALOG_DIR, catalog_paths, iter_catalog_records
+from create_svg_patterns import extract_svg_data
+
+
+def legacy_extract_svg_data(svg_content):
+    """The previous six-pass regex extractor, kept here as the baseline"""
+    viewbox_match = re.search(r'viewBox="([\d\s]+)"', svg_content)
+    viewbox = viewbox_match.group(1).split() if viewbox_match else [0, 0, 100, 100]
+
+    width_match = re.search(r'width="([\d]+)"', svg_content)
+    height_match = re.search(r'height="([\d]+)"', svg_content)
+
+    width = int(width_match.group(1)) if width_match else 100
+    height = int(height_match.group(1)) if height_match else 100
+
+    paths = re.findall(r'<path[^>]*d="([^"]*)"[^>]*>', svg_content)
+    rects = re.findall(r'<rect[^>]*>', svg_content)
+    circles = re.findall(r'<circle[^>]*>', svg_content)
+    polygons = re.findall(r'<polygon[^>]*points="([^"]*)"[^>]*>', svg_content)
+
+    svg_elements = []
+    for path in paths:
+        svg_elements.append(f"M{path}")
+    svg_elements.extend(rects)
+    svg_elements.extend(circles)
+    svg_elements.extend(polygons)
+
+    return {
+        'width': width,
+        'height': height,
+        'viewBoxHeight': int(viewbox[3]) if len(viewbox) > 3 else height,
+        'svgElements': svg_elements
+    }
+
+
+def time_extractor(extractor, documents, repeat):
+    """Return (best seconds, element count, failures, peak bytes) for one extractor"""
+    best = None
+    count = failures = 0
+    for _ in range(repeat):
+        count = failures = 0
+        start = time.perf_counter()
+        for svg in documents:
+            try:
+                count += len(extractor(svg)["svgElements"])
+            except Exception:
+                failures += 1
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    for svg in documents:
+        try:
+            extractor(svg)
+        except Exception:
+            pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, count, failures, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--catalog-dir", default=CATALOG_DIR)
+    args = parser.parse_args()
+
+    header = f"{'catalog':32} {'docs':>5} {'extractor':>9} {'ms':>9} {'elements':>9} {'failed':>6} {'peak KB':>8}"
+    print(header)
+    print("-" * len(header))
+    for path in catalog_paths(args.catalog_dir):
+        documents = [record["svg"] for record in iter_catalog_records(path)]
+        name = path.rsplit("/", 1)[-1]
+        for label, extractor in (("regex", legacy_extract_svg_data),
+                                 ("stream", extract_svg_data)):
+            seconds, count, failures, peak = time_extractor(extractor, documents, args.repeat)
+            print(f"{name:32} {len(documents):5} {label:>9} {seconds * 1000:9.2f} "
+                  f"{count:9} {failures:6} {peak // 1024:8}")
+
+
+if __name__ == "__main__":
+    main()
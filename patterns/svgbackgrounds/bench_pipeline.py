@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Per-stage benchmark of the catalog build pipeline.
+
+Runs a corpus through the four stages of create_svg_patterns separately:
+
+* ``generate``  - produce the SVG document
+* ``extract``   - extract_svg_data
+* ``assemble``  - assemble_pattern (metadata and record assembly)
+* ``serialize`` - write_json_stream into a byte-counting sink
+
+The corpus is processed in batches, stage by stage, so a 1M-pattern run
+never holds more than one batch. The timed pass is repeated and each stage
+reports its median wall time plus the largest growth of current RSS over
+one batch (read from /proc/self/statm where available). A separate
+tracemalloc pass over a sample of the corpus records peak and retained
+allocation bytes and block counts (tracing is kept out of the timed pass so
+it does not distort wall times).
+
+Results go to a JSON file; ``--baseline`` compares the median time per
+pattern and the allocation peak of every stage against a stored run and
+exits non-zero on regressions.
+
+Usage:
+    python bench_pipeline.py --size small -o bench_small.json
+    python bench_pipeline.py --size medium --baseline bench_medium.json
+    python bench_pipeline.py --corpus catalogs
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from catalog_io import write_json_stream
+from catalogs import default_catalog_paths, load_catalog, normalize_entry
+from create_svg_patterns import PATTERN_CREATORS, assemble_pattern, extract_svg_data
+from synthetic_corpus import synthetic_metadata, synthetic_svg
+
+SIZES = {"small": 100, "medium": 10_000, "large": 1_000_000}
+STAGES = ("generate", "extract", "assemble", "serialize")
+DEFAULT_BATCH = 1000
+DEFAULT_ALLOC_SAMPLE = 1000
+DEFAULT_TOLERANCE = 0.10
+DEFAULT_REPEATS = 5
+
+
+class _CountingSink:
+    """File-like object that only counts what is written to it"""
+
+    def __init__(self):
+        self.bytes = 0
+
+    def write(self, text):
+        self.bytes += len(text)
+
+    def flush(self):
+        pass
+
+
+# Corpora: each yields (pattern_id, metadata, make_svg) where make_svg()
+# performs the corpus's generation step
+
+def synthetic_corpus(count, seed=0):
+    for index in range(count):
+        yield (f"synthetic-{index}", synthetic_metadata(seed, index),
+               lambda index=index: synthetic_svg(seed, index))
+
+
+def generator_corpus(count, seed=0):
+    creators = itertools.cycle(PATTERN_CREATORS.items())
+    for index, (pattern_id, metadata) in zip(range(count), creators):
+        yield f"{pattern_id}-{index}", metadata, metadata["svg_func"]
+
+
+def catalog_corpus(count=None, seed=0):
+    """The shipped catalogs; generation is normalizing an entry to an SVG document"""
+    def entries():
+        for path in default_catalog_paths():
+            source, raw_entries = load_catalog(path)
+            for index, entry in enumerate(raw_entries):
+                yield source, index, entry
+
+    for source, index, entry in itertools.islice(entries(), count):
+        metadata = {"name": entry.get("name", f"pattern-{index}"), "tags": entry.get("tags", []),
+                    "description": entry.get("description", ""), "source": entry.get("source", source)}
+        yield (str(entry.get("id", index)), metadata,
+               lambda entry=entry, source=source, index=index: normalize_entry(entry, source, index)["svg"])
+
+
+CORPORA = {"synthetic": synthetic_corpus, "generators": generator_corpus, "catalogs": catalog_corpus}
+
+
+# Stages
+
+def run_batch(batch, timings, rss_growth, sink):
+    """Run one batch through every stage, accumulating time and the largest RSS growth"""
+
+    def timed(stage, fn):
+        rss_before = _current_rss_kb()
+        start = time.perf_counter()
+        result = fn()
+        timings[stage] += time.perf_counter() - start
+        if rss_before is not None:
+            rss_growth[stage] = max(rss_growth[stage], _current_rss_kb() - rss_before)
+        return result
+
+    svgs = timed("generate", lambda: [make_svg() for _, _, make_svg in batch])
+    extracted = timed("extract", lambda: [extract_svg_data(svg) for svg in svgs])
+    records = timed("assemble", lambda: [
+        assemble_pattern(pattern_id, metadata, svg, data)
+        for (pattern_id, metadata, _), svg, data in zip(batch, svgs, extracted)
+    ])
+    timed("serialize", lambda: write_json_stream(records, sink))
+
+
+def measure_allocations(sample):
+    """Return per-stage tracemalloc stats for a list of corpus entries"""
+    stats = {}
+    tracemalloc.start()
+    try:
+        state = {}
+        steps = {
+            "generate": lambda: state.update(svgs=[make_svg() for _, _, make_svg in sample]),
+            "extract": lambda: state.update(data=[extract_svg_data(svg) for svg in state["svgs"]]),
+            "assemble": lambda: state.update(records=[
+                assemble_pattern(pattern_id, metadata, svg, data)
+                for (pattern_id, metadata, _), svg, data in zip(sample, state["svgs"], state["data"])
+            ]),
+            "serialize": lambda: write_json_stream(state["records"], _CountingSink()),
+        }
+        for stage in STAGES:
+            before = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            steps[stage]()
+            current, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename")
+                         if stat.count_diff > 0)
+            stats[stage] = {
+                "alloc_peak_bytes": peak - base,
+                "alloc_retained_bytes": current - base,
+                "alloc_new_blocks": blocks,
+            }
+    finally:
+        tracemalloc.stop()
+    return stats
+
+
+def _current_rss_kb():
+    """Current resident set size of this process in KiB, or None where it cannot be read"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def _peak_rss_kb():
+    """Peak resident set size of this process in KiB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and KiB on Linux
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def timed_pass(corpus, count, seed=0, batch_size=DEFAULT_BATCH):
+    """Run the corpus through every stage once; returns (timings, rss growth, patterns, seconds, bytes)"""
+    timings = dict.fromkeys(STAGES, 0.0)
+    rss_growth = dict.fromkeys(STAGES, 0)
+    sink = _CountingSink()
+    processed = 0
+    entries = CORPORA[corpus](count, seed)
+    start = time.perf_counter()
+    while True:
+        batch = list(itertools.islice(entries, batch_size))
+        if not batch:
+            break
+        run_batch(batch, timings, rss_growth, sink)
+        processed += len(batch)
+    return timings, rss_growth, processed, time.perf_counter() - start, sink.bytes
+
+
+def run_benchmark(corpus, count, seed=0, batch_size=DEFAULT_BATCH, alloc_sample=DEFAULT_ALLOC_SAMPLE,
+                  repeats=DEFAULT_REPEATS):
+    """Benchmark every stage over a corpus; returns the results dict"""
+    runs = [timed_pass(corpus, count, seed, batch_size) for _ in range(max(1, repeats))]
+    processed, output_bytes = runs[0][2], runs[0][4]
+    total = statistics.median(run[3] for run in runs)
+
+    sample = list(CORPORA[corpus](min(processed, alloc_sample), seed)) if alloc_sample else []
+    allocations = measure_allocations(sample) if sample else {}
+
+    stages = {}
+    for stage in STAGES:
+        walls = [run[0][stage] for run in runs]
+        wall = statistics.median(walls)
+        stages[stage] = {
+            "wall_s": round(wall, 6),
+            "us_per_pattern": round(wall / max(processed, 1) * 1e6, 3),
+            "us_per_pattern_runs": [round(w / max(processed, 1) * 1e6, 3) for w in walls],
+            "rss_growth_kb": max(run[1][stage] for run in runs),
+            **allocations.get(stage, {}),
+        }
+    return {
+        "meta": {
+            "corpus": corpus,
+            "patterns": processed,
+            "seed": seed,
+            "batch_size": batch_size,
+            "repeats": len(runs),
+            "alloc_sample": len(sample),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now().isoformat(),
+        },
+        "stages": stages,
+        "total_wall_s": round(total, 6),
+        "peak_rss_kb": _peak_rss_kb(),
+        "output_bytes": output_bytes,
+    }
+
+
+COMPARED = (("us_per_pattern", "us"), ("alloc_peak_bytes", "B"))
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Return [(stage, unit, baseline, current, ratio, regressed)] per stage and compared metric"""
+    rows = []
+    for stage in STAGES:
+        for metric, unit in COMPARED:
+            old = baseline["stages"].get(stage, {}).get(metric)
+            new = results["stages"][stage].get(metric)
+            if not old or new is None:
+                continue
+            ratio = new / old
+            rows.append((stage, unit, old, new, ratio, ratio > 1 + tolerance))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark catalog build stages")
+    parser.add_argument("--corpus", choices=sorted(CORPORA), default="synthetic")
+    parser.add_argument("--size", choices=sorted(SIZES, key=SIZES.get), default="small",
+                        help="synthetic corpus size: small=100, medium=10k, large=1M")
+    parser.add_argument("--count", type=int, help="explicit pattern count (overrides --size)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH)
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS,
+                        help="timed passes; stage times are the median")
+    parser.add_argument("--alloc-sample", type=int, default=DEFAULT_ALLOC_SAMPLE,
+                        help="patterns traced for allocation stats (0 disables)")
+    parser.add_argument("-o", "--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="compare against a stored results JSON")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown per stage before it counts as a regression")
+    args = parser.parse_args()
+
+    count = args.count if args.count is not None else SIZES[args.size]
+    if args.corpus == "catalogs" and args.count is None:
+        count = None
+    results = run_benchmark(args.corpus, count, args.seed, args.batch_size, args.alloc_sample,
+                            args.repeats)
+
+    meta = results["meta"]
+    print(f"{meta['patterns']} {meta['corpus']} patterns in {results['total_wall_s']:.2f}s "
+          f"(median of {meta['repeats']}), peak RSS {results['peak_rss_kb'] / 1024:.1f} MiB, "
+          f"{results['output_bytes']} bytes out")
+    print(f"{'stage':>9} {'seconds':>9} {'us/pattern':>11} {'rss +KiB':>9} {'alloc peak KiB':>14}")
+    for stage, row in results["stages"].items():
+        peak = row.get("alloc_peak_bytes")
+        print(f"{stage:>9} {row['wall_s']:9.3f} {row['us_per_pattern']:11.1f} "
+              f"{row['rss_growth_kb']:9} {peak / 1024 if peak is not None else float('nan'):14.1f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline, args.tolerance)
+        print(f"\nvs {args.baseline} (tolerance {args.tolerance:.0%})")
+        old_meta = baseline.get("meta", {})
+        if (old_meta.get("corpus"), old_meta.get("patterns")) != (meta["corpus"], meta["patterns"]):
+            print(f"warning: baseline ran {old_meta.get('patterns')} {old_meta.get('corpus')} patterns")
+        for stage, unit, old, new, ratio, regressed in rows:
+            print(f"{stage:>9} {old:11.1f} -> {new:11.1f} {unit:<2}  {ratio:6.2f}x"
+                  f"{'  REGRESSION' if regressed else ''}")
+        if any(row[5] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Load test for serve.py.
+
+Starts the server in a child process pinned to one CPU, then drives it from
+this process with keep-alive connections issuing a seeded mix of listing,
+fetch-by-id, tag-filter and render requests (gzip accepted, like a
+browser). Reports requests per second and p50/p99 latency, overall and per
+endpoint.
+
+Renders draw from the whole catalog and are reported twice: "render" reuses
+a fixed set of canvases that is fully primed before timing (cache hits), and
+"cold" asks for a canvas size never requested before, so every one composes.
+
+Usage: python bench_serve.py [--seconds 10] [--connections 32] [--cpu 0]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from urllib.parse import quote
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MIX = (("list", 30), ("fetch", 45), ("tag", 15), ("render", 5), ("cold", 5))
+RENDER_SIZES = ((1920, 1080), (3508, 2480), (800, 600))
+
+
+def percentile(values, fraction):
+    """Return the value at a fraction (0..1) of the sorted values"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def request(reader, writer, host, path):
+    """Send one GET and read the full response; returns (status, body length)"""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept-Encoding: gzip\r\n\r\n".encode())
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ")[1])
+    length = 0
+    for line in lines[1:]:
+        if line.lower().startswith("content-length:"):
+            length = int(line.split(":", 1)[1])
+    if length:
+        await reader.readexactly(length)
+    return status, length
+
+
+async def fetch_json(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+    data = await reader.read()
+    writer.close()
+    return json.loads(data.split(b"\r\n\r\n", 1)[1])
+
+
+def build_paths(ids, tags, count, seed):
+    """Return (kind, path) requests drawn from the endpoint mix.
+
+    Cold render paths carry a {n} placeholder for the canvas width, filled in
+    per request so no two are the same.
+    """
+    rng = random.Random(seed)
+    kinds = [kind for kind, weight in MIX for _ in range(weight)]
+    paths = []
+    for _ in range(count):
+        kind = rng.choice(kinds)
+        if kind == "list":
+            path = f"/patterns?page={rng.randint(1, 5)}"
+        elif kind == "fetch":
+            path = f"/patterns/{quote(rng.choice(ids))}"
+        elif kind == "tag":
+            path = f"/patterns?tag={quote(rng.choice(tags))}"
+        elif kind == "render":
+            width, height = rng.choice(RENDER_SIZES)
+            path = f"/patterns/{quote(rng.choice(ids))}/render?width={width}&height={height}"
+        else:
+            path = f"/patterns/{quote(rng.choice(ids))}/render?width={{n}}&height=1080"
+        paths.append((kind, path))
+    return paths
+
+
+async def run_load(host, port, paths, connections, seconds):
+    """Drive the server; returns [(kind, status, latency)]"""
+    results = []
+    deadline = time.perf_counter() + seconds
+    cold = itertools.count()
+
+    async def worker(offset):
+        reader, writer = await asyncio.open_connection(host, port)
+        i = offset
+        while time.perf_counter() < deadline:
+            kind, path = paths[i % len(paths)]
+            if kind == "cold":
+                path = path.format(n=f"{1000 + next(cold) / 1000:g}")
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, host, path)
+            results.append((kind, status, time.perf_counter() - start))
+            i += connections
+        writer.close()
+
+    await asyncio.gather(*(worker(c) for c in range(connections)))
+    return results
+
+
+async def prime(host, port, paths, connections):
+    """Request every path once, spread over the connections"""
+    async def worker(chunk):
+        reader, writer = await asyncio.open_connection(host, port)
+        for path in chunk:
+            await request(reader, writer, host, path)
+        writer.close()
+
+    await asyncio.gather(*(worker(paths[c::connections]) for c in range(connections)))
+
+
+async def bench(args, port):
+    ids, page = [], 1
+    while True:
+        listing = await fetch_json(args.host, port, f"/patterns?per_page=500&page={page}")
+        ids += [summary["id"] for summary in listing["patterns"]]
+        if page >= listing["pages"]:
+            break
+        page += 1
+    tags = sorted(await fetch_json(args.host, port, "/tags"))
+    paths = build_paths(ids, tags, 10_000, args.seed)
+
+    # Warm up so filtered pages are built and every warm render is cached before timing
+    await run_load(args.host, port, [p for p in paths if p[0] != "cold"], args.connections, args.warmup)
+    await prime(args.host, port, sorted({path for kind, path in paths if kind == "render"}),
+                args.connections)
+    start = time.perf_counter()
+    results = await run_load(args.host, port, paths, args.connections, args.seconds)
+    elapsed = time.perf_counter() - start
+
+    errors = sum(1 for _, status, _ in results if status != 200)
+    print(f"{len(results)} requests in {elapsed:.1f}s over {args.connections} connections, "
+          f"{errors} non-200")
+    print(f"{'endpoint':>8} {'requests':>9} {'req/s':>8} {'p50 ms':>7} {'p99 ms':>7}")
+    groups = [("all", [r[2] for r in results])]
+    groups += [(kind, [r[2] for r in results if r[0] == kind]) for kind, _ in MIX]
+    for kind, latencies in groups:
+        if latencies:
+            print(f"{kind:>8} {len(latencies):9} {len(latencies) / elapsed:8.0f} "
+                  f"{percentile(latencies, 0.5) * 1e3:7.2f} {percentile(latencies, 0.99) * 1e3:7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the pattern server")
+    parser.add_argument("catalogs", nargs="*", help="catalog files to serve (default: serve.py's)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--cpu", type=int, default=0, help="CPU the server is pinned to")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = subprocess.Popen([sys.executable, os.path.join(HERE, "serve.py"), *args.catalogs,
+                               "--host", args.host, "--port", "0"],
+                              stdout=subprocess.PIPE, text=True, cwd=HERE)
+    try:
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(server.pid, {args.cpu})
+            # Keep the load generator off the server's core when there is another one
+            others = os.sched_getaffinity(0) - {args.cpu}
+            if others:
+                os.sched_setaffinity(0, others)
+            else:
+                print("only one CPU available: the load generator shares the server's core")
+        line = server.stdout.readline()
+        print(line.strip())
+        port = int(line.rsplit(":", 1)[1])
+        asyncio.run(bench(args, port))
+    finally:
+        # serve.py shuts its render workers down on SIGTERM
+        server.terminate()
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+"""
+Compact, memory-mappable binary pattern store.
+
+Layout (little-endian, every section 4-byte aligned):
+
+    file header      magic, version, counts and section offsets
+    pattern headers  fixed 24-byte records: id, metadata and element ranges
+    element table    fixed 16-byte records: template range, coordinate byte
+                     offset and coordinate count
+    id hash table    open-addressed u32 slots mapping an id hash to a pattern
+    coordinates      geometry numbers as zigzag varints of their decimal
+                     mantissas (1.25 is stored as 125)
+    templates        the command buffer: element markup with every geometry
+                     number replaced by a placeholder byte that records how
+                     many decimals it had and whether it dropped its leading
+                     zero
+    strings          UTF-8 ids, metadata JSON and raw (unencodable) markup
+
+Reading a pattern by id hashes the id, probes the hash table and decodes only
+that pattern's elements, so lookups are O(1) regardless of catalog size.
+
+Every element is verified to decode back to its original text when it is
+packed; anything the number encoding cannot reproduce exactly (-0, more than
+MAX_DECIMALS decimals) is stored raw instead, so unpacking always returns
+the original JSON. On the bundled catalogs a store is about 80% of the size
+of its JSON file (pattern_monster: 780 KB against 985 KB) with no raw
+elements; very small catalogs can come out slightly larger because of the
+fixed header and hash table.
+
+Usage:
+    python binary_store.py pack ../../public/svelte_patterns.json svelte.svgpb
+    python binary_store.py unpack svelte.svgpb svelte.json
+    python binary_store.py get svelte.svgpb 42
+    python binary_store.py verify ../../public/svelte_patterns.json
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+
+from catalogs import normalize_entry
+
+MAGIC = b"SVPB"
+VERSION = 2
+
+FILE_HEADER = struct.Struct("<4sHHIII" + "I" * 11)
+PATTERN_HEADER = struct.Struct("<6I")
+ELEMENT = struct.Struct("<4I")
+RAW_ELEMENT = 0xFFFFFFFF
+EMPTY_SLOT = 0xFFFFFFFF
+
+# Placeholders in templates, one per way of writing a number: control
+# characters other than tab, newline and carriage return. Placeholder i
+# stands for a number with i // 2 decimals, written without its leading
+# zero ("-.5") when i is odd.
+PLACEHOLDERS = "".join(chr(c) for c in range(32) if chr(c) not in "\t\n\r")
+MAX_DECIMALS = len(PLACEHOLDERS) // 2 - 1
+_PLACEHOLDER_INDEX = {char: index for index, char in enumerate(PLACEHOLDERS)}
+
+# Fields that may hold a pattern's geometry, in order of preference
+GEOMETRY_FIELDS = ("svgPath", "image")
+
+# Attributes whose numbers are packed as coordinates
+NUMERIC_ATTRS = {
+    "d", "points", "x", "y", "width", "height", "cx", "cy", "r", "rx", "ry",
+    "x1", "y1", "x2", "y2", "viewBox", "stroke-width",
+}
+
+_ATTR_RE = re.compile(r"""([\w:-]+)=(["'])(.*?)\2""", re.S)
+# A 0 directly followed by a digit is a number of its own: compact arc flags ("00-.29")
+_NUMBER_RE = re.compile(r"-?(?:0(?=\d)|\d+(?:\.\d+)?|\.\d+)")
+_PLACEHOLDER_RE = re.compile("[" + re.escape(PLACEHOLDERS) + "]")
+
+
+def number_format(text):
+    """Split number text into (mantissa, placeholder) or None if it has no canonical form"""
+    digits = text.lstrip("-")
+    integer, _, fraction = digits.partition(".")
+    decimals = len(fraction)
+    no_leading_zero = not integer
+    if decimals > MAX_DECIMALS or (len(integer) > 1 and integer[0] == "0"):
+        return None
+    mantissa = int((integer or "0") + fraction)
+    if text.startswith("-"):
+        if mantissa == 0:
+            return None  # -0 cannot be told apart from 0
+        mantissa = -mantissa
+    placeholder = PLACEHOLDERS[2 * decimals + no_leading_zero]
+    return mantissa, placeholder
+
+
+def format_number(mantissa, placeholder):
+    """Write a mantissa back the way its placeholder says it was written"""
+    index = _PLACEHOLDER_INDEX[placeholder]
+    decimals = index // 2
+    text = str(abs(mantissa)).rjust(decimals + 1, "0")
+    if decimals:
+        text = text[:-decimals] + "." + text[-decimals:]
+        if index % 2:
+            text = text[1:]
+    return "-" + text if mantissa < 0 else text
+
+
+def write_varint(buf, value):
+    """Append a signed integer to buf as a zigzag LEB128 varint"""
+    value = value * 2 if value >= 0 else -value * 2 - 1
+    while value >= 0x80:
+        buf.append(value & 0x7F | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def read_varints(data, offset, count):
+    """Decode count zigzag varints from data starting at offset"""
+    values = []
+    for _ in range(count):
+        value = shift = 0
+        while True:
+            byte = data[offset]
+            offset += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        values.append(value >> 1 if not value & 1 else -(value >> 1) - 1)
+    return values
+
+
+def _fnv1a(data):
+    """32-bit FNV-1a hash"""
+    h = 0x811C9DC5
+    for byte in data:
+        h = ((h ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return h
+
+
+def _align(buf):
+    """Pad a bytearray to a multiple of four bytes"""
+    buf.extend(b"\0" * (-len(buf) % 4))
+
+
+# Encoding
+
+def encode_markup(markup):
+    """Split markup into (template, mantissas), or None if not exactly reproducible"""
+    if _PLACEHOLDER_RE.search(markup):
+        return None
+    template = []
+    mantissas = []
+    pos = 0
+    for attr in _ATTR_RE.finditer(markup):
+        if attr.group(1) not in NUMERIC_ATTRS:
+            continue
+        start, end = attr.span(3)
+        template.append(markup[pos:start])
+        value_pos = start
+        for number in _NUMBER_RE.finditer(markup, start, end):
+            encoded = number_format(number.group(0))
+            if encoded is None:
+                return None
+            template.append(markup[value_pos:number.start()])
+            template.append(encoded[1])
+            mantissas.append(encoded[0])
+            value_pos = number.end()
+        template.append(markup[value_pos:end])
+        pos = end
+    template.append(markup[pos:])
+    template = "".join(template)
+    if decode_markup(template, mantissas) != markup:
+        return None
+    return template, mantissas
+
+
+def decode_markup(template, mantissas):
+    """Rebuild markup from a template and its number mantissas"""
+    values = iter(mantissas)
+    return _PLACEHOLDER_RE.sub(lambda m: format_number(next(values), m.group(0)), template)
+
+
+def _geometry(record):
+    """Return (field, kind, element strings) for a record's geometry"""
+    for field in GEOMETRY_FIELDS:
+        if field in record:
+            value = record[field]
+            if isinstance(value, list):
+                return field, "list", value
+            return field, "str", [value]
+    return None, None, []
+
+
+def pack(patterns, catalog_metadata=None):
+    """Pack pattern records into the binary store format; returns bytes.
+
+    ``catalog_metadata`` is the wrapper object of {"metadata", "patterns"}
+    catalogs (with "patterns" set to None), or None for bare lists.
+    """
+    strings = bytearray()
+    templates = bytearray()
+    coords = bytearray()
+    elements = []
+    headers = []
+    ids = []
+    template_offsets = {}
+
+    def add_string(data):
+        offset = len(strings)
+        strings.extend(data)
+        return offset, len(data)
+
+    for index, record in enumerate(patterns):
+        pattern_id = normalize_entry(record, "", index)["id"].encode("utf-8")
+        field, kind, markups = _geometry(record)
+        meta = dict(record)
+        if field:
+            meta[field] = None
+        meta_json = json.dumps({"record": meta, "geometry": [field, kind]},
+                               separators=(",", ":")).encode("utf-8")
+
+        id_off, id_len = add_string(pattern_id)
+        meta_off, meta_len = add_string(meta_json)
+        elem_start = len(elements)
+        for markup in markups:
+            encoded = encode_markup(markup)
+            if encoded is None:
+                raw_off, raw_len = add_string(markup.encode("utf-8"))
+                elements.append((raw_off, raw_len, RAW_ELEMENT, 0))
+                continue
+            template, values = encoded
+            data = template.encode("utf-8")
+            # Identical templates (e.g. repeated circles) are stored once
+            if data not in template_offsets:
+                template_offsets[data] = len(templates)
+                templates.extend(data)
+            elements.append((template_offsets[data], len(data), len(coords), len(values)))
+            for value in values:
+                write_varint(coords, value)
+        headers.append((id_off, id_len, meta_off, meta_len, elem_start, len(elements) - elem_start))
+        ids.append(pattern_id)
+
+    slots = 1
+    while slots < 2 * max(1, len(ids)):
+        slots *= 2
+    table = [EMPTY_SLOT] * slots
+    for index, pattern_id in enumerate(ids):
+        slot = _fnv1a(pattern_id) & (slots - 1)
+        while table[slot] != EMPTY_SLOT:
+            slot = (slot + 1) & (slots - 1)
+        table[slot] = index
+
+    catalog_off, catalog_len = add_string(
+        json.dumps(catalog_metadata, separators=(",", ":")).encode("utf-8"))
+
+    body = bytearray()
+    offsets = {}
+    base = FILE_HEADER.size
+    for name, data in (
+        ("headers", b"".join(PATTERN_HEADER.pack(*h) for h in headers)),
+        ("elements", b"".join(ELEMENT.pack(*e) for e in elements)),
+        ("hash", struct.pack(f"<{slots}I", *table)),
+        ("coords", bytes(coords)),
+        ("templates", bytes(templates)),
+        ("strings", bytes(strings)),
+    ):
+        offsets[name] = base + len(body)
+        body.extend(data)
+        _align(body)
+
+    header = FILE_HEADER.pack(
+        MAGIC, VERSION, 0, len(headers), len(elements), slots,
+        offsets["headers"], offsets["elements"], offsets["hash"], offsets["coords"],
+        len(coords), offsets["templates"], len(templates), offsets["strings"], len(strings),
+        catalog_off if catalog_metadata is not None else EMPTY_SLOT, catalog_len,
+    )
+    return header + bytes(body)
+
+
+# Decoding
+
+class BinaryCatalog:
+    """Read-only view of a packed catalog, usually over an mmap"""
+
+    def __init__(self, data):
+        self.data = memoryview(data)
+        (magic, version, _flags, self.count, self.element_count, self.slots,
+         self.headers_off, self.elements_off, self.hash_off, self.coords_off,
+         coord_count, self.templates_off, templates_len, self.strings_off,
+         strings_len, self.catalog_off, self.catalog_len) = FILE_HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a pattern store (bad magic or version)")
+        self.coords = self.data[self.coords_off:self.coords_off + coord_count]
+        self.templates = self.data[self.templates_off:self.templates_off + templates_len]
+        self.strings = self.data[self.strings_off:self.strings_off + strings_len]
+        self._file = None
+        self._mmap = None
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map a packed catalog file"""
+        f = open(path, "rb")
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        catalog = cls(mapped)
+        catalog._file, catalog._mmap = f, mapped
+        return catalog
+
+    def close(self):
+        """Release the mapping"""
+        self.coords.release()
+        self.templates.release()
+        self.strings.release()
+        self.data.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def _header(self, index):
+        return PATTERN_HEADER.unpack_from(self.data, self.headers_off + index * PATTERN_HEADER.size)
+
+    def _string(self, offset, length):
+        return bytes(self.strings[offset:offset + length]).decode("utf-8")
+
+    def pattern_id(self, index):
+        """Return the id of the pattern at index"""
+        id_off, id_len = self._header(index)[:2]
+        return self._string(id_off, id_len)
+
+    def ids(self):
+        """Return every pattern id in catalog order"""
+        return [self.pattern_id(i) for i in range(self.count)]
+
+    def find(self, pattern_id):
+        """Return the index of pattern_id, or None"""
+        key = pattern_id.encode("utf-8")
+        mask = self.slots - 1
+        slot = _fnv1a(key) & mask
+        while True:
+            index = struct.unpack_from("<I", self.data, self.hash_off + 4 * slot)[0]
+            if index == EMPTY_SLOT:
+                return None
+            id_off, id_len = self._header(index)[:2]
+            if self.strings[id_off:id_off + id_len] == key:
+                return index
+            slot = (slot + 1) & mask
+
+    def elements(self, index):
+        """Return the decoded markup strings of the pattern at index"""
+        elem_start, elem_count = self._header(index)[4:]
+        markups = []
+        for e in range(elem_start, elem_start + elem_count):
+            offset, length, coord_start, coord_count = ELEMENT.unpack_from(
+                self.data, self.elements_off + e * ELEMENT.size)
+            if coord_start == RAW_ELEMENT:
+                markups.append(self._string(offset, length))
+                continue
+            template = bytes(self.templates[offset:offset + length]).decode("utf-8")
+            markups.append(decode_markup(template, read_varints(self.coords, coord_start, coord_count)))
+        return markups
+
+    def record(self, index):
+        """Return the pattern at index in its original JSON shape"""
+        meta_off, meta_len = self._header(index)[2:4]
+        meta = json.loads(self._string(meta_off, meta_len))
+        record = meta["record"]
+        field, kind = meta["geometry"]
+        if field:
+            markups = self.elements(index)
+            record[field] = markups if kind == "list" else markups[0]
+        return record
+
+    def get(self, pattern_id):
+        """Return the pattern with this id, or None"""
+        index = self.find(pattern_id)
+        return None if index is None else self.record(index)
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self.record(index)
+
+    def to_json_data(self):
+        """Return the whole catalog in its original JSON shape"""
+        patterns = list(self)
+        if self.catalog_off == EMPTY_SLOT:
+            return patterns
+        wrapper = json.loads(self._string(self.catalog_off, self.catalog_len))
+        wrapper["patterns"] = patterns
+        return wrapper
+
+
+def pack_catalog(path):
+    """Pack a JSON catalog file; returns bytes"""
+    with open(path) as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        return pack(data.get("patterns", []), {**data, "patterns": None})
+    return pack(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack and read binary pattern stores")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    p = subparsers.add_parser("pack", help="pack a JSON catalog")
+    p.add_argument("input")
+    p.add_argument("output")
+    p = subparsers.add_parser("unpack", help="unpack to the original JSON shape")
+    p.add_argument("input")
+    p.add_argument("output")
+    p = subparsers.add_parser("get", help="print one pattern by id")
+    p.add_argument("input")
+    p.add_argument("pattern_id")
+    p = subparsers.add_parser("verify", help="check a JSON catalog round-trips losslessly")
+    p.add_argument("inputs", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        data = pack_catalog(args.input)
+        with open(args.output, "wb") as f:
+            f.write(data)
+        print(f"Packed {args.input} into {args.output} ({len(data)} bytes)")
+    elif args.command == "unpack":
+        with BinaryCatalog.open(args.input) as catalog, open(args.output, "w") as f:
+            json.dump(catalog.to_json_data(), f, indent=2)
+    elif args.command == "get":
+        with BinaryCatalog.open(args.input) as catalog:
+            record = catalog.get(args.pattern_id)
+        if record is None:
+            sys.exit(f"no pattern with id {args.pattern_id!r}")
+        print(json.dumps(record, indent=2))
+    else:
+        failed = False
+        for path in args.inputs:
+            with open(path) as f:
+                original = json.load(f)
+            data = pack_catalog(path)
+            catalog = BinaryCatalog(data)
+            ok = catalog.to_json_data() == original
+            raw = sum(
+                1 for e in range(catalog.element_count)
+                if ELEMENT.unpack_from(catalog.data, catalog.elements_off + e * ELEMENT.size)[2] == RAW_ELEMENT
+            )
+            catalog.close()
+            failed = failed or not ok
+            print(f"{path}: {'ok' if ok else 'MISMATCH'}, {len(data)} bytes "
+                  f"(JSON {os.path.getsize(path)}), "
+                  f"{raw} of {catalog.element_count} elements stored raw")
+        sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Content-addressed incremental build cache for the svgbackgrounds catalog.
+
+Each pattern record is cached under a hash of its generator's SVG output,
+its metadata and the extractor version. Unchanged patterns are served from
+the cache with their original record (including the ``created`` stamp), so
+rebuilding an unchanged catalog produces byte-identical output.
+
+A manifest remembers the keys, catalog format and output hash of the last
+write, which lets a no-op rebuild return without parsing or writing
+anything.
+"""
+
+import hashlib
+import io
+import json
+import os
+
+from catalog_io import write_patterns
+from svg_stream import EXTRACTOR_VERSION
+from tracing import span
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+MANIFEST_NAME = "manifest.json"
+
+
+def _hash(data):
+    """Return the sha256 hex digest of bytes or text"""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def pattern_key(pattern_id, metadata, svg_content):
+    """Return the cache key for one pattern build"""
+    # svg_func is not part of the output; everything else in metadata is
+    meta = {k: v for k, v in metadata.items() if k != "svg_func"}
+    payload = json.dumps([EXTRACTOR_VERSION, pattern_id, meta], sort_keys=True)
+    return _hash(payload + "\0" + svg_content)
+
+
+def _entry_path(cache_dir, key):
+    """Return the cache file path for a key"""
+    return os.path.join(cache_dir, key[:2], key + ".json")
+
+
+def load_cached(cache_dir, key):
+    """Return the cached record for key, or None"""
+    try:
+        with open(_entry_path(cache_dir, key)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def store_cached(cache_dir, key, record):
+    """Store a record under key"""
+    path = _entry_path(cache_dir, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(record, f)
+    os.replace(tmp_path, path)
+
+
+def load_manifest(cache_dir):
+    """Return the manifest from the last write, or an empty one"""
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(cache_dir, manifest):
+    """Persist the manifest"""
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(os.path.join(cache_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def generate_keys(creators):
+    """Run every generator and return [(pattern_id, metadata, svg_content, key)]"""
+    builds = []
+    for pattern_id, metadata in creators.items():
+        with span("generate", pattern_id):
+            svg_content = metadata["svg_func"]()
+        builds.append((pattern_id, metadata, svg_content,
+                       pattern_key(pattern_id, metadata, svg_content)))
+    return builds
+
+
+def file_hash(path):
+    """Return the sha256 of a file's contents, or None if it does not exist"""
+    try:
+        with open(path, 'rb') as f:
+            return _hash(f.read())
+    except OSError:
+        return None
+
+
+def is_up_to_date(builds, output_file, cache_dir=DEFAULT_CACHE_DIR, fmt="json"):
+    """Return True if output_file already holds the catalog for these builds in fmt"""
+    manifest = load_manifest(cache_dir)
+    entry = manifest.get(os.path.abspath(output_file))
+    if not entry or entry["keys"] != [key for *_, key in builds] or entry.get("format") != fmt:
+        return False
+    return entry["sha256"] == file_hash(output_file)
+
+
+def build_cached(builds, build_pattern, cache_dir=DEFAULT_CACHE_DIR):
+    """Return (patterns, stats), only rebuilding patterns missing from the cache"""
+    patterns = []
+    stats = {"hits": 0, "misses": 0}
+    for pattern_id, metadata, svg_content, key in builds:
+        with span("cache", pattern_id) as traced:
+            record = load_cached(cache_dir, key)
+            traced.set(hit=record is not None)
+        if record is None:
+            record = build_pattern(pattern_id, metadata, svg_content)
+            store_cached(cache_dir, key, record)
+            stats["misses"] += 1
+        else:
+            stats["hits"] += 1
+        patterns.append(record)
+    return patterns, stats
+
+
+def write_catalog(patterns, builds, output_file, cache_dir=DEFAULT_CACHE_DIR, fmt="json"):
+    """Write patterns to output_file unless it is already identical.
+
+    Returns True if the file was (re)written.
+    """
+    buffer = io.StringIO()
+    write_patterns(patterns, buffer, fmt)
+    with span("write") as traced:
+        data = buffer.getvalue().encode("utf-8")
+        digest = _hash(data)
+        written = digest != file_hash(output_file)
+        if written:
+            os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+            with open(output_file, 'wb') as f:
+                f.write(data)
+        traced.set(bytes=len(data), written=written)
+
+    manifest = load_manifest(cache_dir)
+    manifest[os.path.abspath(output_file)] = {
+        "keys": [key for *_, key in builds],
+        "format": fmt,
+        "sha256": digest,
+    }
+    save_manifest(cache_dir, manifest)
+    return written
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Streaming readers and writers for pattern catalogs.
+
+Two on-disk formats are supported:
+
+* ``json``   - the existing pretty-printed array (``json.dump(..., indent=2)``)
+* ``ndjson`` - JSON Lines, one compact pattern record per line
+
+The writers emit each pattern as soon as it is produced and the readers
+yield one pattern at a time, so memory use is bounded by the largest single
+pattern rather than by the catalog.
+
+Usage:
+    python catalog_io.py convert ../../public/svelte_patterns.json svelte.ndjson
+    python catalog_io.py count svelte.ndjson
+"""
+
+import argparse
+import json
+import re
+
+from tracing import span
+
+FORMATS = ("json", "ndjson")
+DEFAULT_READ_SIZE = 1 << 16
+_NUMBER_CHARS = frozenset("0123456789+-.eE")
+# What can end or nest a value outside a string, and inside one
+_STRUCTURE_RE = re.compile(r'[][{}"]')
+_STRING_RE = re.compile(r'["\\]')
+
+
+def format_for_path(path):
+    """Guess the catalog format from a file name"""
+    return "ndjson" if path.endswith((".ndjson", ".jsonl")) else "json"
+
+
+def _pattern_id(pattern):
+    """Return a pattern record's id for tracing, or None"""
+    return pattern.get("id") if isinstance(pattern, dict) else None
+
+
+def write_json_stream(patterns, f, indent=2):
+    """Write patterns as a JSON array, one pattern at a time.
+
+    The output is byte-identical to ``json.dump(list(patterns), f, indent=indent)``.
+    f is flushed before returning. Returns the number of patterns written.
+    """
+    pad = " " * indent
+    count = 0
+    for pattern in patterns:
+        with span("serialize", _pattern_id(pattern)) as traced:
+            text = pad + json.dumps(pattern, indent=indent).replace("\n", "\n" + pad)
+            traced.set(bytes=len(text))
+        f.write("[\n" if count == 0 else ",\n")
+        f.write(text)
+        count += 1
+    f.write("\n]" if count else "[]")
+    f.flush()
+    return count
+
+
+def write_ndjson(patterns, f, flush=False):
+    """Write patterns as JSON Lines; returns the number of patterns written.
+
+    With ``flush=True`` each line is flushed as it is written, so a reader
+    following the file can start on the first pattern straight away; f is
+    flushed before returning either way.
+    """
+    count = 0
+    for pattern in patterns:
+        with span("serialize", _pattern_id(pattern)) as traced:
+            text = json.dumps(pattern, separators=(",", ":"))
+            traced.set(bytes=len(text) + 1)
+        f.write(text)
+        f.write("\n")
+        if flush:
+            f.flush()
+        count += 1
+    f.flush()
+    return count
+
+
+def write_patterns(patterns, f, fmt="json"):
+    """Write patterns to f in the given catalog format"""
+    if fmt == "ndjson":
+        return write_ndjson(patterns, f)
+    if fmt == "json":
+        return write_json_stream(patterns, f)
+    raise ValueError(f"unknown catalog format: {fmt}")
+
+
+def iter_ndjson(f):
+    """Yield patterns from a JSON Lines file object, skipping blank lines"""
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+
+class _JsonStream:
+    """A read buffer over a text file that decodes one JSON value at a time"""
+
+    def __init__(self, f, read_size):
+        self.f = f
+        self.read_size = read_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        """Read another chunk; returns False at end of file"""
+        if self.eof:
+            return False
+        # Read at least as much as is still buffered, so a long value takes a
+        # logarithmic number of reads (and buffer copies) rather than a linear one
+        chunk = self.f.read(max(self.read_size, len(self.buf) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop what has already been consumed so the buffer stays small
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars):
+        """Consume and return the next character, which must be one of chars"""
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"expected one of {chars!r} in catalog, got {char!r}")
+        self.pos += 1
+        return char
+
+    def _read_number(self):
+        """Read on until the number at pos is followed by a character that cannot continue it.
+
+        A prefix of a number cut off by the buffer end ("1.5" of "1.5e3")
+        decodes too, so it must not be decoded early.
+        """
+        scanned = 0
+        while True:
+            end = self.pos + scanned
+            while end < len(self.buf) and self.buf[end] in _NUMBER_CHARS:
+                end += 1
+            scanned = end - self.pos
+            if end < len(self.buf) or not self._fill():
+                return
+
+    def _read_container(self):
+        """Read on until the buffer holds the whole string, array or object at pos.
+
+        The scan resumes where the previous chunk ended, so a value is
+        scanned once however many reads it spans.
+        """
+        scanned = 0
+        depth = 0
+        in_string = False
+        while True:
+            i = self.pos + scanned
+            while True:
+                match = (_STRING_RE if in_string else _STRUCTURE_RE).search(self.buf, i)
+                if match is None:
+                    i = len(self.buf)
+                    break
+                char = match.group()
+                if char == "\\":
+                    if match.end() == len(self.buf):
+                        i = match.start()  # the escaped character is in the next chunk
+                        break
+                    i = match.end() + 1
+                    continue
+                i = match.end()
+                if char == '"':
+                    in_string = not in_string
+                elif char in "[{":
+                    depth += 1
+                else:
+                    depth -= 1
+                if not in_string and depth == 0:
+                    return
+            scanned = i - self.pos
+            if not self._fill():
+                return
+
+    def value(self):
+        """Decode and return the next JSON value"""
+        char = self.peek()
+        if char in "-0123456789":
+            self._read_number()
+        elif char in '"[{':
+            self._read_container()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Only a literal (true, false, null) can still be incomplete
+                if char in '-0123456789"[{' or not self._fill():
+                    raise
+                continue
+            self.pos = end
+            return value
+
+
+def _iter_array(stream):
+    """Yield the items of the JSON array at the stream position"""
+    stream.expect("[")
+    if stream.peek() == "]":
+        stream.pos += 1
+        return
+    while True:
+        yield stream.value()
+        if stream.expect(",]") == "]":
+            return
+
+
+def iter_json_catalog(f, read_size=DEFAULT_READ_SIZE):
+    """Yield patterns from a JSON catalog file object one at a time.
+
+    Accepts both a bare array of patterns and a ``{"metadata": ...,
+    "patterns": [...]}`` wrapper. Other members of a wrapper are skipped.
+    """
+    stream = _JsonStream(f, read_size)
+    if stream.peek() == "[":
+        yield from _iter_array(stream)
+        return
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        key = stream.value()
+        stream.expect(":")
+        if key == "patterns":
+            yield from _iter_array(stream)
+        else:
+            stream.value()
+        if stream.expect(",}") == "}":
+            return
+
+
+def iter_catalog(path, fmt=None):
+    """Yield patterns from a catalog file, choosing the reader by format"""
+    fmt = fmt or format_for_path(path)
+    with open(path) as f:
+        if fmt == "ndjson":
+            yield from iter_ndjson(f)
+        else:
+            yield from iter_json_catalog(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert and inspect pattern catalogs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    convert = subparsers.add_parser("convert", help="convert a catalog between formats")
+    convert.add_argument("input")
+    convert.add_argument("output")
+    convert.add_argument("--format", choices=FORMATS,
+                         help="output format (default: from the output file name)")
+    count = subparsers.add_parser("count", help="count the patterns in a catalog")
+    count.add_argument("input")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        fmt = args.format or format_for_path(args.output)
+        with open(args.output, 'w') as f:
+            written = write_patterns(iter_catalog(args.input), f, fmt)
+        print(f"Wrote {written} patterns to {args.output}")
+    else:
+        print(sum(1 for _ in iter_catalog(args.input)))
+
+
+if __name__ == "__main__":
+    main()
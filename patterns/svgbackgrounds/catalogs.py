@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Helpers for reading the shipped pattern catalogs.
+
+The catalogs under public/ come in a few shapes: bare lists of
+{name, image} (hero, css), bare lists of pattern records (pattern monster),
+and {metadata, patterns} wrappers (iro, svelte). These helpers normalize all
+of them into pattern records that carry a complete SVG document.
+"""
+
+import json
+import os
+
+CATALOG_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "public")
+)
+
+CATALOG_FILES = (
+    "heropatterns.json",
+    "css_patterns.json",
+    "iro_patternfills.json",
+    "pattern_monster_patterns.json",
+    "svelte_patterns.json",
+)
+
+SVGBACKGROUNDS_OUTPUT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "svgbackgrounds.json"
+)
+
+SVG_NS = "http://www.w3.org/2000/svg"
+
+
+def catalog_paths(catalog_dir=CATALOG_DIR):
+    """Return the paths of the shipped catalogs that exist in catalog_dir"""
+    paths = [os.path.join(catalog_dir, name) for name in CATALOG_FILES]
+    return [path for path in paths if os.path.exists(path)]
+
+
+def default_catalog_paths():
+    """Return the shipped catalogs plus the generated svgbackgrounds output if built"""
+    paths = catalog_paths()
+    if os.path.exists(SVGBACKGROUNDS_OUTPUT):
+        paths.append(SVGBACKGROUNDS_OUTPUT)
+    return paths
+
+
+def catalog_keys(paths):
+    """Return a short unique key per catalog path: the file stem, or dir/stem on clashes"""
+    stems = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+    keys = []
+    for path, stem in zip(paths, stems):
+        if stems.count(stem) > 1:
+            parent = os.path.basename(os.path.dirname(os.path.abspath(path)))
+            stem = f"{parent}/{stem}"
+        keys.append(stem)
+    return keys
+
+
+def _slugify(name):
+    """Turn a display name into an id"""
+    slug = "".join(c if c.isalnum() else "-" for c in name.lower())
+    return "-".join(part for part in slug.split("-") if part)
+
+
+def wrap_fragment(fragment, width, height):
+    """Wrap catalog svgPath markup in a root <svg> element"""
+    body = fragment.replace("~", "")
+    return (
+        f'<svg xmlns="{SVG_NS}" viewBox="0 0 {width} {height}" '
+        f'width="{width}" height="{height}">{body}</svg>'
+    )
+
+
+def _fragment_svg(svg_path, width, height):
+    """Return a full SVG document for a svgPath value of any catalog shape"""
+    if isinstance(svg_path, list):
+        svg_path = "".join(svg_path)
+    if svg_path.lstrip().startswith(("<svg", "<?xml", "<ns0:svg")):
+        return svg_path
+    return wrap_fragment(svg_path, width, height)
+
+
+def load_catalog(path):
+    """Load a catalog file and return (source, list of raw entries)"""
+    with open(path) as f:
+        data = json.load(f)
+    default_source = os.path.splitext(os.path.basename(path))[0]
+    if isinstance(data, dict):
+        metadata = data.get("metadata", {})
+        return metadata.get("source", default_source), data.get("patterns", [])
+    return default_source, data
+
+
+def normalize_entry(entry, source, index):
+    """Normalize one raw catalog entry into a pattern record with an svg document"""
+    name = entry.get("name", f"pattern-{index}")
+    if "image" in entry:
+        svg = entry["image"]
+        width = height = None
+    else:
+        width = entry.get("width", 100)
+        height = entry.get("height", 100)
+        svg = _fragment_svg(entry.get("svgPath", ""), width, height)
+    return {
+        "id": str(entry.get("id") or _slugify(name)),
+        "name": name,
+        "tags": list(entry.get("tags", [])),
+        "description": entry.get("description", ""),
+        "source": entry.get("source", source),
+        "mode": entry.get("mode"),
+        "width": width,
+        "height": height,
+        "svg": svg,
+    }
+
+
+def iter_catalog_records(path):
+    """Yield normalized pattern records from one catalog file"""
+    source, entries = load_catalog(path)
+    for index, entry in enumerate(entries):
+        yield normalize_entry(entry, source, index)
+
+
+def iter_all_records(catalog_dir=CATALOG_DIR):
+    """Yield normalized pattern records from every shipped catalog"""
+    for path in catalog_paths(catalog_dir):
+        yield from iter_catalog_records(path)
+
+
+def generator_sources(creators=None):
+    """Return (id, svg, mode) for registered pattern creators (default: every generator)"""
+    if creators is None:
+        # Imported here so reading catalogs does not load the generators
+        from create_svg_patterns import PATTERN_CREATORS as creators
+    return [(pattern_id, metadata["svg_func"](), metadata.get("mode"))
+            for pattern_id, metadata in creators.items()]
+
+
+def catalog_sources(paths):
+    """Return (catalog:id, svg, mode) for every pattern record in the given catalogs"""
+    sources = []
+    for path, catalog_key in zip(paths, catalog_keys(paths)):
+        sources.extend((f"{catalog_key}:{record['id']}", record["svg"], record["mode"])
+                       for record in iter_catalog_records(path))
+    return sources
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Tiling-aware canvas compositor.
+
+Turns one pattern record and a canvas size into a minimal SVG: the tile is
+defined once inside <defs><pattern> and a single rect fills the canvas with
+it, so output size does not depend on the canvas dimensions.
+
+A <pattern> clips its content to the tile, so geometry that overhangs a tile
+edge (strokes, waves drawn past the tile bounds) would lose the part that
+should wrap into the neighbouring tile. Such elements get an id and are
+repeated with <use> at the tile offsets their bounding box reaches; nothing
+else is duplicated. Ids the compositor adds start with the pattern's id and
+skip any id already in the tile, so canvases can be inlined side by side.
+
+Usage:
+    python compositor.py ../../public/pattern_monster_patterns.json waves-1 --size 3508 2480
+    python compositor.py ../../public/heropatterns.json jigsaw --size 800 600 --scale 0.5
+"""
+
+import argparse
+import math
+import re
+import xml.etree.ElementTree as ET
+
+from catalogs import iter_catalog_records
+from path_compiler import (
+    SVG_NS,
+    XLINK_NS,
+    _bbox,
+    _escape,
+    _local,
+    _stroke_pad,
+    serialize,
+    shape_commands,
+    stroke_paint,
+)
+
+STROKE_MODES = ("stroke", "stroke-join")
+# Suffix of the <pattern> id, after the pattern's own id
+PATTERN_ID = "tile"
+# Stroke width the web front end draws stroke mode patterns with
+DEFAULT_STROKE_WIDTH = 2
+# Geometry further than this many tiles past the tile edge is not wrapped;
+# the shipped catalogs reach at most about 4.5 tiles out
+MAX_WRAP_TILES = 5
+
+
+def _element_bbox(elem, inherited=None):
+    """Return a conservative bounding box of an element subtree, or None if unknown.
+
+    ``inherited`` is the stroke paint the element's parent passes down.
+    """
+    tag = _local(elem.tag)
+    attrs = {_local(k): v for k, v in elem.attrib.items()}
+    paint = stroke_paint(attrs, inherited)
+    if tag == "g":
+        boxes = [_element_bbox(child, paint) for child in elem]
+        boxes = [box for box in boxes if box is not None]
+        if not boxes:
+            return None
+        return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+                max(b[2] for b in boxes), max(b[3] for b in boxes))
+    if tag == "rect":
+        # Rounded corners stay inside the plain rect's box
+        attrs = {k: v for k, v in attrs.items() if k not in ("rx", "ry")}
+    commands = shape_commands(tag, attrs)
+    if not commands:
+        return None
+    return _bbox(commands, _stroke_pad(paint))
+
+
+def wrap_offsets(bbox, width, height):
+    """Return the tile offsets (dx, dy), other than (0, 0), at which a box overlaps the tile"""
+    x0, y0, x1, y1 = bbox
+    # Clamp so a degenerate box cannot ask for an unbounded number of copies
+    x0, x1 = max(x0, -MAX_WRAP_TILES * width), min(x1, (MAX_WRAP_TILES + 1) * width)
+    y0, y1 = max(y0, -MAX_WRAP_TILES * height), min(y1, (MAX_WRAP_TILES + 1) * height)
+    offsets = []
+    for i in range(math.floor(-x1 / width), math.ceil(-x0 / width) + 1):
+        for j in range(math.floor(-y1 / height), math.ceil(-y0 / height) + 1):
+            dx, dy = i * width, j * height
+            if (i or j) and x0 + dx < width and x1 + dx > 0 and y0 + dy < height and y1 + dy > 0:
+                offsets.append((dx, dy))
+    return offsets
+
+
+def _number(value):
+    return f"{value:g}"
+
+
+def mode_paint(mode, color=None, stroke_width=None):
+    """Return the group paint the web front end applies for a catalog mode.
+
+    Stroke modes draw unfilled black outlines at DEFAULT_STROKE_WIDTH, fill
+    mode fills black; ``color`` and ``stroke_width`` override the defaults.
+    """
+    if mode in STROKE_MODES:
+        paint = {"fill": "none", "stroke": color or "black",
+                 "stroke-width": _number(DEFAULT_STROKE_WIDTH if stroke_width is None else stroke_width)}
+        if mode == "stroke-join":
+            paint["stroke-linejoin"] = "round"
+        return paint
+    if mode == "fill":
+        return {"fill": color or "black"}
+    return {}
+
+
+def _tile_root(record):
+    """Parse a pattern record's svg into its tile document root"""
+    root = ET.fromstring(record["svg"])
+    for elem in root.iter():
+        elem.tag = _local(elem.tag)
+        elem.attrib = {_local(k): v for k, v in elem.attrib.items()}
+    return root
+
+
+def _unique_id(base, taken):
+    """Return base, or base with a numeric suffix, so that it is not in taken; adds it to taken"""
+    candidate, n = base, 1
+    while candidate in taken:
+        n += 1
+        candidate = f"{base}-{n}"
+    taken.add(candidate)
+    return candidate
+
+
+def _id_prefix(record):
+    """Return the record's id as a valid XML id"""
+    prefix = re.sub(r"[^\w.-]", "-", str(record.get("id") or "pattern"))
+    return prefix if re.match(r"[A-Za-z_]", prefix) else f"p-{prefix}"
+
+
+def _tile_box(root, record):
+    """Return the tile's (x, y, width, height) in its own user space"""
+    viewbox = root.get("viewBox")
+    if viewbox:
+        x, y, w, h = (float(v) for v in viewbox.replace(",", " ").split())
+        return x, y, w, h
+    width = float(record.get("width") or root.get("width", 100))
+    height = float(record.get("height") or root.get("height", 100))
+    return 0.0, 0.0, width, height
+
+
+def compose(record, canvas_width, canvas_height, scale=1.0, color=None, stroke_width=None):
+    """Return a canvas SVG that fills canvas_width x canvas_height with the record's tile.
+
+    ``record`` is a normalized pattern record (see catalogs.normalize_entry),
+    as yielded by catalogs.iter_catalog_records. The record's mode is
+    painted the way the web front end does: stroke modes draw unfilled
+    outlines, fill mode fills. ``color`` and ``stroke_width`` override the
+    default black paint and stroke width.
+    """
+    root = _tile_root(record)
+    x, y, width, height = _tile_box(root, record)
+    paint = mode_paint(record.get("mode"), color, stroke_width)
+    group_paint = stroke_paint(paint)
+    taken = {elem.get("id") for elem in root.iter()} - {None}
+    prefix = _id_prefix(record)
+    pattern_id = _unique_id(f"{prefix}-{PATTERN_ID}", taken)
+
+    children = []
+    for index, child in enumerate(list(root)):
+        children.append(child)
+        if child.tag == "defs":
+            continue
+        bbox = _element_bbox(child, group_paint)
+        if bbox is None:
+            continue
+        local = (bbox[0] - x, bbox[1] - y, bbox[2] - x, bbox[3] - y)
+        offsets = wrap_offsets(local, width, height)
+        if not offsets:
+            continue
+        element_id = child.get("id")
+        if element_id is None:
+            element_id = _unique_id(f"{pattern_id}-{index}", taken)
+            child.set("id", element_id)
+        for dx, dy in offsets:
+            # href for SVG 2 renderers, xlink:href for those that only know SVG 1.1
+            children.append(ET.Element("use", {"href": f"#{element_id}",
+                                               "xlink:href": f"#{element_id}",
+                                               "x": _number(dx), "y": _number(dy)}))
+
+    tile = "".join(serialize(child) for child in children)
+    if paint:
+        tile = "<g" + "".join(f" {k}='{_escape(v)}'" for k, v in paint.items()) + f">{tile}</g>"
+    pattern_attrs = {
+        "id": pattern_id,
+        "patternUnits": "userSpaceOnUse",
+        "width": _number(width * scale),
+        "height": _number(height * scale),
+        "viewBox": " ".join(_number(v) for v in (x, y, width, height)),
+    }
+    pattern_open = "<pattern" + "".join(f" {k}='{v}'" for k, v in pattern_attrs.items()) + ">"
+    w, h = _number(canvas_width), _number(canvas_height)
+    return (f"<svg xmlns='{SVG_NS}' xmlns:xlink='{XLINK_NS}' width='{w}' height='{h}' "
+            f"viewBox='0 0 {w} {h}'><defs>{pattern_open}{tile}</pattern></defs>"
+            f"<rect width='{w}' height='{h}' fill='url(#{pattern_id})'/></svg>")
+
+
+def find_record(path, pattern_id):
+    """Return the pattern record with the given id or name"""
+    for record in iter_catalog_records(path):
+        if pattern_id in (record["id"], record["name"]):
+            return record
+    raise KeyError(f"{pattern_id!r} not found in {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compose a tiled canvas SVG from a catalog pattern")
+    parser.add_argument("catalog")
+    parser.add_argument("pattern_id")
+    parser.add_argument("--size", type=float, nargs=2, default=(1920, 1080), metavar=("W", "H"))
+    parser.add_argument("--scale", type=float, default=1.0, help="tile scale on the canvas")
+    parser.add_argument("--color", help="paint colour for stroke and fill mode patterns")
+    parser.add_argument("--stroke-width", type=float,
+                        help=f"stroke width for stroke mode patterns (default {DEFAULT_STROKE_WIDTH})")
+    parser.add_argument("-o", "--output", help="write the SVG here instead of stdout")
+    args = parser.parse_args()
+
+    record = find_record(args.catalog, args.pattern_id)
+    svg = compose(record, args.size[0], args.size[1], args.scale, args.color, args.stroke_width)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(svg)
+    else:
+        print(svg)
+
+
+if __name__ == "__main__":
+    main()
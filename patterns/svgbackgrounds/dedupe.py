@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Exact and near-duplicate detection across pattern catalogs.
+
+Every pattern is run through extract_svg_data and its shapes are reduced to
+canonical path data (absolute shapes rewritten as quantized relative paths by
+the path compiler). Patterns with the same canonical geometry and paint, drawn
+in the same catalog mode at the same tile size, hash to the same key and form
+exact-duplicate clusters. Near-duplicates are found with MinHash signatures
+over shingles of path tokens, bucketed by LSH bands keyed on mode and tile
+size, so only patterns that would render alike and share a band are ever
+compared.
+
+The result is a cluster report and a merged catalog that keeps one entry per
+exact cluster (and optionally per near cluster), recording the dropped
+entries as aliases.
+
+Usage:
+    python dedupe.py --report dedupe_report.json -o merged_patterns.json
+    python dedupe.py ../../public/*.json ../../docs/*.json --merge-near
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import sys
+from xml.etree.ElementTree import ParseError
+
+from catalog_io import FORMATS, format_for_path, write_patterns
+from catalogs import catalog_keys, default_catalog_paths, load_catalog, normalize_entry
+from create_svg_patterns import extract_svg_data
+from path_compiler import GEOMETRY_ATTRS, compile_commands, shape_commands
+
+DEFAULT_PRECISION = 1
+DEFAULT_THRESHOLD = 0.8
+SHINGLE_SIZE = 4
+NUM_HASHES = 64
+BANDS = 16
+_MERSENNE = (1 << 61) - 1
+_TOKEN_RE = re.compile(r"[A-Za-z][^A-Za-z]*")
+
+
+# Canonical form
+
+def canonical_element(record, precision=DEFAULT_PRECISION):
+    """Return (geometry, paint) strings for one extracted shape record"""
+    tag, attrs = record["type"], record["attrs"]
+    commands = shape_commands(tag, attrs)
+    geometry_attrs = GEOMETRY_ATTRS.get(tag, set())
+    if commands:
+        geometry = compile_commands(commands, precision)
+    else:
+        geometry = tag + ":" + ";".join(f"{k}={attrs[k]}" for k in sorted(geometry_attrs) if k in attrs)
+    paint = {**record.get("inherited", {}),
+             **{k: v for k, v in attrs.items() if k not in geometry_attrs and k != "id"}}
+    return geometry, ";".join(f"{k}={paint[k]}" for k in sorted(paint))
+
+
+def pattern_variant(record):
+    """Return what besides the markup decides how a record renders: (mode, width, height)"""
+    return record.get("mode"), record.get("width"), record.get("height")
+
+
+def canonical_pattern(record, precision=DEFAULT_PRECISION):
+    """Return (exact hash, list of geometry strings) for one normalized pattern record"""
+    data = extract_svg_data(record["svg"])
+    digest = hashlib.sha256(f"{pattern_variant(record)}{data['viewBox']}".encode())
+    geometries = []
+    for record in data["elements"]:
+        geometry, paint = canonical_element(record, precision)
+        geometries.append(geometry)
+        digest.update(b"\x00" + geometry.encode() + b"\x01" + paint.encode())
+    for gradient in data["gradients"]:
+        stops = [sorted(stop.items()) for stop in gradient.get("stops", [])]
+        digest.update(f"\x02{sorted(gradient['attrs'].items())}{stops}".encode())
+    return digest.hexdigest(), geometries
+
+
+def shingles(geometries, size=SHINGLE_SIZE):
+    """Return the set of hashed k-token shingles over all path commands"""
+    tokens = [token.strip() for geometry in geometries for token in _TOKEN_RE.findall(geometry)]
+    if len(tokens) < size:
+        tokens = tokens + [""] * (size - len(tokens))
+    return {
+        int.from_bytes(hashlib.blake2b(" ".join(tokens[i:i + size]).encode(),
+                                       digest_size=8).digest(), "little")
+        for i in range(len(tokens) - size + 1)
+    }
+
+
+# MinHash / LSH
+
+def _hash_params(count, seed=0):
+    rng = random.Random(seed)
+    return [(rng.randrange(1, _MERSENNE), rng.randrange(0, _MERSENNE)) for _ in range(count)]
+
+
+def minhash(shingle_set, params):
+    """Return the MinHash signature of a shingle set"""
+    return tuple(min((a * x + b) % _MERSENNE for x in shingle_set) for a, b in params)
+
+
+def lsh_candidates(signatures, bands=BANDS, variants=None):
+    """Return index pairs that share at least one LSH band (and variant, if given)"""
+    rows = len(next(iter(signatures.values()))) // bands if signatures else 0
+    buckets = {}
+    for index, signature in signatures.items():
+        variant = variants[index] if variants is not None else None
+        for band in range(bands):
+            key = (band, variant, signature[band * rows:(band + 1) * rows])
+            buckets.setdefault(key, []).append(index)
+    pairs = set()
+    for members in buckets.values():
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                pairs.add((a, b))
+    return pairs
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+class _UnionFind:
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            # Keep the earlier entry as the root so it becomes the representative
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def _clusters(uf, size):
+    groups = {}
+    for i in range(size):
+        groups.setdefault(uf.find(i), []).append(i)
+    return [members for members in groups.values() if len(members) > 1]
+
+
+# Pipeline
+
+def load_entries(paths):
+    """Return [{key, catalog, entry, record}] for every entry in the given catalogs"""
+    entries = []
+    for path, catalog_key in zip(paths, catalog_keys(paths)):
+        source, raw_entries = load_catalog(path)
+        for index, entry in enumerate(raw_entries):
+            record = normalize_entry(entry, source, index)
+            entries.append({
+                "key": f"{catalog_key}:{record['id']}",
+                "catalog": catalog_key,
+                "source": source,
+                "entry": entry,
+                "record": record,
+            })
+    return entries
+
+
+def find_duplicates(entries, threshold=DEFAULT_THRESHOLD, precision=DEFAULT_PRECISION):
+    """Cluster entries; returns (exact clusters, near clusters, failures)"""
+    params = _hash_params(NUM_HASHES)
+    hashes = {}
+    shingle_sets = {}
+    signatures = {}
+    variants = {}
+    failures = []
+    for i, item in enumerate(entries):
+        try:
+            digest, geometries = canonical_pattern(item["record"], precision)
+        except (ParseError, ValueError) as e:
+            failures.append({"id": item["key"], "error": str(e)})
+            continue
+        hashes.setdefault(digest, []).append(i)
+        if geometries:
+            shingle_sets[i] = shingles(geometries)
+            signatures[i] = minhash(shingle_sets[i], params)
+            variants[i] = pattern_variant(item["record"])
+
+    exact = _UnionFind(len(entries))
+    for members in hashes.values():
+        for other in members[1:]:
+            exact.union(members[0], other)
+
+    near = _UnionFind(len(entries))
+    similarities = {}
+    for a, b in lsh_candidates(signatures, variants=variants):
+        if exact.find(a) == exact.find(b):
+            continue
+        score = jaccard(shingle_sets[a], shingle_sets[b])
+        if score >= threshold:
+            near.union(exact.find(a), exact.find(b))
+            similarities[(a, b)] = score
+    # Fold exact members into their representative's near cluster
+    for members in _clusters(exact, len(entries)):
+        for other in members[1:]:
+            near.union(members[0], other)
+
+    exact_clusters = _clusters(exact, len(entries))
+    near_clusters = []
+    for members in _clusters(near, len(entries)):
+        roots = {exact.find(i) for i in members}
+        if len(roots) < 2:
+            continue
+        scores = [s for (a, b), s in similarities.items() if near.find(a) == members[0]]
+        near_clusters.append((members, min(scores)))
+    return exact_clusters, near_clusters, failures
+
+
+def merge_entries(entries, clusters):
+    """Keep the first entry of each cluster, adding aliases and the union of tags"""
+    dropped = set()
+    merged_extra = {}
+    for members in clusters:
+        keep, rest = members[0], members[1:]
+        dropped.update(rest)
+        merged_extra[keep] = rest
+
+    merged = []
+    for i, item in enumerate(entries):
+        if i in dropped:
+            continue
+        entry = dict(item["entry"])
+        entry.setdefault("source", item["source"])
+        if i in merged_extra:
+            tags = list(entry.get("tags", []))
+            for other in merged_extra[i]:
+                tags.extend(entries[other]["record"]["tags"])
+            if tags:
+                entry["tags"] = list(dict.fromkeys(tags))
+            entry["aliases"] = [entries[other]["key"] for other in merged_extra[i]]
+        merged.append(entry)
+    return merged
+
+
+def _entry_bytes(entry):
+    return len(json.dumps(entry, separators=(",", ":")).encode())
+
+
+def build_report(entries, exact_clusters, near_clusters, failures, merged):
+    keys = [item["key"] for item in entries]
+    return {
+        "patterns": len(entries),
+        "merged_patterns": len(merged),
+        "bytes": sum(_entry_bytes(item["entry"]) for item in entries),
+        "merged_bytes": sum(_entry_bytes(entry) for entry in merged),
+        "exact_clusters": [[keys[i] for i in members] for members in exact_clusters],
+        "near_clusters": [{"members": [keys[i] for i in members], "min_similarity": round(score, 3)}
+                          for members, score in near_clusters],
+        "failures": failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find duplicate patterns across catalogs")
+    parser.add_argument("catalogs", nargs="*",
+                        help="catalog files (default: the catalogs in public/ and the svgbackgrounds output)")
+    parser.add_argument("-o", "--output", help="write the merged catalog here")
+    parser.add_argument("--format", choices=FORMATS, help="merged catalog format (default: from extension)")
+    parser.add_argument("--report", help="write the cluster report here (default: stdout summary only)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="minimum shingle Jaccard similarity for near-duplicates")
+    parser.add_argument("--precision", type=int, default=DEFAULT_PRECISION,
+                        help="decimal places kept when canonicalizing coordinates")
+    parser.add_argument("--merge-near", action="store_true",
+                        help="also collapse near-duplicate clusters in the merged catalog")
+    args = parser.parse_args()
+
+    entries = load_entries(args.catalogs or default_catalog_paths())
+    exact_clusters, near_clusters, failures = find_duplicates(entries, args.threshold, args.precision)
+    clusters = [members for members, _ in near_clusters] if args.merge_near else exact_clusters
+    if args.merge_near:
+        # Exact clusters not caught up in a near cluster still need collapsing
+        covered = {i for members in clusters for i in members}
+        clusters += [members for members in exact_clusters if members[0] not in covered]
+    merged = merge_entries(entries, clusters)
+    report = build_report(entries, exact_clusters, near_clusters, failures, merged)
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            write_patterns(merged, f, args.format or format_for_path(args.output))
+
+    print(f"{report['patterns']} patterns: {len(exact_clusters)} exact clusters, "
+          f"{len(near_clusters)} near clusters, {len(failures)} failures", file=sys.stderr)
+    print(f"merged catalog: {report['merged_patterns']} patterns, "
+          f"{report['bytes']} -> {report['merged_bytes']} bytes", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
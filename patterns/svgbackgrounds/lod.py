@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Level-of-detail variants for pattern geometry.
+
+Each path, polyline and polygon is flattened to line segments (curves and
+arcs included) and simplified with Ramer-Douglas-Peucker to a tolerance in
+user units, then re-emitted as compiled path data quantized to match the
+tolerance. A shape is only replaced when the simplified markup is shorter;
+basic shapes (rects, circles, ellipses, lines) are already minimal and are
+kept as they are, as is anything under a transform, whose scale would
+change what the tolerance means.
+
+A detail level targets a rendered tile size in pixels: its tolerance is
+TOLERANCE_PX of a pixel at that size. Levels are stored finest first in a
+record's ``detailLevels``, each with ``tileSize``, ``tolerance``, its
+vertex count and the simplified ``svgPath`` (or ``image``). A level that
+changes nothing relative to the finer one is not emitted. A client rendering
+a tile at N pixels uses the last level whose ``tileSize`` is at least N, or
+the full markup when there is none (see pick_level).
+
+Usage:
+    python lod.py                                          # report on the shipped catalogs
+    python lod.py ../../public/heropatterns.json --tile-sizes 128 32 --render
+    python lod.py radiant-grid                             # a generator's levels
+    python lod.py --output-dir out                         # write catalogs with detailLevels
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+import xml.etree.ElementTree as ET
+
+from catalogs import default_catalog_paths, load_catalog, normalize_entry, wrap_fragment
+from path_compiler import (
+    DEFAULT_PRECISION,
+    GEOMETRY_ATTRS,
+    SVG_NS,
+    XLINK_NS,
+    _local,
+    compile_commands,
+    serialize,
+    shape_commands,
+)
+from raster import flatten
+from svg_stream import element_to_svg
+
+DEFAULT_TILE_SIZES = (256, 64, 16)
+TOLERANCE_PX = 0.5
+SIMPLIFIED_TAGS = ("path", "polyline", "polygon")
+# Curves are flattened at about this many segments per tolerance length, so
+# sampling error stays well below the tolerance before simplification
+FLATTEN_SEGMENTS = 3.0
+
+
+# Simplification
+
+def _farthest(xs, ys, a, b):
+    """Return (index, squared distance) of the point strictly between a and b farthest from segment a-b"""
+    ax, ay = xs[a], ys[a]
+    dx, dy = xs[b] - ax, ys[b] - ay
+    norm = dx * dx + dy * dy
+    px = [x - ax for x in xs[a + 1:b]]
+    py = [y - ay for y in ys[a + 1:b]]
+    if norm == 0:
+        distances = [x * x + y * y for x, y in zip(px, py)]
+        norm = 1.0
+    else:
+        # Squared distances scaled by norm: the perpendicular part, plus the
+        # overshoot along the segment for points past either end
+        along = [x * dx + y * dy for x, y in zip(px, py)]
+        distances = [(dx * y - dy * x) ** 2 + (u * u if u < 0 else (u - norm) ** 2 if u > norm else 0.0)
+                     for x, y, u in zip(px, py, along)]
+    peak = max(distances)
+    return a + 1 + distances.index(peak), peak / norm
+
+
+def rdp(xs, ys, tolerance, first=0, last=None):
+    """Return the sorted indexes Ramer-Douglas-Peucker keeps between first and last.
+
+    Each span is measured in one pass over its slice of the coordinate
+    arrays; spans are split iteratively, so long runs never recurse.
+    """
+    last = len(xs) - 1 if last is None else last
+    keep = {first, last}
+    limit = tolerance * tolerance
+    spans = [(first, last)]
+    while spans:
+        a, b = spans.pop()
+        if b - a < 2:
+            continue
+        k, distance = _farthest(xs, ys, a, b)
+        if distance > limit:
+            keep.add(k)
+            spans.append((a, k))
+            spans.append((k, b))
+    return sorted(keep)
+
+
+def simplify_polyline(points, tolerance):
+    """Simplify an open polyline, keeping its endpoints"""
+    if len(points) <= 2:
+        return list(points)
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    return [points[i] for i in rdp(xs, ys, tolerance)]
+
+
+def simplify_ring(points, tolerance):
+    """Simplify a closed ring, keeping at least a triangle"""
+    points = list(points)
+    while len(points) > 1 and points[-1] == points[0]:
+        points.pop()
+    n = len(points)
+    if n <= 3:
+        return points
+    # Point n repeats point 0, so the ring splits into two open runs at the
+    # vertex farthest from the start
+    xs = [p[0] for p in points] + [points[0][0]]
+    ys = [p[1] for p in points] + [points[0][1]]
+    k, _ = _farthest(xs, ys, 0, n)
+    keep = set(rdp(xs, ys, tolerance, 0, k)) | set(rdp(xs, ys, tolerance, k, n))
+    keep.discard(n)
+    if len(keep) < 3:
+        # Collapsed to a sliver: keep the vertex farthest from the split chord
+        others = [j for j in range(1, n) if j != k]
+        i, _ = _farthest([xs[0]] + [xs[j] for j in others] + [xs[k]],
+                         [ys[0]] + [ys[j] for j in others] + [ys[k]], 0, len(others) + 1)
+        keep.add(others[i - 1])
+    return [points[i] for i in sorted(keep)]
+
+
+def simplify_commands(commands, tolerance):
+    """Return (line commands, vertex count) within tolerance of absolute path commands.
+
+    Returns (None, 0) when flattening would drop a subpath (a lone moveto can
+    still paint a cap), so the caller keeps the original geometry.
+    """
+    subpaths = flatten(commands, FLATTEN_SEGMENTS / tolerance)
+    if len(subpaths) < sum(1 for cmd, _ in commands if cmd == "M"):
+        return None, 0
+    out = []
+    vertices = 0
+    for points, closed in subpaths:
+        kept = simplify_ring(points, tolerance) if closed else simplify_polyline(points, tolerance)
+        out.append(("M", list(kept[0])))
+        out.extend(("L", list(point)) for point in kept[1:])
+        if closed:
+            out.append(("Z", []))
+        vertices += len(kept)
+    return out, vertices
+
+
+def precision_for(tolerance):
+    """Return the decimals whose rounding error stays within half the tolerance"""
+    return max(0, min(DEFAULT_PRECISION + 1, math.ceil(-math.log10(tolerance))))
+
+
+def simplify_shape(tag, attrs, tolerance, precision=None):
+    """Return (tag, attrs, vertices) drawing a shape within tolerance.
+
+    The shape comes back unchanged unless it is a path, polyline or polygon
+    whose simplified path data is shorter than its geometry attributes.
+    """
+    try:
+        commands = shape_commands(tag, attrs)
+    except ValueError:
+        commands = None
+    if not commands:
+        return tag, attrs, 0
+    vertices = sum(1 for cmd, _ in commands if cmd != "Z")
+    if tag not in SIMPLIFIED_TAGS or "transform" in attrs:
+        return tag, attrs, vertices
+    simplified, count = simplify_commands(commands, tolerance)
+    if simplified is None:
+        return tag, attrs, vertices
+    d = compile_commands(simplified, precision_for(tolerance) if precision is None else precision)
+    geometry = GEOMETRY_ATTRS[tag]
+    if len("pathd") + len(d) >= len(tag) + sum(len(k) + len(v) for k, v in attrs.items() if k in geometry):
+        return tag, attrs, vertices
+    simplified_attrs = {k: v for k, v in attrs.items() if k not in geometry}
+    simplified_attrs["d"] = d
+    return "path", simplified_attrs, count
+
+
+def simplify_elements(elements, tolerance):
+    """Simplify extract_svg_data element records; returns (svg element strings, vertices)"""
+    markup = []
+    vertices = 0
+    for record in elements:
+        tag, attrs, count = simplify_shape(record["type"], record["attrs"], tolerance)
+        markup.append(element_to_svg({**record, "type": tag, "attrs": attrs}))
+        vertices += count
+    return markup, vertices
+
+
+# Catalog markup
+
+def _simplify_tree(elem, tolerance, counts, transformed=False):
+    """Simplify the shapes under elem in place; counts is [vertices, replaced shapes]"""
+    for child in elem:
+        child.tag = _local(child.tag)
+        child.attrib = {_local(k): v for k, v in child.attrib.items()}
+        moved = transformed or "transform" in child.attrib or "patternTransform" in child.attrib
+        if child.tag in GEOMETRY_ATTRS and not len(child):
+            tag, attrs, vertices = simplify_shape(child.tag, child.attrib, tolerance)
+            if moved:
+                tag, attrs = child.tag, child.attrib
+            counts[0] += vertices
+            if tag != child.tag or attrs is not child.attrib:
+                child.tag, child.attrib = tag, attrs
+                counts[1] += 1
+        else:
+            _simplify_tree(child, tolerance, counts, moved)
+
+
+def _simplify_document(svg_text, tolerance, counts):
+    root = ET.fromstring(svg_text)
+    root.tag = _local(root.tag)
+    root.attrib = {_local(k): v for k, v in root.attrib.items()}
+    _simplify_tree(root, tolerance, counts, "transform" in root.attrib)
+    root.attrib = {"xmlns": SVG_NS, **{k: v for k, v in root.attrib.items() if k != "xmlns"}}
+    markup = serialize(root)
+    if "xlink:" in markup and "xmlns:xlink" not in root.attrib:
+        markup = markup.replace("<svg ", f"<svg xmlns:xlink='{XLINK_NS}' ", 1)
+    return markup
+
+
+def _simplify_fragment(elements, tolerance, counts):
+    root = ET.fromstring(wrap_fragment("".join(elements), 0, 0))
+    _simplify_tree(root, tolerance, counts)
+    return [serialize(child) for child in root]
+
+
+def simplify_markup(markup, tolerance):
+    """Simplify a catalog svgPath or image value, keeping its shape; returns (markup, counts)"""
+    counts = [0, 0]
+    if isinstance(markup, list):
+        return _simplify_fragment(markup, tolerance, counts), counts
+    if markup.lstrip().startswith(("<svg", "<?xml", "<ns0:svg")):
+        return _simplify_document(markup, tolerance, counts), counts
+    # "~"-joined fragments stay "~"-joined, one part per original part
+    parts = [_simplify_fragment([part], tolerance, counts) for part in markup.split("~")]
+    return "~".join("".join(part) for part in parts), counts
+
+
+# Detail levels
+
+def tolerance_for(extent, tile_size, tolerance_px=TOLERANCE_PX):
+    """Return the tolerance in user units for a tile of extent units drawn at tile_size pixels"""
+    return tolerance_px * extent / tile_size
+
+
+def _level(tile_size, tolerance, key, markup, vertices):
+    return {"tileSize": tile_size, "tolerance": round(tolerance, 4), key: markup, "vertices": vertices}
+
+
+def detail_levels(data, tile_sizes=DEFAULT_TILE_SIZES, tolerance_px=TOLERANCE_PX):
+    """Return detail levels for extract_svg_data output, finest first"""
+    extent = max(data["viewBox"][2], data["viewBox"][3])
+    levels = []
+    previous = data["svgElements"]
+    for tile_size in sorted(tile_sizes, reverse=True):
+        tolerance = tolerance_for(extent, tile_size, tolerance_px)
+        markup, vertices = simplify_elements(data["elements"], tolerance)
+        if markup != previous:
+            levels.append(_level(tile_size, tolerance, "svgPath", markup, vertices))
+            previous = markup
+    return levels
+
+
+def _entry_extent(entry):
+    """Return the larger side of a catalog entry's tile in user units"""
+    if "image" in entry:
+        from create_svg_patterns import extract_svg_data
+        viewbox = extract_svg_data(entry["image"])["viewBox"]
+        return max(viewbox[2], viewbox[3])
+    return max(entry.get("width", 100), entry.get("height", 100))
+
+
+def entry_detail_levels(entry, tile_sizes=DEFAULT_TILE_SIZES, tolerance_px=TOLERANCE_PX):
+    """Return detail levels for a raw catalog entry, finest first"""
+    key = "image" if "image" in entry else "svgPath"
+    extent = _entry_extent(entry)
+    levels = []
+    previous = None
+    for tile_size in sorted(tile_sizes, reverse=True):
+        tolerance = tolerance_for(extent, tile_size, tolerance_px)
+        markup, (vertices, replaced) = simplify_markup(entry[key], tolerance)
+        if replaced and markup != previous:
+            levels.append(_level(tile_size, tolerance, key, markup, vertices))
+            previous = markup
+    return levels
+
+
+def add_detail_levels(entry, tile_sizes=DEFAULT_TILE_SIZES, tolerance_px=TOLERANCE_PX):
+    """Return a copy of a catalog entry with its detailLevels"""
+    return {**entry, "detailLevels": entry_detail_levels(entry, tile_sizes, tolerance_px)}
+
+
+def pick_level(entry, tile_size):
+    """Return the lightest markup (svgPath or image) good enough for a tile drawn at tile_size pixels"""
+    key = "image" if "image" in entry else "svgPath"
+    markup = entry[key]
+    for level in entry.get("detailLevels", []):
+        if level["tileSize"] >= tile_size:
+            markup = level[key]
+    return markup
+
+
+# Reporting
+
+def _size(markup):
+    return len(json.dumps(markup).encode("utf-8"))
+
+
+def _render_ms(entry, index, tile_size):
+    """Time rasterizing one tile of an entry at tile_size pixels"""
+    from raster import rasterize
+    svg = normalize_entry(entry, "", index)["svg"]
+    start = time.perf_counter()
+    rasterize(svg, tile_size, extent=0)
+    return (time.perf_counter() - start) * 1000
+
+
+def catalog_report(path, tile_sizes, tolerance_px, render=False):
+    """Add detail levels to one catalog; returns (entries with levels, report rows)"""
+    _, entries = load_catalog(path)
+    start = time.perf_counter()
+    leveled = []
+    failures = 0
+    for entry in entries:
+        try:
+            leveled.append(add_detail_levels(entry, tile_sizes, tolerance_px))
+        except (ET.ParseError, ValueError):
+            failures += 1
+            leveled.append({**entry, "detailLevels": []})
+    elapsed = time.perf_counter() - start
+
+    rows = []
+    for tile_size in sorted(tile_sizes, reverse=True):
+        full = light = 0
+        full_ms = light_ms = 0.0
+        for index, entry in enumerate(leveled):
+            key = "image" if "image" in entry else "svgPath"
+            markup = pick_level(entry, tile_size)
+            full += _size(entry[key])
+            light += _size(markup)
+            if render:
+                full_ms += _render_ms(entry, index, tile_size)
+                light_ms += _render_ms({**entry, key: markup}, index, tile_size)
+        rows.append((tile_size, full, light, full_ms, light_ms))
+    return leveled, {"catalog": os.path.basename(path), "patterns": len(entries),
+                     "failures": failures, "seconds": elapsed, "rows": rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build level-of-detail variants of pattern geometry")
+    parser.add_argument("targets", nargs="*",
+                        help="catalog files or svgbackgrounds generator ids (default: shipped catalogs)")
+    parser.add_argument("--tile-sizes", type=int, nargs="+", default=list(DEFAULT_TILE_SIZES),
+                        help="rendered tile sizes in pixels, one level each (default: %(default)s)")
+    parser.add_argument("--tolerance-px", type=float, default=TOLERANCE_PX,
+                        help="allowed deviation in pixels at each level's tile size (default: %(default)s)")
+    parser.add_argument("--render", action="store_true",
+                        help="also time rasterizing full and simplified tiles at each size")
+    parser.add_argument("--output-dir", help="write catalogs with detailLevels here")
+    args = parser.parse_args()
+
+    targets = args.targets or default_catalog_paths()
+    generator_ids = [target for target in targets if not os.path.exists(target)]
+    if generator_ids:
+        from registry import get_pattern
+        for pattern_id in generator_ids:
+            handle = get_pattern(pattern_id)
+            levels = detail_levels(handle.data, args.tile_sizes, args.tolerance_px)
+            print(json.dumps({"id": pattern_id, "bytes": _size(handle.elements), "detailLevels": [
+                {"tileSize": level["tileSize"], "tolerance": level["tolerance"],
+                 "vertices": level["vertices"], "bytes": _size(level["svgPath"])} for level in levels]}))
+
+    header = (f"{'catalog':30} {'tile px':>7} {'bytes full':>10} {'lod':>10} {'saved':>6}"
+              + (f" {'render ms':>9} {'lod':>8} {'saved':>6}" if args.render else ""))
+    catalogs = [target for target in targets if os.path.exists(target)]
+    if catalogs:
+        print(header)
+        print("-" * len(header))
+    for path in catalogs:
+        leveled, report = catalog_report(path, args.tile_sizes, args.tolerance_px, args.render)
+        for tile_size, full, light, full_ms, light_ms in report["rows"]:
+            line = f"{report['catalog']:30} {tile_size:7} {full:10} {light:10} {1 - light / full:6.1%}"
+            if args.render:
+                line += f" {full_ms:9.1f} {light_ms:8.1f} {1 - light_ms / full_ms:6.1%}"
+            print(line)
+        print(f"{'':30} {report['patterns']} patterns leveled in {report['seconds']:.2f}s, "
+              f"{report['failures']} failed")
+        if args.output_dir:
+            os.makedirs(args.output_dir, exist_ok=True)
+            with open(path) as f:
+                data = json.load(f)
+            output = {**data, "patterns": leveled} if isinstance(data, dict) else leveled
+            with open(os.path.join(args.output_dir, os.path.basename(path)), "w") as f:
+                json.dump(output, f, separators=(",", ":"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Colour palette extraction and recolouring for pattern SVGs.
+
+A pattern is scanned once: every colour in a paint attribute (fill, stroke,
+stop-color, ...) or in a style declaration becomes a slot, slots with the
+same colour share one palette entry, and the document is compiled into a
+format template with one placeholder per palette entry. Recolouring maps at
+most one new value per palette entry and fills the template in a single
+str.format call, with no re-parse. Colours written with an alpha (rgba,
+hsla, #rrggbbaa) keep that alpha, as written, when replaced by an opaque
+colour, so translucent overlays stay translucent. Only colours written in
+the document, and recognized by the rasterizer's colour parser, are slots:
+shapes painted by the default black fill, or by the front end in stroke
+mode, have nothing to replace.
+
+Usage:
+    python palette.py radiant-grid                        # palette of a generator
+    python palette.py radiant-grid --map "#FF4500=#123456" --svg
+    python palette.py ../../public/heropatterns.json --bench 10000
+"""
+
+import argparse
+import colorsys
+import functools
+import json
+import os
+import re
+import time
+
+from raster import parse_color
+
+COLOR_PROPERTIES = ("fill", "stroke", "stop-color", "color", "flood-color", "lighting-color")
+NON_COLORS = ("none", "transparent", "currentcolor", "inherit", "initial", "unset")
+
+_TAG_RE = re.compile(r"<([A-Za-z][\w:.-]*)((?:[^>\"']|\"[^\"]*\"|'[^']*')*)>")
+_ATTR_RE = re.compile(r"([\w:.-]+)\s*=\s*(\"([^\"]*)\"|'([^']*)')")
+_DECLARATION_RE = re.compile(r"([\w-]+)\s*:\s*([^;]+)")
+_NUMBER_RE = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?%?")
+
+
+def color_key(value):
+    """Return the palette key of a paint value: its (r, g, b, a) rounded to 8 bits.
+
+    Returns None for no paint and for values the colour parser does not
+    recognize, so unknown names are left alone rather than read as black.
+    """
+    color = parse_color(value, unknown=None)
+    if color is None:
+        return None
+    return tuple(round(channel * 255) for channel in color)
+
+
+def format_color(key):
+    """Format an (r, g, b, a) key as #rrggbb, or rgba() when translucent"""
+    r, g, b, a = key
+    if a >= 255:
+        return f"#{r:02X}{g:02X}{b:02X}"
+    return f"rgba({r},{g},{b},{round(a / 255, 3):g})"
+
+
+def with_alpha(key, original):
+    """Format the (r, g, b) of a key with the alpha exactly as it is written in original"""
+    r, g, b = key[:3]
+    text = original.strip()
+    if text.startswith("#"):
+        digits = text[1:]
+        if len(digits) in (4, 8):
+            return f"#{r:02X}{g:02X}{b:02X}" + (digits[3] * 2 if len(digits) == 4 else digits[6:])
+    else:
+        numbers = _NUMBER_RE.findall(text)
+        if len(numbers) > 3:
+            return f"rgba({r},{g},{b},{numbers[3]})"
+    return format_color(key)
+
+
+def _is_color(value):
+    value = value.strip().lower()
+    return bool(value) and value not in NON_COLORS and not value.startswith("url(")
+
+
+def _slots(svg):
+    """Yield (start, end, element, tag, property) for every colour value in the document"""
+    for element, tag in enumerate(_TAG_RE.finditer(svg)):
+        name = tag.group(1)
+        for attr in _ATTR_RE.finditer(tag.group(2)):
+            prop = attr.group(1)
+            group = 3 if attr.group(3) is not None else 4
+            offset = tag.start(2) + attr.start(group)
+            value = attr.group(group)
+            if prop in COLOR_PROPERTIES and _is_color(value):
+                lead = len(value) - len(value.lstrip())
+                yield offset + lead, offset + len(value.rstrip()), element, name, prop
+            elif prop == "style":
+                for declaration in _DECLARATION_RE.finditer(value):
+                    declared = declaration.group(1).lower()
+                    text = declaration.group(2).rstrip()
+                    if declared in COLOR_PROPERTIES and _is_color(text):
+                        start = offset + declaration.start(2)
+                        yield start, start + len(text), element, name, declared
+
+
+class PatternPalette:
+    """A pattern compiled to a palette table and a recolouring template.
+
+    ``colors`` lists the palette keys in first-use order, ``originals`` the
+    text each entry was first written as, and ``slots[i]`` the
+    (element, tag, property) places palette entry i occupies.
+    """
+
+    def __init__(self, svg):
+        self.colors = []
+        self.originals = []
+        self.slots = []
+        self._slot_texts = []
+        index = {}
+        pieces = []
+        cursor = 0
+        for start, end, element, tag, prop in _slots(svg):
+            text = svg[start:end]
+            key = color_key(text)
+            if key is None:
+                continue
+            entry = index.get(key)
+            if entry is None:
+                entry = index[key] = len(self.colors)
+                self.colors.append(key)
+                self.originals.append(text)
+                self.slots.append([])
+                self._slot_texts.append(set())
+            self.slots[entry].append((element, tag, prop))
+            self._slot_texts[entry].add(text)
+            pieces.append(svg[cursor:start].replace("{", "{{").replace("}", "}}"))
+            pieces.append(f"{{{entry}}}")
+            cursor = end
+        pieces.append(svg[cursor:].replace("{", "{{").replace("}", "}}"))
+        self.template = "".join(pieces)
+        self._index = index
+
+    def __len__(self):
+        return len(self.colors)
+
+    def table(self):
+        """Return the palette as a list of dicts (hex/rgba value, slot count, slots)"""
+        return [{"index": i, "color": format_color(key), "original": original,
+                 "count": len(slots), "slots": slots}
+                for i, (key, original, slots) in enumerate(zip(self.colors, self.originals, self.slots))]
+
+    def index_of(self, color):
+        """Return the palette index of a colour value, or None if it is not used"""
+        return self._index.get(color_key(color))
+
+    def _value(self, entry, color, preserve_alpha):
+        key = color_key(color)
+        if key is None:
+            return color
+        alpha = self.colors[entry][3]
+        if preserve_alpha and key[3] == 255 and alpha < 255:
+            return with_alpha(key[:3] + (alpha,), self.originals[entry])
+        return color
+
+    def values(self, mapping=None, preserve_alpha=True):
+        """Return the per-entry values for a recolouring; mapping keys are indexes or colours"""
+        values = list(self.originals)
+        for entry, slot_texts in enumerate(self._slot_texts):
+            # Entries written several ways are normalized so every slot changes together
+            if len(slot_texts) > 1:
+                values[entry] = format_color(self.colors[entry])
+        for old, new in (mapping or {}).items():
+            entry = old if isinstance(old, int) else self.index_of(old)
+            if entry is not None:
+                values[entry] = self._value(entry, new, preserve_alpha)
+        return values
+
+    def render(self, values):
+        """Fill the template with one value per palette entry"""
+        return self.template.format(*values)
+
+    def recolor(self, mapping, preserve_alpha=True):
+        """Return the SVG with palette colours replaced ({old colour or index: new colour})"""
+        return self.render(self.values(mapping, preserve_alpha))
+
+    def recolor_many(self, palettes, preserve_alpha=True):
+        """Render one variant per palette; each palette is a full list of new colours by index"""
+        alphas = [key[3] for key in self.colors]
+        variants = []
+        for palette in palettes:
+            if preserve_alpha:
+                palette = [self._value(i, color, True) if alphas[i] < 255 else color
+                           for i, color in enumerate(palette)]
+            variants.append(self.template.format(*palette))
+        return variants
+
+
+@functools.lru_cache(maxsize=1024)
+def palette_for(svg):
+    """Return the (cached) PatternPalette of an SVG document"""
+    return PatternPalette(svg)
+
+
+def rotate_hue(colors, degrees):
+    """Return (r, g, b, a) palette keys formatted after rotating their hue"""
+    shifted = []
+    for r, g, b, a in colors:
+        h, lightness, s = colorsys.rgb_to_hls(r / 255, g / 255, b / 255)
+        nr, ng, nb = colorsys.hls_to_rgb((h + degrees / 360) % 1.0, lightness, s)
+        shifted.append(format_color((round(nr * 255), round(ng * 255), round(nb * 255), a)))
+    return shifted
+
+
+def hue_themes(palette, count):
+    """Return count full palettes spaced evenly around the hue circle"""
+    return [rotate_hue(palette.colors, 360 * i / count) for i in range(count)]
+
+
+def _load_svgs(target):
+    """Return [(id, svg)] for a generator id or a catalog file"""
+    if os.path.exists(target):
+        from catalogs import iter_catalog_records
+        return [(record["id"], record["svg"]) for record in iter_catalog_records(target)]
+    from registry import get_pattern
+    return [(target, get_pattern(target).svg)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract and replace pattern colour palettes")
+    parser.add_argument("target", help="svgbackgrounds generator id or catalog file")
+    parser.add_argument("--map", nargs="*", default=[], metavar="OLD=NEW",
+                        help="recolour: palette colour or index = new colour")
+    parser.add_argument("--svg", action="store_true", help="print the recoloured SVG")
+    parser.add_argument("--bench", type=int, metavar="N",
+                        help="time N hue-rotated variants per pattern")
+    args = parser.parse_args()
+
+    svgs = _load_svgs(args.target)
+    if args.bench:
+        start = time.perf_counter()
+        palettes = [PatternPalette(svg) for _, svg in svgs]
+        parsed = time.perf_counter()
+        themes = [hue_themes(palette, args.bench) for palette in palettes]
+        themed = time.perf_counter()
+        total = sum(len(palette.recolor_many(theme)) for palette, theme in zip(palettes, themes))
+        rendered = time.perf_counter()
+        print(f"{len(svgs)} patterns parsed in {parsed - start:.3f}s, "
+              f"{total} variants rendered in {rendered - themed:.3f}s "
+              f"({total / (rendered - themed):.0f}/s; theme colours took {themed - parsed:.3f}s)")
+        return
+
+    for pattern_id, svg in svgs:
+        palette = PatternPalette(svg)
+        if args.svg:
+            mapping = {}
+            for item in args.map:
+                old, new = item.split("=", 1)
+                mapping[int(old) if old.isdigit() else old] = new
+            print(palette.recolor(mapping))
+            continue
+        print(json.dumps({"id": pattern_id, "palette": [
+            {k: v for k, v in row.items() if k != "slots"} for row in palette.table()]}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,633 @@
+#!/usr/bin/env python3
+"""
+Path data compiler for the shipped catalogs.
+
+Rewrites SVG markup so it draws the same thing in fewer bytes:
+
+* path data is re-emitted with relative commands (absolute only where that
+  is shorter), H/V for axis-aligned lines and implicit repeated commands
+* coordinates are quantized to a configurable number of decimals, from
+  quantized absolute positions so rounding error never accumulates
+* runs of sibling shapes with an identical style are merged into a single
+  <path> when their bounding boxes are disjoint, so overlaps, winding and
+  translucency render exactly as before; boxes include the stroke each
+  shape inherits from its ancestors or sets in a style attribute
+
+Usage:
+    python path_compiler.py [catalog ...] [--precision 2] [--output-dir DIR]
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+import xml.etree.ElementTree as ET
+
+from catalogs import catalog_paths, load_catalog, normalize_entry, wrap_fragment
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+DEFAULT_PRECISION = 2
+ISLAMIC_CATALOG = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "islamic_patterns.json"))
+
+# Number of arguments each path command takes
+ARG_COUNTS = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6, "S": 4, "Q": 4, "T": 2, "A": 7, "Z": 0}
+
+# Presentation properties that decide how far a stroke reaches
+STROKE_PROPERTIES = ("stroke", "stroke-width")
+
+GEOMETRY_ATTRS = {
+    "path": {"d"},
+    "rect": {"x", "y", "width", "height"},
+    "circle": {"cx", "cy", "r"},
+    "ellipse": {"cx", "cy", "rx", "ry"},
+    "line": {"x1", "y1", "x2", "y2"},
+    "polyline": {"points"},
+    "polygon": {"points"},
+}
+
+
+# Parsing
+
+def _scan_number(d, i):
+    """Read one number starting at or after i; returns (value, next index)"""
+    n = len(d)
+    while i < n and d[i] in " \t\r\n,":
+        i += 1
+    start = i
+    if i < n and d[i] in "+-":
+        i += 1
+    seen_dot = False
+    while i < n and (d[i].isdigit() or (d[i] == "." and not seen_dot)):
+        seen_dot = seen_dot or d[i] == "."
+        i += 1
+    if i < n and d[i] in "eE" and i + 1 < n and (d[i + 1].isdigit() or d[i + 1] in "+-"):
+        i += 2
+        while i < n and d[i].isdigit():
+            i += 1
+    if i == start:
+        raise ValueError(f"expected a number at {start} in path data")
+    return float(d[start:i]), i
+
+
+def _scan_flag(d, i):
+    """Read one arc flag, which may be written without a separator"""
+    n = len(d)
+    while i < n and d[i] in " \t\r\n,":
+        i += 1
+    if i >= n or d[i] not in "01":
+        raise ValueError(f"expected an arc flag at {i} in path data")
+    return float(d[i]), i + 1
+
+
+def parse_path(d):
+    """Parse path data into [(command letter, [numbers])], one entry per segment"""
+    segments = []
+    i, n = 0, len(d)
+    cmd = None
+    while True:
+        while i < n and d[i] in " \t\r\n,":
+            i += 1
+        if i >= n:
+            return segments
+        if d[i].isalpha():
+            cmd = d[i]
+            i += 1
+            if cmd.upper() == "Z":
+                segments.append((cmd, []))
+                continue
+        elif cmd is None or cmd.upper() == "Z":
+            raise ValueError(f"path data must start with a command: {d[:20]!r}")
+        args = []
+        for k in range(ARG_COUNTS[cmd.upper()]):
+            if cmd.upper() == "A" and k in (3, 4):
+                value, i = _scan_flag(d, i)
+            else:
+                value, i = _scan_number(d, i)
+            args.append(value)
+        segments.append((cmd, args))
+        # Extra coordinate pairs after a moveto are linetos
+        if cmd in "Mm":
+            cmd = "L" if cmd == "M" else "l"
+
+
+def absolutize(segments):
+    """Convert parsed segments to absolute commands; H and V become L"""
+    out = []
+    x = y = start_x = start_y = 0.0
+    for cmd, args in segments:
+        upper = cmd.upper()
+        rel = cmd != upper
+        if upper == "Z":
+            out.append(("Z", []))
+            x, y = start_x, start_y
+            continue
+        if upper == "H":
+            x = args[0] + (x if rel else 0)
+            out.append(("L", [x, y]))
+            continue
+        if upper == "V":
+            y = args[0] + (y if rel else 0)
+            out.append(("L", [x, y]))
+            continue
+        if upper == "A":
+            ex, ey = args[5], args[6]
+            if rel:
+                ex, ey = ex + x, ey + y
+            out.append(("A", args[:5] + [ex, ey]))
+            x, y = ex, ey
+            continue
+        coords = list(args)
+        if rel:
+            coords = [c + (y if k % 2 else x) for k, c in enumerate(coords)]
+        out.append((upper, coords))
+        x, y = coords[-2], coords[-1]
+        if upper == "M":
+            start_x, start_y = x, y
+    return out
+
+
+def _points(value):
+    """Parse a points attribute into [(x, y)]"""
+    numbers = []
+    i = 0
+    value = value.strip()
+    while i < len(value):
+        number, i = _scan_number(value, i)
+        numbers.append(number)
+        while i < len(value) and value[i] in " \t\r\n,":
+            i += 1
+    return list(zip(numbers[0::2], numbers[1::2]))
+
+
+def _num(attrs, name):
+    """Read a plain numeric attribute, or None if it has units or is missing"""
+    try:
+        return float(attrs.get(name, "0"))
+    except ValueError:
+        return None
+
+
+def shape_commands(tag, attrs):
+    """Return absolute path commands that draw a shape, or None if unsupported"""
+    if tag == "path":
+        return absolutize(parse_path(attrs.get("d", "")))
+    if tag == "rect":
+        if "rx" in attrs or "ry" in attrs:
+            return None
+        x, y, w, h = (_num(attrs, k) for k in ("x", "y", "width", "height"))
+        if None in (x, y, w, h) or w <= 0 or h <= 0:
+            return None
+        return [("M", [x, y]), ("L", [x + w, y]), ("L", [x + w, y + h]),
+                ("L", [x, y + h]), ("Z", [])]
+    if tag in ("circle", "ellipse"):
+        cx, cy = _num(attrs, "cx"), _num(attrs, "cy")
+        if tag == "circle":
+            rx = ry = _num(attrs, "r")
+        else:
+            rx, ry = _num(attrs, "rx"), _num(attrs, "ry")
+        if None in (cx, cy, rx, ry) or rx <= 0 or ry <= 0:
+            return None
+        return [("M", [cx - rx, cy]),
+                ("A", [rx, ry, 0, 1, 0, cx + rx, cy]),
+                ("A", [rx, ry, 0, 1, 0, cx - rx, cy]), ("Z", [])]
+    if tag == "line":
+        coords = [_num(attrs, k) for k in ("x1", "y1", "x2", "y2")]
+        if None in coords:
+            return None
+        return [("M", coords[:2]), ("L", coords[2:])]
+    if tag in ("polyline", "polygon"):
+        points = _points(attrs.get("points", ""))
+        if not points:
+            return None
+        commands = [("M", list(points[0]))] + [("L", list(p)) for p in points[1:]]
+        return commands + [("Z", [])] if tag == "polygon" else commands
+    return None
+
+
+# Serialization
+
+def fmt_number(value, precision):
+    """Format a number minimally: no trailing zeros, no leading zero"""
+    value = round(value, precision)
+    if value == int(value):
+        return str(int(value))
+    text = f"{value:.{precision}f}".rstrip("0")
+    if text.startswith("0."):
+        return text[1:]
+    if text.startswith("-0."):
+        return "-" + text[2:]
+    return text
+
+
+def _needs_separator(prev, text):
+    """Return True if a space must separate two adjacent numbers"""
+    if text.startswith("-"):
+        return False
+    return not (text.startswith(".") and "." in prev)
+
+
+def compile_commands(commands, precision=DEFAULT_PRECISION):
+    """Serialize absolute commands as minified path data"""
+    scale = 10 ** precision
+
+    def q(v):
+        return round(v * scale) / scale
+
+    out = []
+    prev_letter = prev_number = None
+    x = y = start_x = start_y = 0.0
+    for cmd, args in commands:
+        if cmd == "Z":
+            letter, numbers = "z", []
+            x, y = start_x, start_y
+        else:
+            if cmd == "A":
+                abs_args = [q(args[0]), q(args[1]), round(args[2], precision),
+                            int(args[3]), int(args[4]), q(args[5]), q(args[6])]
+                rel_args = abs_args[:5] + [round(abs_args[5] - x, precision),
+                                           round(abs_args[6] - y, precision)]
+            else:
+                abs_args = [q(v) for v in args]
+                rel_args = [round(v - (y if k % 2 else x), precision)
+                            for k, v in enumerate(abs_args)]
+            letter = cmd
+            if cmd == "L" and rel_args[1] == 0:
+                letter, abs_args, rel_args = "H", abs_args[:1], rel_args[:1]
+            elif cmd == "L" and rel_args[0] == 0:
+                letter, abs_args, rel_args = "V", abs_args[1:], rel_args[1:]
+
+            abs_text = [fmt_number(v, precision) for v in abs_args]
+            rel_text = [fmt_number(v, precision) for v in rel_args]
+            if sum(map(len, abs_text)) < sum(map(len, rel_text)) or not out:
+                numbers = abs_text
+            else:
+                letter, numbers = letter.lower(), rel_text
+
+            if cmd == "M":
+                x, y = abs_args[0], abs_args[1]
+                start_x, start_y = x, y
+            elif letter in "Hh":
+                x = abs_args[0]
+            elif letter in "Vv":
+                y = abs_args[0]
+            else:
+                x, y = abs_args[-2], abs_args[-1]
+
+        # A repeated command letter can be omitted (never for moveto)
+        if letter != prev_letter or letter in "Mmz":
+            out.append(letter)
+            prev_number = None
+        for text in numbers:
+            if prev_number is not None and _needs_separator(prev_number, text):
+                out.append(" ")
+            out.append(text)
+            prev_number = text
+        prev_letter = letter
+    return "".join(out)
+
+
+def compile_d(d, precision=DEFAULT_PRECISION):
+    """Compile one path data string"""
+    return compile_commands(absolutize(parse_path(d)), precision)
+
+
+def arc_extent(x0, y0, args):
+    """Return the exact (min_x, min_y, max_x, max_y) of an absolute arc from (x0, y0)"""
+    rx, ry, phi, large, sweep, x1, y1 = args
+    xs, ys = [x0, x1], [y0, y1]
+    rx, ry = abs(rx), abs(ry)
+    if not rx or not ry or (x0, y0) == (x1, y1):
+        return min(xs), min(ys), max(xs), max(ys)
+    # Endpoint to center parameterization, SVG 1.1 implementation notes F.6.5
+    cos_phi, sin_phi = math.cos(math.radians(phi)), math.sin(math.radians(phi))
+    hx, hy = (x0 - x1) / 2, (y0 - y1) / 2
+    px = cos_phi * hx + sin_phi * hy
+    py = -sin_phi * hx + cos_phi * hy
+    scale = (px / rx) ** 2 + (py / ry) ** 2
+    if scale > 1:
+        rx, ry = rx * math.sqrt(scale), ry * math.sqrt(scale)
+    num = (rx * ry) ** 2 - (rx * py) ** 2 - (ry * px) ** 2
+    den = (rx * py) ** 2 + (ry * px) ** 2
+    coef = math.sqrt(max(0.0, num / den))
+    if bool(large) == bool(sweep):
+        coef = -coef
+    ccx, ccy = coef * rx * py / ry, -coef * ry * px / rx
+    cx = cos_phi * ccx - sin_phi * ccy + (x0 + x1) / 2
+    cy = sin_phi * ccx + cos_phi * ccy + (y0 + y1) / 2
+    start = math.atan2((py - ccy) / ry, (px - ccx) / rx)
+    delta = math.atan2((-py - ccy) / ry, (-px - ccx) / rx) - start
+    if sweep and delta < 0:
+        delta += 2 * math.pi
+    elif not sweep and delta > 0:
+        delta -= 2 * math.pi
+
+    # Angles where x or y is extreme on the full ellipse; keep those on the arc
+    tx = math.atan2(-ry * sin_phi, rx * cos_phi)
+    ty = math.atan2(ry * cos_phi, rx * sin_phi)
+    for t in (tx, tx + math.pi, ty, ty + math.pi):
+        offset = (t - start) % (2 * math.pi) if delta > 0 else (start - t) % (2 * math.pi)
+        if offset <= abs(delta):
+            xs.append(cx + rx * cos_phi * math.cos(t) - ry * sin_phi * math.sin(t))
+            ys.append(cy + rx * sin_phi * math.cos(t) + ry * cos_phi * math.sin(t))
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _bbox(commands, pad):
+    """Return a conservative (min_x, min_y, max_x, max_y) of absolute path commands.
+
+    Arcs are bounded exactly; curves by their control points.
+    """
+    xs, ys = [], []
+    x = y = 0.0
+    start = (0.0, 0.0)
+    for cmd, args in commands:
+        if cmd == "A":
+            ax0, ay0, ax1, ay1 = arc_extent(x, y, args)
+            xs += [ax0, ax1]
+            ys += [ay0, ay1]
+        elif args:
+            xs += args[0::2]
+            ys += args[1::2]
+        if cmd == "M":
+            start = args[0], args[1]
+        if cmd == "Z":
+            x, y = start
+        elif args:
+            x, y = args[-2], args[-1]
+    if not xs:
+        return None
+    return (min(xs) - pad, min(ys) - pad, max(xs) + pad, max(ys) + pad)
+
+
+def _overlaps(a, b):
+    """Return True if two boxes intersect"""
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+# Tree compilation
+
+def _local(name):
+    """Strip a namespace from an ElementTree name, keeping xlink: prefixes"""
+    if name.startswith("{" + XLINK_NS + "}"):
+        return "xlink:" + name.split("}", 1)[1]
+    return name.split("}", 1)[1] if name.startswith("{") else name
+
+
+def _style_key(tag, attrs):
+    """Return the attributes that determine how a shape is painted"""
+    geometry = GEOMETRY_ATTRS[tag]
+    return tuple(sorted((k, v) for k, v in attrs.items() if k not in geometry))
+
+
+def merge_style(attrs):
+    """Merge a style attribute's declarations over the element's attributes"""
+    style = attrs.get("style")
+    if not style:
+        return attrs
+    merged = dict(attrs)
+    for declaration in style.split(";"):
+        if ":" in declaration:
+            name, value = declaration.split(":", 1)
+            merged[name.strip()] = value.strip()
+    return merged
+
+
+def stroke_paint(attrs, inherited=None):
+    """Return the stroke properties in effect on an element.
+
+    ``inherited`` is the result for its parent; the element's own
+    attributes and style declarations override it.
+    """
+    paint = dict(inherited or {})
+    attrs = merge_style(attrs)
+    for name in STROKE_PROPERTIES:
+        value = attrs.get(name, "inherit").strip()
+        if value != "inherit":
+            paint[name] = value
+    return paint
+
+
+def _stroke_pad(paint):
+    """Return half the stroke width, the distance a stroke extends past the geometry.
+
+    ``paint`` is the element's resolved stroke_paint().
+    """
+    if paint.get("stroke", "none") == "none":
+        return 0.0
+    try:
+        return float(paint.get("stroke-width", "1")) / 2 + 0.5
+    except ValueError:
+        return 5.0
+
+
+def _flush_run(run, precision):
+    """Return replacement children for a run of same-style sibling shapes"""
+    if len(run) == 1:
+        child, commands, _ = run[0]
+        if child.tag == "path":
+            child.set("d", compile_commands(commands, precision))
+        return [child]
+    merged = ET.Element("path")
+    for key, value in run[0][0].attrib.items():
+        if key not in GEOMETRY_ATTRS[run[0][0].tag]:
+            merged.set(key, value)
+    merged.set("d", compile_commands([c for _, commands, _ in run for c in commands], precision))
+    merged.tail = run[-1][0].tail
+    return [merged]
+
+
+def compile_element(elem, precision=DEFAULT_PRECISION, inherited=None):
+    """Compile an element's subtree in place.
+
+    ``inherited`` is the stroke paint the element's parent passes down.
+    """
+    paint = stroke_paint(elem.attrib, inherited)
+    children = list(elem)
+    for child in children:
+        child.tag = _local(child.tag)
+        child.attrib = {_local(k): v for k, v in child.attrib.items()}
+        if child.tag not in GEOMETRY_ATTRS:
+            compile_element(child, precision, paint)
+
+    compiled = []
+    run = []
+    run_key = None
+    for child in children:
+        commands = None
+        if child.tag in GEOMETRY_ATTRS and "id" not in child.attrib and not len(child):
+            try:
+                commands = shape_commands(child.tag, child.attrib)
+            except ValueError:
+                commands = None
+        if commands is None:
+            if run:
+                compiled.extend(_flush_run(run, precision))
+                run, run_key = [], None
+            compiled.append(child)
+            continue
+
+        key = _style_key(child.tag, child.attrib)
+        box = _bbox(commands, _stroke_pad(stroke_paint(child.attrib, paint)))
+        fits = (key == run_key and box is not None and
+                all(b is not None and not _overlaps(box, b) for _, _, b in run))
+        if run and not fits:
+            compiled.extend(_flush_run(run, precision))
+            run = []
+        run.append((child, commands, box))
+        run_key = key
+    if run:
+        compiled.extend(_flush_run(run, precision))
+
+    for child in children:
+        elem.remove(child)
+    elem.extend(compiled)
+
+
+def _escape(value):
+    """Escape an attribute value for single-quoted output"""
+    return (value.replace("&", "&amp;").replace("<", "&lt;")
+            .replace("'", "&apos;"))
+
+
+def _escape_text(value):
+    """Escape element text"""
+    return value.replace("&", "&amp;").replace("<", "&lt;")
+
+
+def serialize(elem):
+    """Serialize an element minimally, dropping whitespace-only text.
+
+    Attributes are single-quoted so the markup needs no escaping inside JSON.
+    """
+    attrs = "".join(f" {k}='{_escape(v)}'" for k, v in elem.attrib.items())
+    text = elem.text if elem.text and elem.text.strip() else ""
+    inner = _escape_text(text) + "".join(serialize(child) for child in elem)
+    tail = elem.tail if elem.tail and elem.tail.strip() else ""
+    if inner:
+        return f"<{elem.tag}{attrs}>{inner}</{elem.tag}>" + _escape_text(tail)
+    return f"<{elem.tag}{attrs}/>" + _escape_text(tail)
+
+
+def compile_svg(svg_text, precision=DEFAULT_PRECISION):
+    """Compile a complete SVG document"""
+    root = ET.fromstring(svg_text)
+    root.tag = _local(root.tag)
+    root.attrib = {_local(k): v for k, v in root.attrib.items()}
+    compile_element(root, precision)
+    root.attrib = {"xmlns": SVG_NS, **{k: v for k, v in root.attrib.items() if k != "xmlns"}}
+    markup = serialize(root)
+    if "xlink:" in markup and "xmlns:xlink" not in root.attrib:
+        markup = markup.replace("<svg ", f"<svg xmlns:xlink='{XLINK_NS}' ", 1)
+    return markup
+
+
+def compile_fragment(elements, precision=DEFAULT_PRECISION):
+    """Compile a list of sibling element strings; returns the compiled list"""
+    root = ET.fromstring(wrap_fragment("".join(elements), 0, 0))
+    compile_element(root, precision)
+    return [serialize(child) for child in root]
+
+
+def compile_svg_path(svg_path, precision=DEFAULT_PRECISION):
+    """Compile a catalog svgPath value, keeping its shape (string, "~" list, list)"""
+    if isinstance(svg_path, list):
+        return compile_fragment(svg_path, precision)
+    if svg_path.lstrip().startswith(("<svg", "<?xml", "<ns0:svg")):
+        return compile_svg(svg_path, precision)
+    compiled = compile_fragment([svg_path.replace("~", "")], precision)
+    return ("~" if "~" in svg_path else "").join(compiled)
+
+
+def compile_catalog_data(data, precision=DEFAULT_PRECISION):
+    """Return a compiled copy of parsed catalog JSON and the number of failures"""
+    entries = data.get("patterns", []) if isinstance(data, dict) else data
+    compiled = []
+    failures = 0
+    for entry in entries:
+        entry = dict(entry)
+        try:
+            if "image" in entry:
+                entry["image"] = compile_svg(entry["image"], precision)
+            elif "svgPath" in entry:
+                entry["svgPath"] = compile_svg_path(entry["svgPath"], precision)
+        except (ET.ParseError, ValueError):
+            failures += 1
+        compiled.append(entry)
+    if isinstance(data, dict):
+        return {**data, "patterns": compiled}, failures
+    return compiled, failures
+
+
+def _parse_time(text, repeat=3):
+    """Best-of time to load catalog JSON and parse every pattern's SVG"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = json.loads(text)
+        entries = data.get("patterns", []) if isinstance(data, dict) else data
+        for index, entry in enumerate(entries):
+            try:
+                ET.fromstring(normalize_entry(entry, "", index)["svg"])
+            except ET.ParseError:
+                pass
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def compile_catalog(path, precision=DEFAULT_PRECISION, indent=None):
+    """Compile one catalog file; returns (compiled data, report dict).
+
+    The compiled JSON is written without whitespace unless ``indent`` is set.
+    """
+    with open(path) as f:
+        original = f.read()
+    compiled, failures = compile_catalog_data(json.loads(original), precision)
+    separators = (",", ":") if indent is None else None
+    output = json.dumps(compiled, indent=indent, separators=separators)
+    return compiled, {
+        "catalog": os.path.basename(path),
+        "patterns": len(load_catalog(path)[1]),
+        "failures": failures,
+        "bytes_before": len(original.encode("utf-8")),
+        "bytes_after": len(output.encode("utf-8")),
+        "parse_ms_before": _parse_time(original) * 1000,
+        "parse_ms_after": _parse_time(output) * 1000,
+        "output": output,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile and minify catalog path data")
+    parser.add_argument("catalogs", nargs="*",
+                        help="catalog files (default: public/ catalogs and the islamic catalog)")
+    parser.add_argument("--precision", type=int, default=DEFAULT_PRECISION,
+                        help="decimal places kept in coordinates (default: %(default)s)")
+    parser.add_argument("--indent", type=int, default=None,
+                        help="pretty-print the compiled JSON (default: compact)")
+    parser.add_argument("--output-dir", help="write compiled catalogs here")
+    args = parser.parse_args()
+
+    paths = args.catalogs or catalog_paths() + [ISLAMIC_CATALOG]
+    header = (f"{'catalog':30} {'bytes before':>12} {'after':>10} {'saved':>6} "
+              f"{'parse ms':>9} {'after':>8} {'saved':>6} {'failed':>6}")
+    print(header)
+    print("-" * len(header))
+    for path in paths:
+        _, report = compile_catalog(path, args.precision, args.indent)
+        before, after = report["bytes_before"], report["bytes_after"]
+        t_before, t_after = report["parse_ms_before"], report["parse_ms_after"]
+        print(f"{report['catalog']:30} {before:12} {after:10} {1 - after / before:6.1%} "
+              f"{t_before:9.2f} {t_after:8.2f} {1 - t_after / t_before:6.1%} "
+              f"{report['failures']:6}")
+        if args.output_dir:
+            os.makedirs(args.output_dir, exist_ok=True)
+            with open(os.path.join(args.output_dir, os.path.basename(path)), 'w') as f:
+                f.write(report["output"])
+
+
+if __name__ == "__main__":
+    main()
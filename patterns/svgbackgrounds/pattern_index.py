@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Inverted tag and name index over all pattern catalogs.
+
+Builds a prebuilt, serializable index mapping each tag and each name token
+to the patterns that carry it. Tags are normalized and de-duplicated per
+pattern. Lookups are dictionary hits; prefix search bisects a sorted term
+list and fuzzy search (one edit) goes through a deletion-neighbourhood
+table, so queries never scan the corpus.
+
+Usage:
+    python pattern_index.py build -o pattern_index.json
+    python pattern_index.py query pattern_index.json --tag waves --name "wave 1"
+"""
+
+import argparse
+import bisect
+import json
+import re
+import time
+
+from catalogs import catalog_keys, default_catalog_paths, iter_catalog_records
+
+INDEX_VERSION = 1
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_tag(tag):
+    """Normalize a tag for indexing"""
+    return " ".join(str(tag).lower().split())
+
+
+def name_tokens(name):
+    """Split a display name into lowercase word tokens"""
+    return _TOKEN_RE.findall(name.lower())
+
+
+def _deletions(term):
+    """Return term and every string one deletion away from it"""
+    return {term} | {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def _edit_distance_at_most_one(a, b):
+    """Return True if a and b differ by at most one insert, delete or substitution"""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = j = edits = 0
+    while i < len(a) and j < len(b):
+        if a[i] != b[j]:
+            edits += 1
+            if edits > 1:
+                return False
+            if len(a) == len(b):
+                i += 1
+        else:
+            i += 1
+        j += 1
+    return edits + (len(b) - j) + (len(a) - i) <= 1
+
+
+class PatternIndex:
+    """Tag and name-token postings over a list of pattern summaries"""
+
+    def __init__(self, patterns, tags, tokens):
+        self.patterns = patterns
+        self.tags = tags
+        self.tokens = tokens
+        self._sorted = {"tags": sorted(tags), "tokens": sorted(tokens)}
+        self._deletion_table = {}
+
+    @classmethod
+    def build(cls, records):
+        """Build an index from (catalog key, record) pairs"""
+        patterns = []
+        tags = {}
+        tokens = {}
+        for catalog_key, record in records:
+            index = len(patterns)
+            record_tags = list(dict.fromkeys(
+                normalize_tag(tag) for tag in record.get("tags", []) if str(tag).strip()
+            ))
+            patterns.append({
+                "id": f"{catalog_key}:{record['id']}",
+                "name": record["name"],
+                "source": record.get("source", catalog_key),
+                "tags": record_tags,
+            })
+            for tag in record_tags:
+                tags.setdefault(tag, []).append(index)
+            for token in dict.fromkeys(name_tokens(record["name"])):
+                tokens.setdefault(token, []).append(index)
+        return cls(patterns, tags, tokens)
+
+    # Serialization
+
+    def to_dict(self):
+        return {"version": INDEX_VERSION, "patterns": self.patterns,
+                "tags": self.tags, "tokens": self.tokens}
+
+    def save(self, path):
+        """Write the index as compact JSON"""
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path):
+        """Load an index written by save()"""
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"unsupported index version {data.get('version')!r}")
+        return cls(data["patterns"], data["tags"], data["tokens"])
+
+    # Queries (all return sorted pattern positions)
+
+    def _postings(self, kind):
+        return self.tags if kind == "tags" else self.tokens
+
+    def exact(self, term, kind="tags"):
+        """Patterns with exactly this tag or name token"""
+        key = normalize_tag(term) if kind == "tags" else term.lower()
+        return list(self._postings(kind).get(key, ()))
+
+    def prefix(self, prefix, kind="tags"):
+        """Patterns with a tag or name token starting with prefix"""
+        prefix = prefix.lower()
+        terms = self._sorted[kind]
+        start = bisect.bisect_left(terms, prefix)
+        end = bisect.bisect_left(terms, prefix + "\uffff")
+        postings = self._postings(kind)
+        return sorted({i for term in terms[start:end] for i in postings[term]})
+
+    def fuzzy_terms(self, term, kind="tags"):
+        """Indexed terms within one edit of term"""
+        term = term.lower()
+        table = self._deletion_table.get(kind)
+        if table is None:
+            table = self._deletion_table[kind] = {}
+            for known in self._postings(kind):
+                for variant in _deletions(known):
+                    table.setdefault(variant, set()).add(known)
+        candidates = set()
+        for variant in _deletions(term):
+            candidates |= table.get(variant, set())
+        return sorted(c for c in candidates if _edit_distance_at_most_one(term, c))
+
+    def fuzzy(self, term, kind="tags"):
+        """Patterns with a tag or name token within one edit of term"""
+        postings = self._postings(kind)
+        return sorted({i for t in self.fuzzy_terms(term, kind) for i in postings[t]})
+
+    def search(self, tags=(), name=None, fuzzy=False):
+        """Patterns matching every tag and every token of name"""
+        lookup = self.fuzzy if fuzzy else self.exact
+        results = None
+        for tag in tags:
+            matched = set(lookup(tag, "tags"))
+            results = matched if results is None else results & matched
+        for token in name_tokens(name or ""):
+            matched = set(lookup(token, "tokens"))
+            results = matched if results is None else results & matched
+        return sorted(results or ())
+
+    def ids(self, positions):
+        """Map pattern positions to pattern ids"""
+        return [self.patterns[i]["id"] for i in positions]
+
+
+def iter_indexable_records(paths=None):
+    """Yield (catalog key, record) pairs from catalog files"""
+    paths = paths or default_catalog_paths()
+    for path, catalog_key in zip(paths, catalog_keys(paths)):
+        for record in iter_catalog_records(path):
+            yield catalog_key, record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and query the pattern tag/name index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="build an index from catalog files")
+    build.add_argument("catalogs", nargs="*",
+                       help="catalog files (default: the catalogs in public/ and the svgbackgrounds output)")
+    build.add_argument("-o", "--output", default="pattern_index.json")
+    query = subparsers.add_parser("query", help="query a built index")
+    query.add_argument("index")
+    query.add_argument("--tag", action="append", default=[])
+    query.add_argument("--name")
+    query.add_argument("--prefix", help="tag prefix")
+    query.add_argument("--fuzzy", action="store_true", help="allow one edit per term")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        index = PatternIndex.build(iter_indexable_records(args.catalogs))
+        index.save(args.output)
+        print(f"Indexed {len(index.patterns)} patterns, {len(index.tags)} tags, "
+              f"{len(index.tokens)} name tokens into {args.output}")
+        return
+
+    index = PatternIndex.load(args.index)
+    start = time.perf_counter()
+    if args.prefix:
+        positions = index.prefix(args.prefix)
+    else:
+        positions = index.search(args.tag, args.name, args.fuzzy)
+    elapsed = time.perf_counter() - start
+    for pattern_id in index.ids(positions):
+        print(pattern_id)
+    print(f"{len(positions)} patterns in {elapsed * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""
+Pure-Python CPU rasterizer for pattern tiles.
+
+Shapes come from extract_svg_data and are flattened to polygons through the
+path compiler's absolute commands (curves and arcs become line segments).
+Fills are scan-converted with supersampled scanlines and exact horizontal
+span coverage; strokes are drawn as one consistently wound quad per segment
+so overlapping segments union under the nonzero rule. Each tile is rendered
+once and repeated to fill the output.
+
+Supported: paths and basic shapes, fill/stroke colours (hex, rgb[a], hsl[a],
+common names) with their opacities, nonzero/evenodd fill rules, gradients
+(approximated by their average stop colour) and the catalog stroke modes,
+drawn as unfilled black outlines like the web front end. Not supported:
+transforms, dashes, joins and caps, clip paths and masks.
+"""
+
+import math
+import re
+import struct
+import zlib
+
+from compositor import STROKE_MODES, mode_paint
+from create_svg_patterns import extract_svg_data
+from path_compiler import merge_style, shape_commands
+
+SUBSAMPLES = 4
+MIN_STROKE_PX = 0.5
+
+NAMED_COLORS = {
+    "black": (0, 0, 0), "white": (255, 255, 255), "red": (255, 0, 0),
+    "green": (0, 128, 0), "blue": (0, 0, 255), "yellow": (255, 255, 0),
+    "gray": (128, 128, 128), "grey": (128, 128, 128), "orange": (255, 165, 0),
+    "purple": (128, 0, 128), "silver": (192, 192, 192), "navy": (0, 0, 128),
+}
+_NUMBERS_RE = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?%?")
+_URL_RE = re.compile(r"url\(\s*#([^)\s]+)\s*\)")
+
+
+# Paint
+
+def _channel(text):
+    if text.endswith("%"):
+        return float(text[:-1]) * 2.55
+    return float(text)
+
+
+def _hsl_to_rgb(h, s, l):
+    c = (1 - abs(2 * l - 1)) * s
+    x = c * (1 - abs((h / 60) % 2 - 1))
+    m = l - c / 2
+    r, g, b = [(c, x, 0), (x, c, 0), (0, c, x), (0, x, c), (x, 0, c), (c, 0, x)][int(h // 60) % 6]
+    return (r + m) * 255, (g + m) * 255, (b + m) * 255
+
+
+def paint_url(value):
+    """Return the id a url(#id) paint value refers to, or None"""
+    url = _URL_RE.match((value or "").strip())
+    return url.group(1) if url else None
+
+
+def parse_color(value, gradients=None, unknown=(0.0, 0.0, 0.0, 1.0)):
+    """Parse a paint value into (r, g, b, a) floats in 0..1, or None for no paint.
+
+    Values that are not a recognized colour parse as ``unknown``, black by
+    default.
+    """
+    value = (value or "").strip()
+    lowered = value.lower()
+    if not value or lowered in ("none", "transparent"):
+        return None
+    gradient_id = paint_url(value)
+    if gradient_id is not None:
+        return (gradients or {}).get(gradient_id)
+    if lowered == "currentcolor":
+        return (0.0, 0.0, 0.0, 1.0)
+    if value.startswith("#"):
+        digits = value[1:]
+        if len(digits) in (3, 4):
+            digits = "".join(c * 2 for c in digits)
+        try:
+            channels = [int(digits[i:i + 2], 16) / 255 for i in range(0, len(digits), 2)]
+        except ValueError:
+            return unknown
+        return tuple(channels[:4]) if len(channels) == 4 else tuple(channels[:3]) + (1.0,)
+    if lowered.startswith(("rgb", "hsl")):
+        numbers = _NUMBERS_RE.findall(value)
+        if len(numbers) < 3:
+            return unknown
+        alpha = 1.0
+        if len(numbers) > 3:
+            alpha = float(numbers[3].rstrip("%")) / (100 if numbers[3].endswith("%") else 1)
+        if lowered.startswith("hsl"):
+            rgb = _hsl_to_rgb(float(numbers[0].rstrip("%")) % 360,
+                              float(numbers[1].rstrip("%")) / 100,
+                              float(numbers[2].rstrip("%")) / 100)
+        else:
+            rgb = [_channel(n) for n in numbers[:3]]
+        r, g, b = (min(255.0, max(0.0, c)) / 255 for c in rgb)
+        return (r, g, b, min(1.0, max(0.0, alpha)))
+    rgb = NAMED_COLORS.get(lowered)
+    if rgb is None:
+        return unknown
+    return (rgb[0] / 255, rgb[1] / 255, rgb[2] / 255, 1.0)
+
+
+def parse_fraction(value, default=1.0):
+    """Parse an opacity or stop offset ("0.5", " 50% ") clamped to 0..1.
+
+    Missing or malformed values parse as ``default``.
+    """
+    value = (value or "").strip()
+    try:
+        fraction = float(value[:-1]) / 100 if value.endswith("%") else float(value)
+    except ValueError:
+        return default
+    return min(1.0, max(0.0, fraction))
+
+
+def gradient_colors(gradients):
+    """Map gradient ids to the average colour of their stops"""
+    colors = {}
+    for gradient in gradients:
+        stops = []
+        for stop in gradient.get("stops", []):
+            stop = merge_style(stop)
+            color = parse_color(stop.get("stop-color", "black"))
+            if color is not None:
+                stops.append(color[:3] + (color[3] * parse_fraction(stop.get("stop-opacity")),))
+        gradient_id = gradient["attrs"].get("id")
+        if gradient_id and stops:
+            colors[gradient_id] = tuple(sum(c[i] for c in stops) / len(stops) for i in range(4))
+    return colors
+
+
+def shape_paint(record, gradients):
+    """Return (fill, fill_rule, stroke, stroke_width) for a shape record"""
+    attrs = merge_style({**record["inherited"], **record["attrs"]})
+    opacity = parse_fraction(attrs.get("opacity"))
+    fill = parse_color(attrs.get("fill", "black"), gradients)
+    if fill is not None:
+        fill = fill[:3] + (fill[3] * opacity * parse_fraction(attrs.get("fill-opacity")),)
+    stroke = parse_color(attrs.get("stroke"), gradients)
+    if stroke is not None:
+        stroke = stroke[:3] + (stroke[3] * opacity * parse_fraction(attrs.get("stroke-opacity")),)
+    width = _NUMBERS_RE.match(attrs.get("stroke-width", "1").strip())
+    return fill, attrs.get("fill-rule", "nonzero"), stroke, float(width.group().rstrip("%")) if width else 1.0
+
+
+def mode_override(mode):
+    """Return the (fill, stroke, stroke_width) a catalog mode forces on every shape, or None.
+
+    Stroke modes are drawn with the compositor's paint: unfilled outlines at
+    its default stroke width.
+    """
+    if mode not in STROKE_MODES:
+        return None
+    paint = mode_paint(mode)
+    return parse_color(paint["fill"]), parse_color(paint["stroke"]), float(paint["stroke-width"])
+
+
+# Geometry
+
+def _segments_for(length_px):
+    return max(2, min(64, int(length_px / 3) + 2))
+
+
+def _arc_points(x0, y0, rx, ry, phi, large, sweep, x1, y1, scale):
+    """Flatten an SVG endpoint arc to points (excluding the start point)"""
+    rx, ry = abs(rx), abs(ry)
+    if rx == 0 or ry == 0 or (x0 == x1 and y0 == y1):
+        return [(x1, y1)]
+    cos_phi, sin_phi = math.cos(math.radians(phi)), math.sin(math.radians(phi))
+    dx, dy = (x0 - x1) / 2, (y0 - y1) / 2
+    xp, yp = cos_phi * dx + sin_phi * dy, -sin_phi * dx + cos_phi * dy
+    lam = (xp / rx) ** 2 + (yp / ry) ** 2
+    if lam > 1:
+        rx, ry = rx * math.sqrt(lam), ry * math.sqrt(lam)
+    num = rx * rx * ry * ry - rx * rx * yp * yp - ry * ry * xp * xp
+    den = rx * rx * yp * yp + ry * ry * xp * xp
+    coef = math.sqrt(max(0.0, num / den)) if den else 0.0
+    if large == sweep:
+        coef = -coef
+    cxp, cyp = coef * rx * yp / ry, -coef * ry * xp / rx
+    cx = cos_phi * cxp - sin_phi * cyp + (x0 + x1) / 2
+    cy = sin_phi * cxp + cos_phi * cyp + (y0 + y1) / 2
+    start = math.atan2((yp - cyp) / ry, (xp - cxp) / rx)
+    end = math.atan2((-yp - cyp) / ry, (-xp - cxp) / rx)
+    delta = end - start
+    if sweep and delta < 0:
+        delta += 2 * math.pi
+    elif not sweep and delta > 0:
+        delta -= 2 * math.pi
+    n = _segments_for(abs(delta) * max(rx, ry) * scale)
+    points = []
+    for i in range(1, n + 1):
+        t = start + delta * i / n
+        ex, ey = rx * math.cos(t), ry * math.sin(t)
+        points.append((cos_phi * ex - sin_phi * ey + cx, sin_phi * ex + cos_phi * ey + cy))
+    return points
+
+
+def flatten(commands, scale=1.0):
+    """Flatten absolute path commands into [(points, closed)] subpaths"""
+    subpaths = []
+    points = []
+    x = y = 0.0
+    last_ctrl = None
+    last_cmd = None
+
+    def finish(closed):
+        if len(points) > 1:
+            subpaths.append((points, closed))
+
+    for cmd, args in commands:
+        if cmd == "M":
+            finish(False)
+            x, y = args[0], args[1]
+            points = [(x, y)]
+            # Extra pairs after M are implicit line-tos
+            for i in range(2, len(args) - 1, 2):
+                x, y = args[i], args[i + 1]
+                points.append((x, y))
+        elif cmd == "L":
+            for i in range(0, len(args) - 1, 2):
+                x, y = args[i], args[i + 1]
+                points.append((x, y))
+        elif cmd == "Z":
+            finish(True)
+            points = [points[0]] if points else [(x, y)]
+            x, y = points[0]
+        elif cmd in ("C", "S", "Q", "T"):
+            step = {"C": 6, "S": 4, "Q": 4, "T": 2}[cmd]
+            for i in range(0, len(args) - step + 1, step):
+                seg = args[i:i + step]
+                reflected = (2 * x - last_ctrl[0], 2 * y - last_ctrl[1]) if last_ctrl else (x, y)
+                if cmd == "C":
+                    c1, c2, end = (seg[0], seg[1]), (seg[2], seg[3]), (seg[4], seg[5])
+                elif cmd == "S":
+                    c1 = reflected if last_cmd in ("C", "S") else (x, y)
+                    c2, end = (seg[0], seg[1]), (seg[2], seg[3])
+                elif cmd == "Q":
+                    c1, end = (seg[0], seg[1]), (seg[2], seg[3])
+                    c2 = None
+                else:
+                    c1 = reflected if last_cmd in ("Q", "T") else (x, y)
+                    end, c2 = (seg[0], seg[1]), None
+                hull = [(x, y), c1] + ([c2] if c2 else []) + [end]
+                length = sum(math.hypot(b[0] - a[0], b[1] - a[1]) for a, b in zip(hull, hull[1:]))
+                n = _segments_for(length * scale)
+                for k in range(1, n + 1):
+                    t = k / n
+                    u = 1 - t
+                    if c2 is None:
+                        px = u * u * x + 2 * u * t * c1[0] + t * t * end[0]
+                        py = u * u * y + 2 * u * t * c1[1] + t * t * end[1]
+                    else:
+                        px = u ** 3 * x + 3 * u * u * t * c1[0] + 3 * u * t * t * c2[0] + t ** 3 * end[0]
+                        py = u ** 3 * y + 3 * u * u * t * c1[1] + 3 * u * t * t * c2[1] + t ** 3 * end[1]
+                    points.append((px, py))
+                last_ctrl = c2 if c2 else c1
+                x, y = end
+                last_cmd = cmd
+            continue
+        elif cmd == "A":
+            for i in range(0, len(args) - 6, 7):
+                a = args[i:i + 7]
+                points.extend(_arc_points(x, y, a[0], a[1], a[2], a[3], a[4], a[5], a[6], scale))
+                x, y = a[5], a[6]
+        last_ctrl = None
+        last_cmd = cmd
+    finish(False)
+    return subpaths
+
+
+def stroke_polygons(subpaths, half_width):
+    """Return one counter-clockwise quad per stroked segment"""
+    quads = []
+    for points, closed in subpaths:
+        pairs = list(zip(points, points[1:]))
+        if closed and points[0] != points[-1]:
+            pairs.append((points[-1], points[0]))
+        for (x0, y0), (x1, y1) in pairs:
+            length = math.hypot(x1 - x0, y1 - y0)
+            if length == 0:
+                continue
+            nx, ny = -(y1 - y0) / length * half_width, (x1 - x0) / length * half_width
+            quad = [(x0 + nx, y0 + ny), (x1 + nx, y1 + ny), (x1 - nx, y1 - ny), (x0 - nx, y0 - ny)]
+            # Shoelace sign; flip so every quad winds the same way
+            area = sum(a[0] * b[1] - b[0] * a[1] for a, b in zip(quad, quad[1:] + quad[:1]))
+            quads.append((quad if area > 0 else quad[::-1], True))
+    return quads
+
+
+# Scan conversion
+
+def coverage(polygons, width, height, evenodd=False):
+    """Return {row: [coverage per column]} for closed polygons in pixel space"""
+    edges = []
+    for points, _ in polygons:
+        ring = points if points[0] == points[-1] else points + [points[0]]
+        for (x0, y0), (x1, y1) in zip(ring, ring[1:]):
+            if y0 == y1:
+                continue
+            direction = 1 if y1 > y0 else -1
+            if y0 > y1:
+                x0, y0, x1, y1 = x1, y1, x0, y0
+            edges.append((y0, y1, x0, (x1 - x0) / (y1 - y0), direction))
+    if not edges:
+        return {}
+
+    top = max(0, int(min(e[0] for e in edges)))
+    bottom = min(height, int(math.ceil(max(e[1] for e in edges))))
+    edges.sort()
+    rows = {}
+    weight = 1.0 / SUBSAMPLES
+    start = 0
+    active = []
+    for row in range(top, bottom):
+        cells = None
+        for sub in range(SUBSAMPLES):
+            sy = row + (sub + 0.5) * weight
+            while start < len(edges) and edges[start][0] <= sy:
+                active.append(edges[start])
+                start += 1
+            active = [e for e in active if e[1] > sy]
+            crossings = sorted((e[2] + (sy - e[0]) * e[3], e[4]) for e in active if e[0] <= sy)
+            winding = 0
+            for i, (cx, direction) in enumerate(crossings[:-1]):
+                winding = winding + 1 if evenodd else winding + direction
+                inside = winding % 2 if evenodd else winding != 0
+                if not inside:
+                    continue
+                xa, xb = max(0.0, cx), min(float(width), crossings[i + 1][0])
+                if xb <= xa:
+                    continue
+                if cells is None:
+                    cells = [0.0] * width
+                ia, ib = int(xa), int(xb)
+                if ia == ib:
+                    cells[ia] += (xb - xa) * weight
+                    continue
+                cells[ia] += (ia + 1 - xa) * weight
+                for col in range(ia + 1, min(ib, width)):
+                    cells[col] += weight
+                if ib < width:
+                    cells[ib] += (xb - ib) * weight
+        if cells is not None:
+            rows[row] = cells
+    return rows
+
+
+def composite(buffer, width, rows, color):
+    """Blend a colour through coverage rows onto a premultiplied RGBA buffer"""
+    r, g, b, a = color
+    for row, cells in rows.items():
+        base = row * width * 4
+        for col, cov in enumerate(cells):
+            if cov <= 0:
+                continue
+            alpha = a * min(cov, 1.0)
+            i = base + col * 4
+            keep = 1 - alpha
+            buffer[i] = r * alpha + buffer[i] * keep
+            buffer[i + 1] = g * alpha + buffer[i + 1] * keep
+            buffer[i + 2] = b * alpha + buffer[i + 2] * keep
+            buffer[i + 3] = alpha + buffer[i + 3] * keep
+
+
+def render_tile(data, scale, mode=None):
+    """Rasterize one extracted tile; returns (width, height, premultiplied float RGBA list).
+
+    ``mode`` is the catalog's paint mode ("stroke", "fill", ...), if any.
+    """
+    vx, vy, vw, vh = data["viewBox"]
+    width = max(1, round(vw * scale))
+    height = max(1, round(vh * scale))
+    sx, sy = width / vw, height / vh
+    gradients = gradient_colors(data["gradients"])
+    override = mode_override(mode)
+    buffer = [0.0] * (width * height * 4)
+    for record in data["elements"]:
+        attrs = record["attrs"]
+        if record["type"] == "rect" and ("rx" in attrs or "ry" in attrs):
+            attrs = {k: v for k, v in attrs.items() if k not in ("rx", "ry")}
+        commands = shape_commands(record["type"], attrs)
+        if not commands:
+            continue
+        fill, rule, stroke, stroke_width = shape_paint(record, gradients)
+        if override is not None:
+            fill, stroke, stroke_width = override
+        subpaths = [([((px - vx) * sx, (py - vy) * sy) for px, py in points], closed)
+                    for points, closed in flatten(commands, max(sx, sy))]
+        if fill is not None and record["type"] != "line":
+            composite(buffer, width, coverage(subpaths, width, height, rule == "evenodd"), fill)
+        if stroke is not None and stroke_width > 0:
+            half = max(MIN_STROKE_PX, stroke_width * (sx + sy) / 2) / 2
+            composite(buffer, width, coverage(stroke_polygons(subpaths, half), width, height), stroke)
+    return width, height, buffer
+
+
+def tile_image(tile, out_width, out_height):
+    """Repeat a rendered tile across an output image; returns RGBA bytes"""
+    width, height, buffer = tile
+    tile_rows = []
+    for row in range(height):
+        pixels = bytearray(width * 4)
+        base = row * width * 4
+        for col in range(width):
+            i = base + col * 4
+            alpha = buffer[i + 3]
+            pixels[col * 4 + 3] = round(alpha * 255)
+            if alpha > 0:
+                for c in range(3):
+                    pixels[col * 4 + c] = min(255, round(buffer[i + c] / alpha * 255))
+        repeats = out_width // width + 1
+        tile_rows.append(bytes(pixels * repeats)[:out_width * 4])
+    return b"".join(tile_rows[row % height] for row in range(out_height))
+
+
+def rasterize(svg, size, extent=200.0, mode=None):
+    """Rasterize a pattern to a size x size RGBA thumbnail.
+
+    The thumbnail shows ``extent`` user units of the repeating pattern, or a
+    single tile when the tile is larger than that.
+    """
+    data = extract_svg_data(svg)
+    scale = size / max(extent, data["viewBox"][2], data["viewBox"][3])
+    return tile_image(render_tile(data, scale, mode), size, size)
+
+
+# PNG
+
+def _chunk(kind, payload):
+    return (struct.pack(">I", len(payload)) + kind + payload +
+            struct.pack(">I", zlib.crc32(kind + payload) & 0xFFFFFFFF))
+
+
+def encode_png(width, height, rgba):
+    """Encode RGBA bytes as a PNG (no filtering)"""
+    stride = width * 4
+    raw = b"".join(b"\x00" + rgba[y * stride:(y + 1) * stride] for y in range(height))
+    return (b"\x89PNG\r\n\x1a\n" +
+            _chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)) +
+            _chunk(b"IDAT", zlib.compress(raw, 9)) +
+            _chunk(b"IEND", b""))
+
+
+def decode_png(data):
+    """Decode a PNG written by encode_png; returns (width, height, RGBA bytes)"""
+    if data[:8] != b"\x89PNG\r\n\x1a\n":
+        raise ValueError("not a PNG file")
+    pos = 8
+    width = height = None
+    idat = []
+    while pos < len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        payload = data[pos + 8:pos + 8 + length]
+        if kind == b"IHDR":
+            width, height, depth, color_type = struct.unpack(">IIBB", payload[:10])
+            if (depth, color_type) != (8, 6):
+                raise ValueError("only 8-bit RGBA PNGs are supported")
+        elif kind == b"IDAT":
+            idat.append(payload)
+        pos += 12 + length
+    raw = zlib.decompress(b"".join(idat))
+    stride = width * 4
+    rows = []
+    for y in range(height):
+        start = y * (stride + 1)
+        if raw[start] != 0:
+            raise ValueError("filtered PNG rows are not supported")
+        rows.append(raw[start + 1:start + 1 + stride])
+    return width, height, b"".join(rows)
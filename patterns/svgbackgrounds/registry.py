@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Lazy registry of pattern generators.
+
+A registry wraps a mapping of pattern id to creator metadata (the shape of
+PATTERN_CREATORS) without calling anything. Lookups by id, tag or source
+return PatternHandle objects whose SVG, extracted data and catalog record
+are built on first access and memoized, so fetching one pattern renders and
+extracts only that pattern.
+
+Handles are created on demand and the tag and source indexes are built on
+the first tag or source lookup, so creating a registry and listing its ids
+costs nothing per generator.
+
+Usage:
+    python registry.py                       # list ids
+    python registry.py --tag chevron         # ids tagged chevron
+    python registry.py radiant-grid --svg    # render one pattern
+"""
+
+import argparse
+import json
+
+
+class PatternHandle:
+    """A registered pattern whose SVG, extraction and record are computed on first access"""
+
+    __slots__ = ("id", "metadata", "_svg", "_data", "_record")
+
+    def __init__(self, pattern_id, metadata):
+        self.id = pattern_id
+        self.metadata = metadata
+        self._svg = None
+        self._data = None
+        self._record = None
+
+    def __repr__(self):
+        return f"PatternHandle({self.id!r})"
+
+    @property
+    def name(self):
+        return self.metadata["name"]
+
+    @property
+    def tags(self):
+        return list(self.metadata.get("tags", []))
+
+    @property
+    def source(self):
+        from create_svg_patterns import DEFAULT_SOURCE
+        return self.metadata.get("source", DEFAULT_SOURCE)
+
+    @property
+    def svg(self):
+        """The generator's SVG document"""
+        if self._svg is None:
+            self._svg = self.metadata["svg_func"]()
+        return self._svg
+
+    @property
+    def data(self):
+        """extract_svg_data output for the SVG"""
+        if self._data is None:
+            from create_svg_patterns import extract_svg_data
+            self._data = extract_svg_data(self.svg)
+        return self._data
+
+    @property
+    def elements(self):
+        """The extracted element markup (the record's svgPath)"""
+        return self.data["svgElements"]
+
+    @property
+    def record(self):
+        """The catalog record, as create_patterns_json would build it"""
+        if self._record is None:
+            from create_svg_patterns import assemble_pattern
+            self._record = assemble_pattern(self.id, self.metadata, self.svg, self.data)
+        return self._record
+
+    @property
+    def materialized(self):
+        """Whether the SVG has been rendered yet"""
+        return self._svg is not None
+
+
+class PatternRegistry:
+    """Pattern generators looked up by id, tag or source"""
+
+    def __init__(self, creators=None):
+        self._creators = {} if creators is None else dict(creators)
+        self._handles = {}
+        self._tag_index = None
+        self._source_index = None
+
+    def register(self, pattern_id, metadata):
+        """Register a generator; metadata needs name and svg_func, and may carry tags and source"""
+        if pattern_id in self._creators:
+            raise ValueError(f"pattern {pattern_id!r} is already registered")
+        self._creators[pattern_id] = metadata
+        self._tag_index = self._source_index = None
+
+    def __len__(self):
+        return len(self._creators)
+
+    def __contains__(self, pattern_id):
+        return pattern_id in self._creators
+
+    def __iter__(self):
+        return (self.get(pattern_id) for pattern_id in self._creators)
+
+    def ids(self):
+        """Return every registered id, in registration order"""
+        return list(self._creators)
+
+    def get(self, pattern_id):
+        """Return the handle for an id (KeyError if unknown)"""
+        handle = self._handles.get(pattern_id)
+        if handle is None:
+            handle = self._handles[pattern_id] = PatternHandle(pattern_id, self._creators[pattern_id])
+        return handle
+
+    def _build_indexes(self):
+        from create_svg_patterns import DEFAULT_SOURCE
+        tags = {}
+        sources = {}
+        for pattern_id, metadata in self._creators.items():
+            for tag in {tag.lower() for tag in metadata.get("tags", [])}:
+                tags.setdefault(tag, []).append(pattern_id)
+            source = metadata.get("source", DEFAULT_SOURCE).lower()
+            sources.setdefault(source, []).append(pattern_id)
+        self._tag_index, self._source_index = tags, sources
+
+    def by_tag(self, tag):
+        """Return handles of patterns carrying a tag (case-insensitive)"""
+        if self._tag_index is None:
+            self._build_indexes()
+        return [self.get(pattern_id) for pattern_id in self._tag_index.get(tag.lower(), [])]
+
+    def by_source(self, source):
+        """Return handles of patterns from a source (case-insensitive)"""
+        if self._source_index is None:
+            self._build_indexes()
+        return [self.get(pattern_id) for pattern_id in self._source_index.get(source.lower(), [])]
+
+    def tags(self):
+        """Return every tag in use, sorted"""
+        if self._tag_index is None:
+            self._build_indexes()
+        return sorted(self._tag_index)
+
+
+_default = None
+
+
+def default_registry():
+    """Return the registry of the svgbackgrounds generators"""
+    global _default
+    if _default is None:
+        from create_svg_patterns import PATTERN_CREATORS
+        _default = PatternRegistry(PATTERN_CREATORS)
+    return _default
+
+
+def get_pattern(pattern_id):
+    """Return the handle of one svgbackgrounds generator"""
+    return default_registry().get(pattern_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Look up registered pattern generators")
+    parser.add_argument("pattern_id", nargs="?", help="pattern to materialize")
+    parser.add_argument("--tag", help="list ids carrying this tag")
+    parser.add_argument("--source", help="list ids from this source")
+    parser.add_argument("--svg", action="store_true", help="print the SVG instead of the record")
+    args = parser.parse_args()
+
+    registry = default_registry()
+    if args.pattern_id:
+        handle = registry.get(args.pattern_id)
+        print(handle.svg if args.svg else json.dumps(handle.record, indent=2))
+        return
+    if args.tag or args.source:
+        handles = registry.by_tag(args.tag) if args.tag else registry.by_source(args.source)
+        ids = [handle.id for handle in handles]
+        if args.tag and args.source:
+            ids = [handle.id for handle in registry.by_source(args.source) if handle.id in ids]
+    else:
+        ids = registry.ids()
+    for pattern_id in ids:
+        print(pattern_id)
+
+
+if __name__ == "__main__":
+    main()
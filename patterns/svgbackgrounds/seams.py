@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+"""
+Seam and tileability validator.
+
+A tile repeats seamlessly when geometry cut by one edge carries on just
+inside the opposite edge, and gradients agree in colour across the tile.
+Every shape is flattened (through the rasterizer's flattening of the path
+compiler's commands) into one set of segment columns for the whole tile;
+shapes whose bounding box does not reach an edge are dropped up front. Each
+edge is then probed just inside and just outside the tile, every probe a
+single pass over those columns: segments crossing the probe line give, per
+paint, the intervals covered by fills (from the crossing winding) and by
+strokes (the centre line crossing widened by the stroke width).
+
+Coverage found on both sides of an edge must be matched by the same paint
+inside the opposite edge. The seam score is 1 - unmatched length / required
+length over both edge pairs: 1.0 means everything cut by an edge continues
+across it. A tile with nothing crossing its edges cannot be scored: its
+score is None, which the CLI reports as a failure, since geometry that stops
+short of every edge leaves a gap wherever the tile repeats.
+Geometry (solid paint) and gradient fills are scored separately, so a
+background gradient that does not wrap cannot mask a geometry seam; the
+main score is the geometry one. Occlusion between shapes, transforms,
+dashes and caps are ignored.
+
+Usage:
+    python seams.py                                   # the svgbackgrounds generators
+    python seams.py --catalogs --min-score 0.9 --check --report seams.json
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from catalogs import catalog_sources, default_catalog_paths, generator_sources
+from create_svg_patterns import extract_svg_data
+from path_compiler import shape_commands
+from raster import (
+    flatten,
+    gradient_colors,
+    merge_style,
+    mode_override,
+    paint_url,
+    parse_color,
+    parse_fraction,
+    shape_paint,
+)
+
+DEFAULT_TOLERANCE = 0.005  # of the edge length
+DEFAULT_MIN_SCORE = 0.99
+DEFAULT_CHUNK_SIZE = 64
+GRADIENT_SAMPLES = 16  # gradient pieces compared per edge
+COLOR_LEVELS = 16  # gradient colours match when equal at this many levels per channel
+
+
+# Interval arithmetic on sorted, merged [(start, end)] lists
+
+def merge(intervals):
+    """Sort and merge overlapping intervals"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def length(intervals):
+    return sum(end - start for start, end in intervals)
+
+
+def intersect(a, b):
+    """Return the intersection of two merged interval lists"""
+    out = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        start, end = max(a[i][0], b[j][0]), min(a[i][1], b[j][1])
+        if start < end:
+            out.append((start, end))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return out
+
+
+def dilate(intervals, amount):
+    return merge((start - amount, end + amount) for start, end in intervals)
+
+
+def uncovered_length(a, b):
+    """Return the length of merged intervals a not covered by merged intervals b"""
+    total = 0.0
+    j = 0
+    for start, end in a:
+        while j < len(b) and b[j][1] <= start:
+            j += 1
+        k = j
+        cursor = start
+        while k < len(b) and b[k][0] < end:
+            if b[k][0] > cursor:
+                total += b[k][0] - cursor
+            cursor = max(cursor, b[k][1])
+            k += 1
+        if cursor < end:
+            total += end - cursor
+    return total
+
+
+# Paint
+
+def _fraction(value, default, extent):
+    """Parse a gradient coordinate as a fraction of extent ("50%" or a bare number)"""
+    value = (value or default).strip()
+    if value.endswith("%"):
+        return float(value[:-1]) / 100
+    return float(value) / extent if extent else 0.0
+
+
+def gradient_shaders(gradients, size):
+    """Map gradient ids to shaders: shader(x, y, bbox) returns (r, g, b, a).
+
+    Coordinates are resolved against the shape's bounding box, or against
+    the tile size for userSpaceOnUse gradients; spread is always pad.
+    """
+    shaders = {}
+    for gradient in gradients:
+        stops = []
+        for stop in gradient.get("stops", []):
+            stop = merge_style(stop)
+            color = parse_color(stop.get("stop-color", "black"))
+            if color is not None:
+                offset = parse_fraction(stop.get("offset"), 0.0)
+                stops.append((offset, color[:3] + (color[3] * parse_fraction(stop.get("stop-opacity")),)))
+        attrs = gradient["attrs"]
+        if not attrs.get("id") or not stops:
+            continue
+        stops.sort(key=lambda stop: stop[0])
+        user_space = attrs.get("gradientUnits") == "userSpaceOnUse"
+        w, h = size
+        if gradient["type"] == "linearGradient":
+            x1, x2 = _fraction(attrs.get("x1"), "0%", w), _fraction(attrs.get("x2"), "100%", w)
+            y1, y2 = _fraction(attrs.get("y1"), "0%", h), _fraction(attrs.get("y2"), "0%", h)
+            dx, dy = x2 - x1, y2 - y1
+            norm = dx * dx + dy * dy
+
+            def position(u, v, x1=x1, y1=y1, dx=dx, dy=dy, norm=norm):
+                return ((u - x1) * dx + (v - y1) * dy) / norm if norm else 0.0
+        else:
+            cx, cy = _fraction(attrs.get("cx"), "50%", w), _fraction(attrs.get("cy"), "50%", h)
+            r = _fraction(attrs.get("r"), "50%", w)
+
+            def position(u, v, cx=cx, cy=cy, r=r):
+                return ((u - cx) ** 2 + (v - cy) ** 2) ** 0.5 / r if r else 0.0
+
+        def shader(x, y, bbox, stops=stops, position=position, user_space=user_space, size=size):
+            if user_space:
+                u, v = x / size[0], y / size[1]
+            else:
+                bx0, by0, bx1, by1 = bbox
+                u = (x - bx0) / (bx1 - bx0) if bx1 > bx0 else 0.0
+                v = (y - by0) / (by1 - by0) if by1 > by0 else 0.0
+            s = min(1.0, max(0.0, position(u, v)))
+            previous = stops[0]
+            for stop in stops:
+                if s <= stop[0]:
+                    span = stop[0] - previous[0]
+                    k = (s - previous[0]) / span if span > 0 else 1.0
+                    return tuple(a + (b - a) * k for a, b in zip(previous[1], stop[1]))
+                previous = stop
+            return stops[-1][1]
+
+        shaders[attrs["id"]] = shader
+    return shaders
+
+
+def _gradient_id(record):
+    attrs = merge_style({**record["inherited"], **record["attrs"]})
+    return paint_url(attrs.get("fill"))
+
+
+# Edge geometry
+
+def edge_layers(data, box, slack=0.0, mode=None):
+    """Flatten the shapes that reach a tile edge into segment columns.
+
+    Returns (columns, layers, stats): columns are parallel lists
+    (x0, y0, x1, y1, layer), and each layer is (paint, kind, half_width,
+    evenodd, shader, shape_box, extent) with kind "fill" or "stroke";
+    shader is set for gradient fills and extent is the painted bounding box.
+    Shapes whose extent is more than ``slack`` away from every edge are left
+    out. Stroke mode catalogs are drawn as unfilled outlines at the
+    compositor's default stroke width, the way the front end paints them.
+    """
+    bx0, by0, bx1, by1 = box
+    gradients = gradient_colors(data["gradients"])
+    shaders = gradient_shaders(data["gradients"], (bx1 - bx0, by1 - by0))
+    override = mode_override(mode)
+    x0s, y0s, x1s, y1s, owners = [], [], [], [], []
+    layers = []
+    overhanging = 0
+    for record in data["elements"]:
+        attrs = record["attrs"]
+        if record["type"] == "rect" and ("rx" in attrs or "ry" in attrs):
+            attrs = {k: v for k, v in attrs.items() if k not in ("rx", "ry")}
+        commands = shape_commands(record["type"], attrs)
+        if not commands:
+            continue
+        subpaths = flatten(commands)
+        if not subpaths:
+            continue
+        fill, rule, stroke, stroke_width = shape_paint(record, gradients)
+        if override is not None:
+            fill, stroke, stroke_width = override
+        half = stroke_width / 2 if stroke is not None else 0.0
+        xs = [x for points, _ in subpaths for x, _ in points]
+        ys = [y for points, _ in subpaths for _, y in points]
+        shape_box = (min(xs), min(ys), max(xs), max(ys))
+        ex0, ey0, ex1, ey1 = shape_box[0] - half, shape_box[1] - half, shape_box[2] + half, shape_box[3] + half
+        if ex0 < bx0 or ey0 < by0 or ex1 > bx1 or ey1 > by1:
+            overhanging += 1
+        if min(ex1 - bx0, bx1 - ex0, ey1 - by0, by1 - ey0) < 0:
+            continue  # entirely outside the tile
+        if ex0 > bx0 + slack and ex1 < bx1 - slack and ey0 > by0 + slack and ey1 < by1 - slack:
+            continue
+        paints = []
+        if fill is not None and fill[3] > 0 and record["type"] != "line":
+            shader = shaders.get(_gradient_id(record))
+            paints.append((("fill",) + tuple(round(c, 3) for c in fill), "fill", 0.0,
+                           rule == "evenodd", shader, shape_box, (ex0, ey0, ex1, ey1)))
+        if stroke is not None and stroke[3] > 0 and stroke_width > 0:
+            paints.append((("stroke",) + tuple(round(c, 3) for c in stroke), "stroke", half,
+                           False, None, shape_box, (ex0, ey0, ex1, ey1)))
+        for layer_info in paints:
+            layer = len(layers)
+            layers.append(layer_info)
+            for points, closed in subpaths:
+                ring = points
+                # Fills close every subpath implicitly
+                if (closed or layer_info[1] == "fill") and points[0] != points[-1]:
+                    ring = points + [points[0]]
+                x0s.extend(x for x, _ in ring[:-1])
+                y0s.extend(y for _, y in ring[:-1])
+                x1s.extend(x for x, _ in ring[1:])
+                y1s.extend(y for _, y in ring[1:])
+                owners.extend([layer] * (len(ring) - 1))
+    stats = {"elements": len(data["elements"]), "edge_layers": len(layers),
+             "overhanging": overhanging}
+    return (x0s, y0s, x1s, y1s, owners), layers, stats
+
+
+def _shade(intervals, shader, bbox, c, lo, hi, vertical):
+    """Split gradient-filled intervals on a fixed grid and key each piece by its colour"""
+    step = (hi - lo) / GRADIENT_SAMPLES
+    pieces = {}
+    for start, end in intervals:
+        cut = start
+        while cut < end:
+            stop = min(end, lo + (int((cut - lo) / step + 1e-9) + 1) * step)
+            mid = (cut + stop) / 2
+            color = shader(c, mid, bbox) if vertical else shader(mid, c, bbox)
+            key = ("fill",) + tuple(round(channel * COLOR_LEVELS) for channel in color)
+            pieces.setdefault(key, []).append((cut, stop))
+            cut = stop
+    return pieces
+
+
+def probe(columns, layers, c, lo, hi, vertical=True):
+    """Return {layer: {paint: intervals}} covered along the line a = c, for lo <= b <= hi.
+
+    ``columns`` are (a0, b0, a1, b1, layer): pass x columns as a to probe a
+    vertical line, y columns as a (with ``vertical=False``) to probe a
+    horizontal one.
+    """
+    a0, b0, a1, b1, owners = columns
+    hits = [i for i, (p, q) in enumerate(zip(a0, a1)) if (p < c) != (q < c)]
+    crossings = {}
+    for i in hits:
+        da = a1[i] - a0[i]
+        db = b1[i] - b0[i]
+        t = b0[i] + (c - a0[i]) * db / da
+        crossings.setdefault(owners[i], []).append((t, 1 if da > 0 else -1, abs(db / da)))
+
+    covered = {}
+    for layer, hits in crossings.items():
+        paint, kind, half, evenodd, shader, bbox, _ = layers[layer]
+        intervals = []
+        if kind == "stroke":
+            for t, _, slope in hits:
+                # A band of width 2 * half crossing at an angle covers more of the edge
+                reach = min(half * (1 + slope * slope) ** 0.5, hi - lo)
+                intervals.append((t - reach, t + reach))
+        else:
+            hits.sort()
+            winding = 0
+            for (t, direction, _), (t_next, _, _) in zip(hits, hits[1:]):
+                winding += direction
+                if (winding % 2 if evenodd else winding != 0) and t_next > t:
+                    intervals.append((t, t_next))
+        intervals = [(max(s, lo), min(e, hi)) for s, e in intervals if e > lo and s < hi]
+        if shader is None:
+            covered[layer] = {paint: intervals}
+        else:
+            covered[layer] = _shade(intervals, shader, bbox, c, lo, hi, vertical)
+    return covered
+
+
+def _union(probed, selected=None):
+    """Merge the probed intervals of the selected layers (default: all) per paint"""
+    painted = {}
+    for layer, paints in probed.items():
+        if selected is None or layer in selected:
+            for paint, intervals in paints.items():
+                painted.setdefault(paint, []).extend(intervals)
+    return {paint: merge(intervals) for paint, intervals in painted.items()}
+
+
+def compare_edges(required, available, tolerance):
+    """Return (mismatched, covered) length of required edge coverage missing across the seam"""
+    mismatched = covered = 0.0
+    for paint, intervals in required.items():
+        covered += length(intervals)
+        mismatched += uncovered_length(intervals, dilate(available.get(paint, []), tolerance))
+    return mismatched, covered
+
+
+def _required(inside, outside, spanning, tolerance, selected):
+    """Coverage that runs through an edge: painted on both sides of it, or a spanning gradient"""
+    required = {}
+    inner = _union(inside, selected)
+    outer = _union(outside, selected)
+    for paint, intervals in inner.items():
+        if paint in outer:
+            required[paint] = intersect(intervals, dilate(outer[paint], tolerance))
+    for paint, intervals in _union(inside, spanning & selected).items():
+        required[paint] = merge(required.get(paint, []) + intervals)
+    return required
+
+
+def seam_axis(columns, layers, axis, lo, hi, b_lo, b_hi, slack, vertical, groups):
+    """Return {group: (mismatched, covered)} for one pair of opposing edges.
+
+    Geometry painted just inside an edge and still painted ``slack`` beyond
+    it is cut by the tile and must be continued by matching paint just
+    inside the opposite edge. Shapes that end at an edge (or overshoot it by
+    less than ``slack``) are boundaries, not seams. Gradient fills that span
+    the tile must also agree in colour across it. ``groups`` maps a group
+    name to the set of layers scored together.
+    """
+    spanning = {i for i, layer in enumerate(layers)
+                if layer[4] is not None and layer[6][axis] <= lo + slack and layer[6][axis + 2] >= hi - slack}
+    near_in = probe(columns, layers, lo + slack, b_lo, b_hi, vertical)
+    near_out = probe(columns, layers, lo - slack, b_lo, b_hi, vertical)
+    far_in = probe(columns, layers, hi - slack, b_lo, b_hi, vertical)
+    far_out = probe(columns, layers, hi + slack, b_lo, b_hi, vertical)
+    tolerance = slack * (b_hi - b_lo) / (hi - lo)
+    results = {}
+    for group, selected in groups.items():
+        near_missing, near_required = compare_edges(
+            _required(near_in, near_out, spanning, tolerance, selected), _union(far_in, selected), tolerance)
+        far_missing, far_required = compare_edges(
+            _required(far_in, far_out, spanning, tolerance, selected), _union(near_in, selected), tolerance)
+        results[group] = (near_missing + far_missing, near_required + far_required)
+    return results
+
+
+def _axis_result(mismatched, covered):
+    """Score one edge pair; None when nothing crosses the edges"""
+    score = round(max(1.0 - mismatched / covered, 0.0), 4) if covered else None
+    return {"score": score, "mismatched": round(mismatched, 3), "covered": round(covered, 3)}
+
+
+def seam_score(svg, tolerance=DEFAULT_TOLERANCE, mode=None):
+    """Return the seam report for one tile.
+
+    ``score``, ``x`` and ``y`` cover the geometry (solid paint) layers;
+    ``gradient_score`` and ``gradient`` the same for gradient fills. A score
+    is None when nothing of its kind crosses the edges. ``mode`` is the
+    catalog's paint mode ("stroke", "fill", ...), if any.
+    """
+    data = extract_svg_data(svg)
+    vx, vy, vw, vh = data["viewBox"]
+    slack_x, slack_y = vw * tolerance, vh * tolerance
+    columns, layers, stats = edge_layers(data, (vx, vy, vx + vw, vy + vh), max(slack_x, slack_y), mode)
+    x0s, y0s, x1s, y1s, owners = columns
+    groups = {"geometry": {i for i, layer in enumerate(layers) if layer[4] is None},
+              "gradient": {i for i, layer in enumerate(layers) if layer[4] is not None}}
+
+    # x: the left edge against the right edge, measured along y
+    x_results = seam_axis(columns, layers, 0, vx, vx + vw, vy, vy + vh,
+                          slack_x, vertical=True, groups=groups)
+    # y: the top edge against the bottom edge, measured along x
+    transposed = (y0s, x0s, y1s, x1s, owners)
+    y_results = seam_axis(transposed, layers, 1, vy, vy + vh, vx, vx + vw,
+                          slack_y, vertical=False, groups=groups)
+
+    reports = {}
+    for group in groups:
+        (x_mismatched, x_covered), (y_mismatched, y_covered) = x_results[group], y_results[group]
+        reports[group] = {"score": _axis_result(x_mismatched + y_mismatched, x_covered + y_covered)["score"],
+                          "x": _axis_result(x_mismatched, x_covered),
+                          "y": _axis_result(y_mismatched, y_covered)}
+    gradient = reports["gradient"]
+    return {**reports["geometry"],
+            "gradient_score": gradient["score"],
+            "gradient": {"x": gradient["x"], "y": gradient["y"]},
+            **stats}
+
+
+# Corpus runs
+
+def _format_score(score):
+    return "n/a" if score is None else f"{score:.3f}"
+
+
+def _check_chunk(jobs):
+    """Score (id, svg, mode, tolerance) jobs; returns [(id, report, error)]"""
+    results = []
+    for pattern_id, svg, mode, tolerance in jobs:
+        try:
+            results.append((pattern_id, seam_score(svg, tolerance, mode), None))
+        except Exception as exc:
+            results.append((pattern_id, None, f"{type(exc).__name__}: {exc}"))
+    return results
+
+
+def check_sources(sources, tolerance=DEFAULT_TOLERANCE, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Score (id, svg, mode) sources, in order, across a process pool (``workers=1`` runs in-process)"""
+    workers = workers or os.cpu_count() or 1
+    jobs = [(pattern_id, svg, mode, tolerance) for pattern_id, svg, mode in sources]
+    chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+    if workers == 1:
+        chunk_results = map(_check_chunk, chunks)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunk_results = list(executor.map(_check_chunk, chunks))
+    return [result for results in chunk_results for result in results]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that patterns tile without seams")
+    parser.add_argument("inputs", nargs="*", help="catalog files to check")
+    parser.add_argument("--catalogs", action="store_true",
+                        help="check the catalogs in public/ and the svgbackgrounds output")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed seam offset as a fraction of the edge length")
+    parser.add_argument("--min-score", type=float, default=DEFAULT_MIN_SCORE,
+                        help="list patterns whose geometry scores below this")
+    parser.add_argument("--gradients", action="store_true",
+                        help="also hold gradient fills to --min-score")
+    parser.add_argument("--check", action="store_true",
+                        help="exit 1 if any pattern scores below --min-score or fails to parse "
+                             "(unscored patterns always exit 1)")
+    parser.add_argument("--report", help="write per-pattern seam reports to this JSON file")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    if args.inputs or args.catalogs:
+        sources = catalog_sources(args.inputs or default_catalog_paths())
+    else:
+        sources = generator_sources()
+
+    results = check_sources(sources, args.tolerance, args.workers)
+    reports = {pattern_id: report for pattern_id, report, error in results if error is None}
+    failures = [(pattern_id, error) for pattern_id, _, error in results if error is not None]
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(reports, f, indent=2)
+
+    threshold = args.min_score
+    unscored = sorted(pattern_id for pattern_id, report in reports.items() if report["score"] is None)
+    below = sorted((report["score"], pattern_id) for pattern_id, report in reports.items()
+                   if report["score"] is not None and (
+                       report["score"] < threshold
+                       or (args.gradients and report["gradient_score"] is not None
+                           and report["gradient_score"] < threshold)))
+    for score, pattern_id in below:
+        report = reports[pattern_id]
+        print(f"- {pattern_id}: {score:.3f} (x {_format_score(report['x']['score'])}, "
+              f"y {_format_score(report['y']['score'])}; gradient {_format_score(report['gradient_score'])})")
+    for pattern_id in unscored:
+        print(f"- UNSCORED {pattern_id}: no geometry crosses the tile edges")
+    for pattern_id, error in failures:
+        print(f"- FAILED {pattern_id}: {error}")
+    seamless = len(reports) - len(below) - len(unscored)
+    print(f"{len(sources)} patterns, {seamless} seamless, {len(below)} below {threshold:g}, "
+          f"{len(unscored)} unscored")
+
+    if unscored or (args.check and (below or failures)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+"""
+Local asyncio HTTP service for the pattern catalogs.
+
+Every catalog record is serialized once at load, together with gzip (and,
+when the brotli package is installed, brotli) variants, each with its own
+content-hash ETag. The default-size listing pages and the tag list are
+prebuilt the same way; other pages, tag filters and renders are built on
+first request and kept in a bounded LRU cache. A request is then a lookup
+plus writing prebuilt bytes.
+
+Renders run in a process pool so a slow pattern never blocks the event loop.
+A render still running after the timeout is answered with 503 but left to
+finish, and its result is cached for the next request.
+
+Endpoints (GET and HEAD):
+    /patterns?page=1&per_page=50&tag=waves   paginated summaries
+    /patterns/<catalog>:<id>                 one catalog record
+    /patterns/<catalog>:<id>/render?width=1920&height=1080[&scale=&color=&stroke_width=]
+                                             a canvas SVG from the compositor
+    /tags                                    tag -> pattern count
+
+Usage:
+    python serve.py --port 8008
+    python serve.py ../../public/heropatterns.json --host 0.0.0.0
+"""
+
+import argparse
+import asyncio
+import functools
+import gzip
+import hashlib
+import json
+import multiprocessing
+import signal
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import parse_qs, unquote, urlsplit
+from xml.etree.ElementTree import ParseError
+
+from catalogs import catalog_keys, default_catalog_paths, load_catalog, normalize_entry
+from compositor import compose
+from pattern_index import normalize_tag
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8008
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+MAX_CANVAS = 20000
+DEFAULT_CACHE_ENTRIES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 9
+MAX_HEADER_BYTES = 16 << 10
+DEFAULT_RENDER_WORKERS = 2
+RENDER_TIMEOUT = 10.0
+MAX_RENDER_BYTES = 8 << 20
+
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 431: "Request Header Fields Too Large",
+           500: "Internal Server Error", 503: "Service Unavailable"}
+JSON_TYPE = "application/json"
+SVG_TYPE = "image/svg+xml"
+
+
+# ETag suffix per content coding: the encoded bodies differ, so their tags must too
+ETAG_SUFFIXES = {"identity": "", "gzip": "-gz", "br": "-br"}
+
+
+class Resource:
+    """A response body with pre-compressed variants and an ETag per variant"""
+
+    __slots__ = ("status", "etags", "bodies", "heads")
+
+    def __init__(self, body, content_type=JSON_TYPE, status=200):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.status = status
+        self.bodies = {"identity": body, "gzip": gzip.compress(body, GZIP_LEVEL, mtime=0)}
+        if brotli is not None:
+            self.bodies["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.etags = {encoding: f'"{digest}{ETAG_SUFFIXES[encoding]}"' for encoding in self.bodies}
+        self.heads = {}
+        for encoding, data in self.bodies.items():
+            lines = [f"HTTP/1.1 {status} {REASONS[status]}",
+                     f"Content-Type: {content_type}",
+                     f"Content-Length: {len(data)}",
+                     f"ETag: {self.etags[encoding]}",
+                     "Vary: Accept-Encoding",
+                     "Cache-Control: " + ("public, max-age=3600" if status == 200 else "no-store")]
+            if encoding != "identity":
+                lines.append(f"Content-Encoding: {encoding}")
+            self.heads[encoding] = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    @classmethod
+    def json(cls, value, status=200):
+        return cls(json.dumps(value, separators=(",", ":")), JSON_TYPE, status)
+
+    def encoding(self, accept_encoding):
+        """Return the best encoding the client accepts"""
+        return _choose_encoding(accept_encoding, self.bodies)
+
+    def head_and_body(self, accept_encoding):
+        """Return (head, body) in the best encoding the client accepts"""
+        encoding = self.encoding(accept_encoding)
+        return self.heads[encoding], self.bodies[encoding]
+
+
+def _choose_encoding(accept_encoding, available):
+    """Pick br, then gzip, then identity from an Accept-Encoding header"""
+    if not accept_encoding:
+        return "identity"
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip().lower())
+    for encoding in ("br", "gzip"):
+        if encoding in available and (encoding in accepted or "*" in accepted):
+            return encoding
+    return "identity"
+
+
+def etag_matches(if_none_match, etag):
+    """Return True if an If-None-Match header value matches etag (weak comparison)"""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def _error(status, message):
+    return Resource.json({"error": message}, status)
+
+
+NOT_FOUND = _error(404, "not found")
+NOT_MODIFIED_HEAD = b"HTTP/1.1 304 Not Modified\r\nVary: Accept-Encoding\r\n"
+METHOD_NOT_ALLOWED = _error(405, "only GET and HEAD are supported")
+INTERNAL_ERROR = _error(500, "internal server error")
+
+
+class LRUCache:
+    """A small entry-bounded least-recently-used map"""
+
+    def __init__(self, max_entries=DEFAULT_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+class PatternStore:
+    """Catalog records with their prebuilt responses"""
+
+    def __init__(self, records, page_size=DEFAULT_PAGE_SIZE, cache_entries=DEFAULT_CACHE_ENTRIES,
+                 render_workers=DEFAULT_RENDER_WORKERS, render_timeout=RENDER_TIMEOUT,
+                 max_render_bytes=MAX_RENDER_BYTES):
+        self.records = records
+        self.page_size = page_size
+        self.ids = list(records)
+        self.summaries = [self._summary(pattern_id, records[pattern_id]) for pattern_id in self.ids]
+        self.resources = {pattern_id: Resource.json(record) for pattern_id, record in records.items()}
+        self.tag_index = {}
+        for position, pattern_id in enumerate(self.ids):
+            for tag in {normalize_tag(tag) for tag in records[pattern_id].get("tags", [])}:
+                self.tag_index.setdefault(tag, []).append(position)
+        self.tags = Resource.json({tag: len(positions) for tag, positions in sorted(self.tag_index.items())})
+        self.cache = LRUCache(cache_entries)
+        self.pages = [self._page(list(range(len(self.ids))), page, page_size, None)
+                      for page in range(1, self._page_count(len(self.ids), page_size) + 1)]
+        self.render_workers = render_workers
+        self.render_timeout = render_timeout
+        self.max_render_bytes = max_render_bytes
+        self.executor = self._new_executor()
+        self.pending = {}
+
+    @classmethod
+    def from_catalogs(cls, paths, **kwargs):
+        """Load raw catalog entries, keyed catalog:id, from catalog files"""
+        records = {}
+        for path, catalog_key in zip(paths, catalog_keys(paths)):
+            source, entries = load_catalog(path)
+            for index, entry in enumerate(entries):
+                normalized = normalize_entry(entry, source, index)
+                pattern_id = f"{catalog_key}:{normalized['id']}"
+                records[pattern_id] = {**entry, "id": normalized["id"], "source": normalized["source"],
+                                       "catalog": catalog_key}
+        return cls(records, **kwargs)
+
+    @staticmethod
+    def _summary(pattern_id, record):
+        return {"id": pattern_id, "name": record.get("name", ""), "tags": record.get("tags", []),
+                "source": record.get("source", ""), "mode": record.get("mode")}
+
+    @staticmethod
+    def _page_count(total, per_page):
+        return max(1, -(-total // per_page))
+
+    def _page(self, positions, page, per_page, tag):
+        start = (page - 1) * per_page
+        body = {"page": page, "per_page": per_page, "total": len(positions),
+                "pages": self._page_count(len(positions), per_page),
+                "patterns": [self.summaries[i] for i in positions[start:start + per_page]]}
+        if tag is not None:
+            body["tag"] = tag
+        return Resource.json(body)
+
+    def listing(self, page, per_page, tag):
+        """Return the listing page resource, building and caching it on first use"""
+        if tag is None and per_page == self.page_size and page <= len(self.pages):
+            return self.pages[page - 1]
+        key = ("page", page, per_page, tag)
+        resource = self.cache.get(key)
+        if resource is None:
+            positions = self.tag_index.get(tag, []) if tag is not None else range(len(self.ids))
+            resource = self._page(list(positions), page, per_page, tag)
+            self.cache.put(key, resource)
+        return resource
+
+    def _new_executor(self):
+        # Spawn, not fork: a forked worker would inherit open client sockets and
+        # keep those connections from closing. Workers start with the first job.
+        return ProcessPoolExecutor(self.render_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    async def start(self):
+        """Start the render workers so the first render does not pay for process startup"""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, int)
+                               for _ in range(self.render_workers)))
+
+    async def render(self, pattern_id, width, height, scale, color, stroke_width):
+        """Return the composed canvas SVG resource, building and caching it on first use.
+
+        Concurrent requests for the same render share one job.
+        """
+        key = ("render", pattern_id, width, height, scale, color, stroke_width)
+        resource = self.cache.get(key)
+        if resource is not None:
+            return resource
+        job = self.pending.get(key)
+        if job is None:
+            record = self.records[pattern_id]
+            pattern = normalize_entry(record, record.get("source", ""), 0)
+            call = functools.partial(compose, pattern, width, height, scale, color, stroke_width)
+            job = asyncio.ensure_future(self._render(key, call))
+            self.pending[key] = job
+            job.add_done_callback(lambda _: self.pending.pop(key, None))
+        try:
+            # Shielded: a timeout or disconnect must not cancel a job others wait on
+            return await asyncio.wait_for(asyncio.shield(job), self.render_timeout)
+        except asyncio.TimeoutError:
+            return _error(503, f"render took longer than {self.render_timeout:g}s, retry later")
+
+    async def _render(self, key, call):
+        """Run one render in the pool and cache its response.
+
+        Parse errors and oversized renders are cached like successes since
+        they would fail the same way again; other failures may be transient
+        and are not cached.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            svg = await loop.run_in_executor(self.executor, call)
+        except ParseError as exc:
+            resource = _error(500, f"could not parse pattern: {exc}")
+        except BrokenProcessPool:
+            # A worker died (killed, out of memory); replace the pool and let the client retry
+            self.executor = self._new_executor()
+            return _error(500, "render worker crashed")
+        except Exception as exc:
+            return _error(500, f"render failed: {type(exc).__name__}: {exc}")
+        else:
+            if len(svg) > self.max_render_bytes:
+                resource = _error(500, f"render exceeds {self.max_render_bytes} bytes")
+            else:
+                resource = Resource(svg, SVG_TYPE)
+        self.cache.put(key, resource)
+        return resource
+
+    def close(self):
+        """Stop the render workers without waiting for running renders"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _int_param(query, name, default, low, high):
+    value = query.get(name, [None])[0]
+    if value is None:
+        return default
+    number = int(value)
+    if not low <= number <= high:
+        raise ValueError(f"{name} must be between {low} and {high}")
+    return number
+
+
+def _float_param(query, name, default, low, high):
+    value = query.get(name, [None])[0]
+    if value is None:
+        return default
+    number = float(value)
+    if not low <= number <= high:
+        raise ValueError(f"{name} must be between {low:g} and {high:g}")
+    return number
+
+
+async def route(store, target):
+    """Return the resource for a request target"""
+    url = urlsplit(target)
+    path = unquote(url.path).rstrip("/")
+    query = parse_qs(url.query) if url.query else {}
+    try:
+        if path == "/patterns":
+            tag = query.get("tag", [None])[0]
+            per_page = _int_param(query, "per_page", store.page_size, 1, MAX_PAGE_SIZE)
+            page = _int_param(query, "page", 1, 1, 1 << 30)
+            return store.listing(page, per_page, normalize_tag(tag) if tag is not None else None)
+        if path == "/tags":
+            return store.tags
+        if path.startswith("/patterns/"):
+            pattern_id = path[len("/patterns/"):]
+            if pattern_id.endswith("/render"):
+                pattern_id = pattern_id[:-len("/render")]
+                if pattern_id not in store.records:
+                    return NOT_FOUND
+                return await store.render(
+                    pattern_id,
+                    _float_param(query, "width", 1920, 1, MAX_CANVAS),
+                    _float_param(query, "height", 1080, 1, MAX_CANVAS),
+                    _float_param(query, "scale", 1.0, 0.01, 100),
+                    query.get("color", [None])[0],
+                    _float_param(query, "stroke_width", None, 0, 100),
+                )
+            return store.resources.get(pattern_id, NOT_FOUND)
+    except ValueError as exc:
+        return _error(400, str(exc))
+    return NOT_FOUND
+
+
+async def handle_connection(store, reader, writer):
+    """Serve keep-alive HTTP/1.1 requests on one connection"""
+    try:
+        while True:
+            try:
+                raw = await reader.readuntil(b"\r\n\r\n")
+            except asyncio.LimitOverrunError:
+                writer.write(b"".join(_error(431, "request headers too large").head_and_body(None)))
+                break
+            except (asyncio.IncompleteReadError, ConnectionError):
+                break
+            lines = raw.decode("latin-1").split("\r\n")
+            parts = lines[0].split(" ")
+            if len(parts) != 3:
+                break
+            method, target, version = parts
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                if name:
+                    headers[name.strip().lower()] = value.strip()
+
+            if method not in ("GET", "HEAD"):
+                resource = METHOD_NOT_ALLOWED
+            else:
+                try:
+                    resource = await route(store, target)
+                except Exception:
+                    resource = INTERNAL_ERROR
+            encoding = resource.encoding(headers.get("accept-encoding"))
+            etag = resource.etags[encoding]
+            if resource.status == 200 and etag_matches(headers.get("if-none-match"), etag):
+                writer.write(NOT_MODIFIED_HEAD + f"ETag: {etag}\r\n\r\n".encode("latin-1"))
+            else:
+                head, body = resource.heads[encoding], resource.bodies[encoding]
+                writer.write(head if method == "HEAD" else head + body)
+            await writer.drain()
+
+            connection = headers.get("connection", "").lower()
+            if connection == "close" or (version == "HTTP/1.0" and connection != "keep-alive"):
+                break
+    finally:
+        writer.close()
+
+
+async def serve(store, host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None):
+    """Run the HTTP server until cancelled; ``ready`` is called with the bound port"""
+    await store.start()
+    server = await asyncio.start_server(lambda r, w: handle_connection(store, r, w),
+                                        host, port, limit=MAX_HEADER_BYTES)
+    async with server:
+        if ready is not None:
+            ready(server.sockets[0].getsockname()[1])
+        await server.serve_forever()
+
+
+async def _serve_until_stopped(store, host, port, ready):
+    """Run serve() with SIGTERM cancelling it the way Ctrl+C does"""
+    task = asyncio.current_task()
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+    except NotImplementedError:
+        pass  # no signal handlers on Windows event loops
+    await serve(store, host, port, ready)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve pattern catalogs over HTTP")
+    parser.add_argument("catalogs", nargs="*",
+                        help="catalog files to serve (default: public/ and the svgbackgrounds output)")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument("--cache-entries", type=int, default=DEFAULT_CACHE_ENTRIES,
+                        help="filtered pages and renders kept in memory")
+    parser.add_argument("--render-workers", type=int, default=DEFAULT_RENDER_WORKERS,
+                        help="processes that compose canvas renders")
+    parser.add_argument("--render-timeout", type=float, default=RENDER_TIMEOUT,
+                        help="seconds before a render is answered with 503")
+    args = parser.parse_args()
+
+    store = PatternStore.from_catalogs(args.catalogs or default_catalog_paths(),
+                                       page_size=args.page_size, cache_entries=args.cache_entries,
+                                       render_workers=args.render_workers,
+                                       render_timeout=args.render_timeout)
+    encodings = ", ".join(store.tags.bodies)
+
+    def ready(port):
+        print(f"Serving {len(store.ids)} patterns ({encodings}) on http://{args.host}:{port}", flush=True)
+
+    try:
+        asyncio.run(_serve_until_stopped(store, args.host, args.port, ready))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    finally:
+        # Without this the render workers outlive the server
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Single-pass streaming SVG reader.
+
+Walks an SVG document once with incremental (iterparse) parsing and yields
+typed element records, clearing each element as soon as it has been handled
+so memory stays bounded on multi-megabyte inputs.
+"""
+
+import io
+import os
+import re
+import xml.etree.ElementTree as ET
+
+# Bump whenever the shape of extracted records changes so caches keyed on
+# extractor output are invalidated.
+EXTRACTOR_VERSION = "3"
+
+SHAPE_TAGS = ("path", "rect", "circle", "ellipse", "line", "polyline", "polygon")
+GRADIENT_TAGS = ("linearGradient", "radialGradient")
+RECORD_TAGS = SHAPE_TAGS + GRADIENT_TAGS + ("svg", "g")
+
+# Presentation attributes a <g> passes down to the shapes it contains
+INHERITED_ATTRS = (
+    "fill", "fill-opacity", "fill-rule",
+    "stroke", "stroke-width", "stroke-opacity",
+    "stroke-linecap", "stroke-linejoin", "stroke-dasharray",
+    "opacity",
+)
+
+XLINK_NS = "{http://www.w3.org/1999/xlink}"
+
+_NUMBER_RE = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+
+def _local_name(name):
+    """Strip the namespace from an ElementTree tag or attribute name"""
+    if name.startswith(XLINK_NS):
+        return "xlink:" + name[len(XLINK_NS):]
+    if name.startswith("{"):
+        return name.split("}", 1)[1]
+    return name
+
+
+def _open_source(source):
+    """Return (stream, should_close) for SVG text, a path or a file object"""
+    if hasattr(source, "read"):
+        return source, False
+    if isinstance(source, os.PathLike) or (
+        isinstance(source, str) and "<" not in source and os.path.exists(source)
+    ):
+        return open(source, "rb"), True
+    if isinstance(source, bytes):
+        return io.BytesIO(source), True
+    return io.StringIO(source), True
+
+
+def parse_number(value, default=None):
+    """Parse a length such as "100", "-2.5" or "40px"; None if not numeric"""
+    if value is None:
+        return default
+    value = value.strip()
+    if value.endswith("%"):
+        return default
+    match = _NUMBER_RE.match(value)
+    if not match:
+        return default
+    number = float(match.group(0))
+    return int(number) if number.is_integer() else number
+
+
+def parse_viewbox(value):
+    """Parse a viewBox into [min_x, min_y, width, height], or None"""
+    if not value:
+        return None
+    numbers = [float(n) for n in _NUMBER_RE.findall(value)]
+    if len(numbers) != 4:
+        return None
+    return [int(n) if n.is_integer() else n for n in numbers]
+
+
+def iter_svg_elements(source):
+    """Yield one record per svg, g, shape and gradient element in document order.
+
+    Each record is a dict with ``type``, ``attrs`` (the element's own
+    attributes), ``inherited`` (presentation attributes from enclosing
+    groups), ``depth`` and ``in_defs``. Shapes inside a <pattern> tile are
+    drawn content, so they do not count as being in <defs>. Gradient records
+    also carry their ``stops``. Shapes are yielded when their start tag is
+    read; gradients once all of their stops have been seen.
+    """
+    stream, should_close = _open_source(source)
+    stack = []
+    inherited_stack = [{}]
+    defs_depth = 0
+    pattern_depth = 0
+    gradient = None
+    try:
+        for event, elem in ET.iterparse(stream, events=("start", "end")):
+            tag = _local_name(elem.tag)
+            if event == "start":
+                attrs = {_local_name(k): v for k, v in elem.attrib.items()}
+                inherited = inherited_stack[-1]
+                record = None
+                if tag in RECORD_TAGS:
+                    record = {
+                        "type": tag,
+                        "attrs": attrs,
+                        "inherited": inherited,
+                        "depth": len(stack),
+                        "in_defs": defs_depth > 0 and pattern_depth == 0,
+                    }
+                if tag == "defs":
+                    defs_depth += 1
+                elif tag == "pattern":
+                    pattern_depth += 1
+                if tag == "g":
+                    own = {k: attrs[k] for k in INHERITED_ATTRS if k in attrs}
+                    inherited_stack.append({**inherited, **own} if own else inherited)
+                else:
+                    inherited_stack.append(inherited)
+                stack.append(elem)
+
+                if tag in GRADIENT_TAGS:
+                    record["stops"] = []
+                    gradient = record
+                elif tag == "stop" and gradient is not None:
+                    gradient["stops"].append(attrs)
+                elif record is not None:
+                    yield record
+            else:
+                stack.pop()
+                inherited_stack.pop()
+                if tag == "defs":
+                    defs_depth -= 1
+                elif tag == "pattern":
+                    pattern_depth -= 1
+                if tag in GRADIENT_TAGS and gradient is not None:
+                    yield gradient
+                    gradient = None
+                # Drop the finished subtree so the tree never grows
+                elem.clear()
+                if stack:
+                    stack[-1].remove(elem)
+    finally:
+        if should_close:
+            stream.close()
+
+
+def _quote(value):
+    """Escape an attribute value for double-quoted output"""
+    return (value.replace("&", "&amp;").replace("<", "&lt;")
+            .replace('"', "&quot;"))
+
+
+def element_to_svg(record, include_inherited=True):
+    """Serialize a shape record back to a standalone SVG tag"""
+    attrs = dict(record["inherited"]) if include_inherited else {}
+    attrs.update(record["attrs"])
+    body = " ".join(f'{name}="{_quote(value)}"' for name, value in attrs.items())
+    return f"<{record['type']} {body}/>" if body else f"<{record['type']}/>"
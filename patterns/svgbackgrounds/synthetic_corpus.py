@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Seeded synthetic pattern corpora for benchmarks.
+
+Every document is derived from (seed, index) alone, so a corpus of any size
+can be regenerated identically, or sliced, without building the rest.
+"""
+
+import random
+
+SHAPES_PER_PATTERN = (4, 24)
+PALETTE = ("#FF4500", "#FFA500", "#FFD700", "#4169E1", "#8A2BE2", "#32CD32",
+           "rgba(255,255,255,0.3)", "rgba(0,0,0,0.2)")
+TAG_POOL = ("geometric", "abstract", "organic", "grid", "waves", "dots",
+            "triangles", "chevron", "gradient", "stripes", "network", "blue")
+
+
+def _shape(rng):
+    """Return one random shape tag inside a 100x100 tile"""
+    kind = rng.randrange(4)
+    fill = rng.choice(PALETTE)
+    if kind == 0:
+        return (f'<rect x="{rng.randint(0, 90)}" y="{rng.randint(0, 90)}" '
+                f'width="{rng.randint(2, 30)}" height="{rng.randint(2, 30)}" fill="{fill}"/>')
+    if kind == 1:
+        return (f'<circle cx="{rng.randint(0, 100)}" cy="{rng.randint(0, 100)}" '
+                f'r="{rng.uniform(0.5, 10):.2f}" fill="{fill}"/>')
+    if kind == 2:
+        return (f'<line x1="{rng.randint(0, 100)}" y1="{rng.randint(0, 100)}" '
+                f'x2="{rng.randint(0, 100)}" y2="{rng.randint(0, 100)}" stroke="{fill}"/>')
+    points = " L".join(f"{rng.uniform(0, 100):.1f},{rng.uniform(0, 100):.1f}"
+                       for _ in range(rng.randint(3, 8)))
+    return f'<path d="M{points} Z" fill="{fill}"/>'
+
+
+def synthetic_svg(seed, index):
+    """Return the SVG document for pattern index of the corpus seeded with seed"""
+    rng = random.Random(seed * 1_000_003 + index)
+    shapes = "".join(_shape(rng) for _ in range(rng.randint(*SHAPES_PER_PATTERN)))
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100" '
+            f'width="100" height="100"><rect width="100" height="100" '
+            f'fill="{rng.choice(PALETTE)}"/><g opacity="0.8">{shapes}</g></svg>')
+
+
+def synthetic_metadata(seed, index):
+    """Return catalog metadata for pattern index of the corpus"""
+    rng = random.Random(seed * 1_000_003 + index + 0x5EED)
+    return {
+        "name": f"Synthetic Pattern {index}",
+        "description": "Seeded synthetic pattern used for benchmarking",
+        "tags": rng.sample(TAG_POOL, 3),
+        "source": "synthetic",
+    }
+
+
+def iter_synthetic(count, seed=0):
+    """Yield (pattern_id, metadata, svg_content) for a corpus of count patterns"""
+    for index in range(count):
+        yield (f"synthetic-{index}", synthetic_metadata(seed, index),
+               synthetic_svg(seed, index))
@@ -0,0 +1,56 @@
+"""Round-trip tests for the binary pattern store."""
+
+import json
+
+from binary_store import ELEMENT, RAW_ELEMENT, BinaryCatalog, decode_markup, encode_markup, pack
+
+MARKUPS = (
+    "<path d='M0 0h10v-2.5l.25-.125a1 1 0 00-.294 1.5Z' stroke-width='1.50'/>",
+    "<circle cx='-.5' cy='12.000' r='3' fill='#0a0'/>",
+    '<rect x="0" y="0" width="100%" height="1e2"/>',
+    "<path d='M-0 0L1 1'/>",
+    "<polygon points='1,2 3,4 007,8'/>",
+)
+
+
+def _raw_count(catalog):
+    return sum(1 for e in range(catalog.element_count)
+               if ELEMENT.unpack_from(catalog.data, catalog.elements_off + e * ELEMENT.size)[2] == RAW_ELEMENT)
+
+
+def test_markup_round_trips_or_is_rejected():
+    for markup in MARKUPS:
+        encoded = encode_markup(markup)
+        if encoded is not None:
+            assert decode_markup(*encoded) == markup
+    # Compact arc flags and leading zeros split into numbers rather than going raw
+    assert encode_markup(MARKUPS[0]) is not None
+    assert encode_markup(MARKUPS[4]) is not None
+    # -0 cannot be told apart from 0 and is stored raw
+    assert encode_markup(MARKUPS[3]) is None
+
+
+def test_catalog_round_trip(tmp_path):
+    patterns = [{"id": f"p{i}", "name": f"P {i}", "width": 10 + i, "svgPath": list(MARKUPS[:i + 1])}
+                for i in range(len(MARKUPS))]
+    patterns.append({"name": "Image Only", "image": "<svg><path d='M1 1'/></svg>"})
+    patterns.append({"name": "No Geometry"})
+    metadata = {"metadata": {"source": "test"}, "patterns": None}
+    path = tmp_path / "catalog.svgpb"
+    path.write_bytes(pack(patterns, metadata))
+    with BinaryCatalog.open(str(path)) as catalog:
+        assert len(catalog) == len(patterns)
+        assert catalog.to_json_data() == {"metadata": {"source": "test"}, "patterns": patterns}
+        assert catalog.get("p2") == patterns[2]
+        assert catalog.get("image-only") == patterns[5]
+        assert catalog.get("missing") is None
+        assert _raw_count(catalog) == sum(
+            1 for pattern in patterns for markup in pattern.get("svgPath", [])
+            if encode_markup(markup) is None)
+
+
+def test_bare_list_round_trip():
+    patterns = [{"id": "a", "svgPath": MARKUPS[1]}, {"id": "b", "svgPath": ""}]
+    catalog = BinaryCatalog(pack(patterns))
+    assert json.dumps(catalog.to_json_data()) == json.dumps(patterns)
+    catalog.close()
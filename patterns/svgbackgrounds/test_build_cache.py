@@ -0,0 +1,26 @@
+"""Tests for the incremental build cache's up-to-date check."""
+
+from build_cache import generate_keys, is_up_to_date, write_catalog
+
+CREATORS = {"dots": {"name": "Dots", "svg_func": lambda: "<svg/>"}}
+
+
+def test_format_change_makes_output_stale(tmp_path):
+    output, cache_dir = str(tmp_path / "catalog.json"), str(tmp_path / "cache")
+    builds = generate_keys(CREATORS)
+    patterns = [{"id": "dots"}]
+    assert not is_up_to_date(builds, output, cache_dir, "json")
+    assert write_catalog(patterns, builds, output, cache_dir, "json")
+    assert is_up_to_date(builds, output, cache_dir, "json")
+    assert not is_up_to_date(builds, output, cache_dir, "ndjson")
+    assert write_catalog(patterns, builds, output, cache_dir, "ndjson")
+    assert is_up_to_date(builds, output, cache_dir, "ndjson")
+
+
+def test_changed_output_file_is_stale(tmp_path):
+    output, cache_dir = str(tmp_path / "catalog.json"), str(tmp_path / "cache")
+    builds = generate_keys(CREATORS)
+    write_catalog([{"id": "dots"}], builds, output, cache_dir)
+    with open(output, "a") as f:
+        f.write(" ")
+    assert not is_up_to_date(builds, output, cache_dir)
@@ -0,0 +1,70 @@
+"""Tests for the streaming catalog readers and writers, mostly at small read sizes."""
+
+import io
+import json
+
+from catalog_io import FORMATS, iter_json_catalog, write_patterns
+
+DOCUMENTS = (
+    '{"patterns": [1.5e3, -2]}',
+    '[1.5e-3, {"width": 2.25E+2, "tags": ["a", "b"]}, -0.5, true, null, "q\\"uote", 100]',
+    '{"metadata": {"count": 12345}, "patterns": [123456789, {"opacity": 0.000001}], "extra": 7}',
+    '[ 7 ]',
+    '[]',
+    '{}',
+)
+
+
+def _expected(document):
+    data = json.loads(document)
+    return data.get("patterns", []) if isinstance(data, dict) else data
+
+
+def test_numbers_split_across_reads():
+    for document in DOCUMENTS:
+        for read_size in range(1, 12):
+            patterns = list(iter_json_catalog(io.StringIO(document), read_size))
+            assert patterns == _expected(document), (document, read_size)
+
+
+def test_shipped_layout_at_small_reads():
+    patterns = [{"id": f"p{i}", "width": 40 + i / 8, "svgPath": "<path d='M0 0h1e2'/>"}
+                for i in range(20)]
+    document = json.dumps(patterns, indent=2)
+    for read_size in (1, 3, 7, 64):
+        assert list(iter_json_catalog(io.StringIO(document), read_size)) == patterns
+
+
+class _CountingReader(io.StringIO):
+    reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return super().read(size)
+
+
+def test_containers_split_across_reads():
+    document = json.dumps([{"svg": "a\\\"]}{[" * 5, "nested": [[1, "x,y"], {"z": "\\\\"}]}, "s\"q", [], {}])
+    for read_size in range(1, 12):
+        assert list(iter_json_catalog(io.StringIO(document), read_size)) == json.loads(document)
+
+
+def test_long_value_takes_few_reads():
+    document = json.dumps([{"svg": "<path d='" + "M0 0L1 1 " * 100000 + "'/>"}])
+    f = _CountingReader(document)
+    assert list(iter_json_catalog(f, 64)) == json.loads(document)
+    assert f.reads < 40
+
+
+def test_writers_flush():
+    class Sink(io.StringIO):
+        flushed = False
+
+        def flush(self):
+            self.flushed = True
+            super().flush()
+
+    for fmt in FORMATS:
+        sink = Sink()
+        write_patterns([{"id": "a"}], sink, fmt)
+        assert sink.flushed, fmt
@@ -0,0 +1,46 @@
+"""Tests for the tiling compositor."""
+
+import xml.etree.ElementTree as ET
+
+from catalogs import normalize_entry
+from compositor import MAX_WRAP_TILES, compose, wrap_offsets
+
+SVG_NS = "{http://www.w3.org/2000/svg}"
+XLINK_HREF = "{http://www.w3.org/1999/xlink}href"
+
+
+def _record(entry):
+    return normalize_entry(entry, "test", 0)
+
+
+def test_composes_normalized_image_records():
+    record = _record({"name": "Plain", "image": "<svg xmlns='http://www.w3.org/2000/svg' width='20' "
+                                                "height='10'><rect width='5' height='5'/></svg>"})
+    root = ET.fromstring(compose(record, 100, 50))
+    pattern = root.find(f"{SVG_NS}defs/{SVG_NS}pattern")
+    assert (pattern.get("width"), pattern.get("height")) == ("20", "10")
+
+
+def test_added_ids_do_not_clash_with_tile_ids():
+    record = _record({"id": "waves", "width": 10, "height": 10, "svgPath":
+                      "<path id='waves-tile' d='M-2 5H12' stroke='red'/><path d='M-2 8H12'/>"})
+    root = ET.fromstring(compose(record, 40, 40))
+    ids = [elem.get("id") for elem in root.iter() if elem.get("id")]
+    assert len(ids) == len(set(ids))
+    pattern_id = root.find(f"{SVG_NS}defs/{SVG_NS}pattern").get("id")
+    assert pattern_id.startswith("waves-tile") and pattern_id != "waves-tile"
+    uses = root.findall(f".//{SVG_NS}use")
+    assert uses and all(use.get("href") == use.get(XLINK_HREF) for use in uses)
+    assert {use.get("href")[1:] for use in uses} <= set(ids)
+
+
+def test_stroke_mode_paint():
+    record = _record({"id": "lines", "width": 10, "height": 10, "mode": "stroke",
+                      "svgPath": "<path d='M0 5H10'/>"})
+    svg = compose(record, 20, 20)
+    assert "fill='none'" in svg and "stroke='black'" in svg and "stroke-width='2'" in svg
+
+
+def test_wrap_offsets_are_bounded():
+    assert wrap_offsets((-1, 2, 3, 4), 10, 10) == [(10, 0)]
+    assert len(wrap_offsets((-1e9, -1e9, 1e9, 1e9), 10, 10)) == (2 * MAX_WRAP_TILES + 1) ** 2 - 1
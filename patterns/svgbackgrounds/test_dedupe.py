@@ -0,0 +1,47 @@
+"""Tests for exact and near-duplicate clustering."""
+
+from catalogs import normalize_entry
+from dedupe import find_duplicates, merge_entries
+
+SQUARES = "".join(f"<rect x='{x}' y='{x}' width='3' height='3'/>" for x in range(0, 40, 4))
+
+
+def _entry(index, svg, **fields):
+    entry = {"id": f"p{index}", "svgPath": svg, "tags": [f"t{index}"], **fields}
+    return {"key": f"c:p{index}", "catalog": "c", "source": "c", "entry": entry,
+            "record": normalize_entry(entry, "c", index)}
+
+
+ENTRIES = [
+    _entry(0, SQUARES),
+    # The same squares written with different number formatting, and as relative paths
+    _entry(1, SQUARES.replace("x='0'", "x='0.0'")),
+    _entry(2, "".join(f"<path d='M{x} {x}h3v3h-3z'/>" for x in range(0, 40, 4))),
+    # Same markup, but drawn as outlines or on a larger tile
+    _entry(3, SQUARES, mode="stroke"),
+    _entry(4, SQUARES, width=200),
+    # One square moved
+    _entry(5, SQUARES.replace("<rect x='36' y='36'", "<rect x='37' y='36'")),
+    _entry(6, "<circle cx='1' cy='1' r='1'/>"),
+]
+
+
+def test_exact_duplicates_respect_mode_and_size():
+    exact, _, failures = find_duplicates(ENTRIES, threshold=1.0)
+    assert exact == [[0, 1, 2]] and failures == []
+
+
+def test_near_duplicate_threshold():
+    _, near, _ = find_duplicates(ENTRIES, threshold=0.8)
+    (members, score), = near
+    assert members == [0, 1, 2, 5] and 0.8 <= score < 0.95
+    assert find_duplicates(ENTRIES, threshold=0.95)[1] == []
+
+
+def test_merge_keeps_the_first_entry_with_aliases():
+    exact, _, _ = find_duplicates(ENTRIES)
+    merged = merge_entries(ENTRIES, exact)
+    assert [entry["id"] for entry in merged] == ["p0", "p3", "p4", "p5", "p6"]
+    assert merged[0]["aliases"] == ["c:p1", "c:p2"]
+    assert merged[0]["tags"] == ["t0", "t1", "t2"]
+    assert merged[0]["source"] == "c"
@@ -0,0 +1,63 @@
+"""Tests for path data compilation and sibling shape merging."""
+
+import xml.etree.ElementTree as ET
+
+from path_compiler import absolutize, compile_d, compile_svg, parse_path
+
+SVG_OPEN = '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 40 40">'
+
+
+def _shapes(svg):
+    return [elem.tag.rsplit("}", 1)[-1] for elem in ET.fromstring(svg).iter()][1:]
+
+
+def _compile(body):
+    return _shapes(compile_svg(SVG_OPEN + body + "</svg>"))
+
+
+def test_disjoint_shapes_merge():
+    assert _compile('<rect x="0" y="0" width="4" height="4"/>'
+                    '<rect x="10" y="0" width="4" height="4"/>') == ["path"]
+
+
+def test_overlapping_shapes_stay_apart():
+    assert _compile('<rect x="0" y="0" width="4" height="4" fill-opacity=".5"/>'
+                    '<rect x="2" y="0" width="4" height="4" fill-opacity=".5"/>') == ["rect", "rect"]
+
+
+def test_own_stroke_pads_the_box():
+    assert _compile('<rect x="0" y="0" width="4" height="4" stroke="red" stroke-width="6"/>'
+                    '<rect x="8" y="0" width="4" height="4" stroke="red" stroke-width="6"/>') == ["rect", "rect"]
+
+
+def test_inherited_stroke_pads_the_box():
+    assert _compile('<g stroke="rgba(0,0,0,.5)" stroke-width="6">'
+                    '<rect x="0" y="0" width="4" height="4"/><rect x="8" y="0" width="4" height="4"/>'
+                    '</g>') == ["g", "rect", "rect"]
+    # The width may come from one ancestor and the paint from another
+    assert _compile('<g stroke-width="6"><g stroke="red">'
+                    '<rect x="0" y="0" width="4" height="4"/><rect x="8" y="0" width="4" height="4"/>'
+                    '</g></g>') == ["g", "g", "rect", "rect"]
+
+
+def test_style_stroke_pads_the_box():
+    assert _compile('<g style="stroke: red; stroke-width: 6">'
+                    '<rect x="0" y="0" width="4" height="4"/><rect x="8" y="0" width="4" height="4"/>'
+                    '</g>') == ["g", "rect", "rect"]
+    assert _compile('<rect x="0" y="0" width="4" height="4" style="stroke:red;stroke-width:6"/>'
+                    '<rect x="8" y="0" width="4" height="4" style="stroke:red;stroke-width:6"/>') == ["rect", "rect"]
+
+
+def test_stroke_none_below_a_stroked_group_merges():
+    assert _compile('<g stroke="red" stroke-width="6">'
+                    '<rect x="0" y="0" width="4" height="4" stroke="none"/>'
+                    '<rect x="8" y="0" width="4" height="4" stroke="none"/></g>') == ["g", "path"]
+
+
+def test_compiled_path_stays_within_precision():
+    d = "M10.123,20.456 C 15,25 20,25 25.5,20 S 35,15 40,20 L40,40 H10 V20.456 Z m5,5 a3,3 0 1,0 6,0"
+    original = absolutize(parse_path(d))
+    compiled = absolutize(parse_path(compile_d(d, precision=2)))
+    assert [cmd for cmd, _ in compiled] == [cmd for cmd, _ in original]
+    for (_, a), (_, b) in zip(original, compiled):
+        assert all(abs(x - y) <= 0.005 + 1e-9 for x, y in zip(a, b))
@@ -0,0 +1,44 @@
+"""Tests for tag and name lookups in the pattern index."""
+
+from pattern_index import PatternIndex
+
+RECORDS = [
+    ("a", {"id": "waves", "name": "Ocean Waves", "tags": ["Waves", " waves ", "Blue"]}),
+    ("a", {"id": "wavy", "name": "Wavy Lines", "tags": ["wavy", "lines"]}),
+    ("b", {"id": "dots", "name": "Polka Dots 2", "tags": ["dots", "wave￠"]}),
+    ("b", {"id": "plain", "name": "Plain", "tags": []}),
+]
+
+
+def test_tags_are_normalized_once_per_pattern():
+    index = PatternIndex.build(RECORDS)
+    assert index.patterns[0]["tags"] == ["waves", "blue"]
+    assert index.exact("WAVES") == [0]
+    assert index.ids(index.exact("dots")) == ["b:dots"]
+
+
+def test_prefix_search():
+    index = PatternIndex.build(RECORDS)
+    assert index.prefix("wav") == [0, 1, 2]
+    assert index.prefix("wave") == [0, 2]  # "wavy" sorts after the range
+    assert index.prefix("Wa", "tokens") == [0, 1]
+    assert index.prefix("x") == []
+    assert index.prefix("") == [0, 1, 2]
+
+
+def test_fuzzy_and_combined_search():
+    index = PatternIndex.build(RECORDS)
+    assert index.fuzzy_terms("wavs") == ["waves", "wavy"]
+    assert index.search(tags=["waves"], name="ocean") == [0]
+    assert index.search(tags=["wave"], fuzzy=True) == [0, 1, 2]
+    assert index.search(tags=["waves"], name="dots") == []
+    assert index.search() == []
+
+
+def test_save_and_load(tmp_path):
+    index = PatternIndex.build(RECORDS)
+    path = str(tmp_path / "index.json")
+    index.save(path)
+    loaded = PatternIndex.load(path)
+    assert loaded.to_dict() == index.to_dict()
+    assert loaded.prefix("wav") == index.prefix("wav")
@@ -0,0 +1,70 @@
+"""Tests for seam scoring and the validator's exit status."""
+
+import json
+import sys
+
+import pytest
+
+from catalogs import generator_sources
+from seams import main, seam_score
+
+STRIPE = "<rect x='-2' y='5' width='24' height='4' fill='#000'/>"
+BROKEN = ("<rect x='-2' y='5' width='12' height='4' fill='#000'/>"
+          "<rect x='10' y='11' width='12' height='4' fill='#000'/>")
+DOT = "<circle cx='10' cy='10' r='3' fill='#000'/>"
+
+
+def _tile(body):
+    return ("<svg xmlns='http://www.w3.org/2000/svg' width='20' height='20' viewBox='0 0 20 20'>"
+            + body + "</svg>")
+
+
+def test_geometry_crossing_an_edge_is_scored():
+    seamless = seam_score(_tile(STRIPE))
+    assert seamless["score"] == 1.0 and seamless["x"]["covered"] == 8.0
+    assert seamless["y"]["score"] is None  # nothing crosses the top or bottom edge
+    broken = seam_score(_tile(BROKEN))
+    assert broken["score"] == 0.0 and broken["x"]["mismatched"] == 8.0
+
+
+def test_paint_must_match_across_the_seam():
+    recoloured = STRIPE.replace("width='24'", "width='12'") + \
+        "<rect x='10' y='5' width='12' height='4' fill='#f00'/>"
+    assert seam_score(_tile(recoloured))["score"] == 0.0
+
+
+def test_nothing_crossing_the_edges_is_unscored():
+    report = seam_score(_tile(DOT))
+    assert report["score"] is None and report["x"]["covered"] == 0.0
+    # The generators draw inside the tile, so none of them can be scored
+    from create_svg_patterns import PATTERN_CREATORS
+    (_, svg, mode), = generator_sources({"zig-zag-chevron": PATTERN_CREATORS["zig-zag-chevron"]})
+    assert seam_score(svg, mode=mode)["score"] is None
+
+
+def test_stroke_mode_uses_the_compositor_stroke_width():
+    line = _tile("<path d='M-2 10H22'/>")
+    assert seam_score(line)["score"] is None  # no paint of its own
+    report = seam_score(line, mode="stroke")
+    # A width 2 band crossing both side edges
+    assert report["score"] == 1.0 and report["x"]["covered"] == 4.0
+
+
+def _run(monkeypatch, tmp_path, bodies, *flags):
+    path = tmp_path / "catalog.json"
+    patterns = [{"id": f"p{i}", "width": 20, "height": 20, "svgPath": body} for i, body in enumerate(bodies)]
+    path.write_text(json.dumps({"patterns": patterns}))
+    monkeypatch.setattr(sys, "argv", ["seams.py", str(path), "--workers", "1", *flags])
+    main()
+
+
+def test_cli_exit_status(monkeypatch, tmp_path, capsys):
+    _run(monkeypatch, tmp_path, [STRIPE, BROKEN])
+    assert "1 below" in capsys.readouterr().out
+    with pytest.raises(SystemExit) as exited:
+        _run(monkeypatch, tmp_path, [STRIPE, BROKEN], "--check")
+    assert exited.value.code == 1
+    with pytest.raises(SystemExit) as exited:
+        _run(monkeypatch, tmp_path, [STRIPE, DOT])
+    assert exited.value.code == 1
+    assert "UNSCORED catalog:p1" in capsys.readouterr().out
@@ -0,0 +1,107 @@
+"""Tests for the pattern server's conditional requests, encodings and render cache."""
+
+import asyncio
+import gzip
+import json
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree.ElementTree import ParseError
+
+from serve import PatternStore, etag_matches, handle_connection
+
+RECORDS = {
+    "test:dots": {"id": "dots", "name": "Dots", "tags": ["Dots"], "width": 10, "height": 10,
+                  "svgPath": "<circle cx='5' cy='5' r='2'/>"},
+}
+
+
+def _store():
+    store = PatternStore(RECORDS)
+    store.executor.shutdown()
+    store.executor = ThreadPoolExecutor(1)
+    return store
+
+
+async def _exchange(store, requests):
+    """Send raw requests over one connection; returns [(status, headers, body)]"""
+    server = await asyncio.start_server(lambda r, w: handle_connection(store, r, w), "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    responses = []
+    for request in requests:
+        writer.write(request.encode("latin-1"))
+        head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+        headers = dict(line.split(": ", 1) for line in head[1:] if line)
+        body = await reader.readexactly(int(headers.get("Content-Length", 0)))
+        responses.append((int(head[0].split(" ")[1]), headers, body))
+    writer.close()
+    server.close()
+    await server.wait_closed()
+    return responses
+
+
+def _get(path, **headers):
+    lines = [f"GET {path} HTTP/1.1", "Host: test"]
+    lines += [f"{name.replace('_', '-')}: {value}" for name, value in headers.items()]
+    return "\r\n".join(lines) + "\r\n\r\n"
+
+
+def test_etag_matching_is_exact():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('"x", W/"abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abc-gz"', '"abc"')
+    assert not etag_matches('"xabcx"', '"abc"')
+    assert not etag_matches('"ab"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_each_encoding_has_its_own_etag():
+    store = _store()
+    (status, plain, body), (_, zipped, zipped_body) = asyncio.run(_exchange(store, [
+        _get("/patterns/test:dots"), _get("/patterns/test:dots", accept_encoding="gzip")]))
+    assert status == 200 and json.loads(body)["id"] == "dots"
+    assert zipped["Content-Encoding"] == "gzip" and gzip.decompress(zipped_body) == body
+    assert plain["ETag"] != zipped["ETag"]
+    assert plain["Vary"] == zipped["Vary"] == "Accept-Encoding"
+
+
+def test_conditional_requests():
+    store = _store()
+    tag = store.resources["test:dots"].etags["identity"]
+    gz_tag = store.resources["test:dots"].etags["gzip"]
+    responses = asyncio.run(_exchange(store, [
+        _get("/patterns/test:dots", if_none_match=tag),
+        _get("/patterns/test:dots", if_none_match=f'"other", W/{tag}'),
+        _get("/patterns/test:dots", if_none_match="*"),
+        _get("/patterns/test:dots", if_none_match=gz_tag),
+        _get("/patterns/test:dots", if_none_match=gz_tag, accept_encoding="gzip"),
+        _get("/patterns/test:dots", if_none_match=tag[:-2] + '"'),
+    ]))
+    assert [status for status, _, _ in responses] == [304, 304, 304, 200, 304, 200]
+    assert responses[0][1]["ETag"] == tag and responses[4][1]["ETag"] == gz_tag
+
+
+def test_only_deterministic_render_failures_are_cached():
+    store = _store()
+
+    def flaky():
+        raise OSError("temporary")
+
+    def broken():
+        raise ParseError("bad markup")
+
+    assert asyncio.run(store._render("flaky", flaky)).status == 500
+    assert store.cache.get("flaky") is None
+    assert asyncio.run(store._render("broken", broken)).status == 500
+    assert store.cache.get("broken") is not None
+    store.max_render_bytes = 10
+    assert asyncio.run(store._render("large", lambda: "x" * 11)).status == 500
+    assert store.cache.get("large") is not None
+
+
+def test_render_endpoint():
+    store = _store()
+    (status, headers, body), = asyncio.run(_exchange(store, [
+        _get("/patterns/test:dots/render?width=30&height=20")]))
+    assert status == 200 and headers["Content-Type"] == "image/svg+xml"
+    assert b"<pattern" in body and b"width='30'" in body
@@ -0,0 +1,37 @@
+"""Golden tests: every preset draws the same tile as the original create_* function."""
+
+import os
+import re
+import xml.etree.ElementTree as ET
+
+from tile_presets import PRESETS, render_preset
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "testdata", "presets")
+_NUMBER_RE = re.compile(r"-?(?:\d+\.?\d*|\.\d+)")
+
+
+def _canonical(svg):
+    """Return [(tag, attrs)] in document order, with numbers and separators normalized"""
+    elements = []
+    for elem in ET.fromstring(svg).iter():
+        attrs = {}
+        for name, value in elem.attrib.items():
+            value = " ".join(value.replace(",", " ").split())
+            attrs[name] = _NUMBER_RE.sub(lambda m: repr(float(m.group())), value)
+        elements.append((elem.tag.rsplit("}", 1)[-1], attrs))
+    return elements
+
+
+def test_presets_match_golden_svgs():
+    assert sorted(PRESETS) == sorted(name[:-4] for name in os.listdir(GOLDEN_DIR))
+    for pattern_id in PRESETS:
+        with open(os.path.join(GOLDEN_DIR, f"{pattern_id}.svg")) as f:
+            golden = _canonical(f.read())
+        assert _canonical(render_preset(pattern_id)) == golden, pattern_id
+
+
+def test_overrides_change_geometry():
+    denser = render_preset("radiant-grid", step=10)
+    assert denser.count("<circle") > render_preset("radiant-grid").count("<circle")
+    assert render_preset("wintery-sunburst", count=12).count("<path") == 12
+    assert "L40,40" in render_preset("large-triangles", hub=(40, 40))
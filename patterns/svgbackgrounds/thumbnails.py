@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Thumbnail build stage: rasterize catalog patterns to fixed-size PNGs.
+
+Thumbnails are keyed by the hash of the pattern's SVG, its catalog paint
+mode and the thumbnail size, and kept in a size-bounded on-disk LRU cache,
+so only new or changed patterns are rasterized. Misses are rendered across a
+process pool. The stage can publish one sprite sheet per size (PNG plus a
+JSON map of pattern id to offset); an unchanged catalog is detected from the
+sheet's manifest and costs no rendering or image work at all.
+
+Usage:
+    python thumbnails.py                                  # svgbackgrounds generators
+    python thumbnails.py ../../public/svelte_patterns.json --sizes 64 128
+    python thumbnails.py --catalogs --out-dir thumbs --max-cache-mb 64
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from catalogs import catalog_sources, default_catalog_paths, generator_sources
+from raster import decode_png, encode_png, rasterize
+
+RASTER_VERSION = "2"
+DEFAULT_SIZES = (64, 128)
+DEFAULT_EXTENT = 200.0
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "thumbnails")
+DEFAULT_OUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "thumbnails")
+DEFAULT_MAX_CACHE_BYTES = 256 << 20
+DEFAULT_CHUNK_SIZE = 16
+
+
+def pattern_hash(svg):
+    """Hash a pattern's SVG document"""
+    return hashlib.sha256(svg.encode()).hexdigest()
+
+
+def thumbnail_key(svg_hash, size, extent=DEFAULT_EXTENT, mode=None):
+    """Cache key for one pattern at one thumbnail size"""
+    return hashlib.sha256(f"{RASTER_VERSION}:{svg_hash}:{size}:{extent}:{mode}".encode()).hexdigest()
+
+
+class ThumbnailCache:
+    """Size-bounded LRU cache of PNG thumbnails on disk.
+
+    Entries live at ``cache_dir/key[:2]/key.png``; recency and sizes are kept
+    in ``lru.json``. ``save()`` evicts least recently used entries until the
+    cache fits in ``max_bytes`` and writes the index back; eviction waits
+    until then so nothing a running build still needs disappears under it.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, "lru.json")
+        self.entries = OrderedDict()
+        try:
+            with open(self.index_path) as f:
+                self.entries.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+        self.total = sum(self.entries.values())
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".png")
+
+    def get(self, key):
+        """Return cached PNG bytes for key, or None"""
+        if key not in self.entries:
+            return None
+        try:
+            with open(self._path(key), 'rb') as f:
+                data = f.read()
+        except OSError:
+            self.total -= self.entries.pop(key)
+            return None
+        self.entries.move_to_end(key)
+        return data
+
+    def put(self, key, data):
+        """Store PNG bytes for key"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+        if key in self.entries:
+            self.total -= self.entries.pop(key)
+        self.entries[key] = len(data)
+        self.total += len(data)
+
+    def touch(self, key):
+        """Mark key as recently used"""
+        self.entries.move_to_end(key)
+
+    def save(self):
+        """Evict down to max_bytes and write the recency index"""
+        while self.total > self.max_bytes and self.entries:
+            old_key, size = self.entries.popitem(last=False)
+            self.total -= size
+            try:
+                os.remove(self._path(old_key))
+            except OSError:
+                pass
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self.index_path, 'w') as f:
+            json.dump(self.entries, f)
+
+
+# Rendering
+
+def _render_chunk(jobs):
+    """Render (key, svg, size, extent, mode) jobs to PNG bytes; returns [(key, png, error)]"""
+    results = []
+    for key, svg, size, extent, mode in jobs:
+        try:
+            results.append((key, encode_png(size, size, rasterize(svg, size, extent, mode)), None))
+        except Exception as exc:
+            results.append((key, None, f"{type(exc).__name__}: {exc}"))
+    return results
+
+
+def render_missing(jobs, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Render jobs, in order, across a process pool (``workers=1`` renders in-process)"""
+    workers = workers or os.cpu_count() or 1
+    chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+    if workers == 1:
+        chunk_results = map(_render_chunk, chunks)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunk_results = list(executor.map(_render_chunk, chunks))
+    return [result for results in chunk_results for result in results]
+
+
+def build_thumbnails(sources, sizes=DEFAULT_SIZES, cache=None, extent=DEFAULT_EXTENT, workers=None):
+    """Return ({size: [(id, key)]}, {size: {key: png}}, stats, failures).
+
+    Cached thumbnails are not loaded here; only misses are rendered, stored
+    in the cache and returned in the png map.
+    """
+    cache = cache or ThumbnailCache()
+    hashes = [(pattern_id, svg, mode, pattern_hash(svg)) for pattern_id, svg, mode in sources]
+    keyed = {size: [(pattern_id, thumbnail_key(h, size, extent, mode))
+                    for pattern_id, _, mode, h in hashes]
+             for size in sizes}
+    jobs = []
+    queued = set()
+    for size in sizes:
+        for (pattern_id, svg, mode, _), (_, key) in zip(hashes, keyed[size]):
+            if key in cache.entries:
+                cache.touch(key)
+            elif key not in queued:
+                jobs.append((key, svg, size, extent, mode))
+                queued.add(key)
+
+    rendered = {size: {} for size in sizes}
+    failures = []
+    job_sizes = {job[0]: job[2] for job in jobs}
+    for key, png, error in render_missing(jobs, workers):
+        if error is None:
+            cache.put(key, png)
+            rendered[job_sizes[key]][key] = png
+        else:
+            failures.append({"key": key, "size": job_sizes[key], "error": error})
+    stats = {"hits": len(hashes) * len(sizes) - len(jobs), "misses": len(jobs)}
+    return keyed, rendered, stats, failures
+
+
+def write_sprite_sheet(entries, size, out_dir, cache, rendered=None):
+    """Pack thumbnails into <out_dir>/sprites-<size>.png plus a JSON map.
+
+    Returns True if the sheet was (re)written, False if it was already current.
+    """
+    sheet_path = os.path.join(out_dir, f"sprites-{size}.png")
+    map_path = os.path.join(out_dir, f"sprites-{size}.json")
+    digest = hashlib.sha256("\n".join(f"{pattern_id} {key}" for pattern_id, key in entries)
+                            .encode()).hexdigest()
+    try:
+        with open(map_path) as f:
+            if json.load(f).get("digest") == digest and os.path.exists(sheet_path):
+                return False
+    except (OSError, ValueError):
+        pass
+
+    columns = max(1, math.ceil(math.sqrt(len(entries))))
+    rows = max(1, math.ceil(len(entries) / columns))
+    stride = columns * size * 4
+    sheet = bytearray(stride * rows * size)
+    sprites = {}
+    for index, (pattern_id, key) in enumerate(entries):
+        png = (rendered or {}).get(key) or cache.get(key)
+        if png is None:
+            continue
+        _, _, pixels = decode_png(png)
+        x, y = (index % columns) * size, (index // columns) * size
+        for row in range(size):
+            start = (y + row) * stride + x * 4
+            sheet[start:start + size * 4] = pixels[row * size * 4:(row + 1) * size * 4]
+        sprites[pattern_id] = [x, y, size, size]
+
+    os.makedirs(out_dir, exist_ok=True)
+    with open(sheet_path, 'wb') as f:
+        f.write(encode_png(columns * size, rows * size, bytes(sheet)))
+    with open(map_path, 'w') as f:
+        json.dump({"digest": digest, "size": size, "image": os.path.basename(sheet_path),
+                   "sprites": sprites}, f, indent=2)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rasterize pattern thumbnails and sprite sheets")
+    parser.add_argument("inputs", nargs="*", help="catalog files to rasterize")
+    parser.add_argument("--catalogs", action="store_true",
+                        help="rasterize the catalogs in public/ and the svgbackgrounds output")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--extent", type=float, default=DEFAULT_EXTENT,
+                        help="user units of pattern shown across a thumbnail")
+    parser.add_argument("--out-dir", default=DEFAULT_OUT_DIR)
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--max-cache-mb", type=float, default=DEFAULT_MAX_CACHE_BYTES / (1 << 20))
+    parser.add_argument("--workers", type=int, help="render processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    if args.inputs or args.catalogs:
+        sources = catalog_sources(args.inputs or default_catalog_paths())
+    else:
+        sources = generator_sources()
+
+    cache = ThumbnailCache(args.cache_dir, int(args.max_cache_mb * (1 << 20)))
+    keyed, rendered, stats, failures = build_thumbnails(sources, args.sizes, cache,
+                                                        args.extent, args.workers)
+    for size in args.sizes:
+        written = write_sprite_sheet(keyed[size], size, args.out_dir, cache, rendered[size])
+        print(f"{size}px: sprite sheet {'written' if written else 'unchanged'}")
+    cache.save()
+    for failure in failures:
+        print(f"Failed {failure['size']}px thumbnail {failure['key']}: {failure['error']}")
+    print(f"{len(sources)} patterns, {stats['hits']} cached, {stats['misses']} rendered")
+
+
+if __name__ == "__main__":
+    main()
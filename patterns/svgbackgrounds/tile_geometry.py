@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Parametric geometry for procedural tiles.
+
+Coordinates are computed as flat lists of numbers for whole layers at once
+(grids, lattices, chevrons, triangle tilings, rays, node networks) and
+serialized to SVG in bulk: one format template per layer, joined in a single
+pass, rather than formatting element by element.
+"""
+
+import math
+import random
+
+
+def fmt(value):
+    """Format a coordinate compactly: integers without a point, else <= 3 decimals"""
+    if value == int(value):
+        return str(int(value))
+    return f"{value:.3f}".rstrip("0").rstrip(".")
+
+
+def fmt_all(values):
+    """Format a sequence of coordinates, formatting each distinct value once"""
+    memo = {}
+    out = []
+    for value in values:
+        text = memo.get(value)
+        if text is None:
+            text = memo[value] = fmt(value)
+        out.append(text)
+    return out
+
+
+# Point sets
+
+def lattice(x0, y0, cols, rows, dx, dy, row_shift=(0,)):
+    """Return row-major [(x, y)] points of a cols x rows lattice.
+
+    ``row_shift`` is cycled over the rows and added to x, which gives
+    staggered (brick, hex, wave) lattices.
+    """
+    shifts = [row_shift[r % len(row_shift)] for r in range(rows)]
+    return [(x0 + c * dx + shifts[r], y0 + r * dy)
+            for r in range(rows) for c in range(cols)]
+
+
+def grid_lines(width, height, step, include_edges=False):
+    """Return [(x1, y1, x2, y2)] vertical then horizontal grid lines"""
+    start = 0 if include_edges else step
+    xs = _steps(start, width, step, include_edges)
+    ys = _steps(start, height, step, include_edges)
+    return ([(x, 0, x, height) for x in xs] +
+            [(0, y, width, y) for y in ys])
+
+
+def _steps(start, stop, step, inclusive):
+    """Return start, start + step, ... up to stop"""
+    count = int(math.floor((stop - start) / step + 1e-9)) + (1 if inclusive else 0)
+    values = [start + i * step for i in range(count)]
+    return [v for v in values if v < stop or (inclusive and v <= stop)]
+
+
+def chevron_rows(x0, y0, segments, dx, amplitude, rows, row_step):
+    """Return one zig-zag polyline per row, alternating y and y - amplitude"""
+    offsets = [(x0 + i * dx, -amplitude * (i % 2)) for i in range(segments + 1)]
+    return [[(x, y0 + r * row_step + dy) for x, dy in offsets] for r in range(rows)]
+
+
+def rays(cx, cy, count, length, spread, start_angle=-90.0):
+    """Return triangular rays around (cx, cy) as [[(x, y), ...]] polygons.
+
+    Each ray is a wedge from the centre of angular width ``spread`` degrees.
+    """
+    polygons = []
+    for i in range(count):
+        a = math.radians(start_angle + i * 360.0 / count)
+        b = a + math.radians(spread)
+        polygons.append([
+            (cx, cy),
+            (cx + length * math.cos(a), cy + length * math.sin(a)),
+            (cx + length * math.cos(b), cy + length * math.sin(b)),
+        ])
+    return polygons
+
+
+def triangle_tiling(x0, y0, cols, rows, side, height, row_step=None):
+    """Return down-pointing triangles on a cols x rows lattice"""
+    row_step = height if row_step is None else row_step
+    return [[(x, y), (x + side, y), (x + side / 2, y + height)]
+            for x, y in lattice(x0, y0, cols, rows, side, row_step)]
+
+
+def radii(start, step, count):
+    """Return count evenly spaced radii"""
+    return [start + i * step for i in range(count)]
+
+
+def random_network(count, width, height, neighbours=2, seed=0, margin=5):
+    """Return (nodes, edges) for a seeded random node network.
+
+    Each node is linked to its nearest ``neighbours``; duplicate edges are
+    dropped. Nodes are bucketed into a grid so the neighbour search only
+    looks at nearby cells.
+    """
+    rng = random.Random(seed)
+    nodes = [(round(rng.uniform(margin, width - margin), 2),
+              round(rng.uniform(margin, height - margin), 2)) for _ in range(count)]
+    cell = max(width, height) / max(1, int(math.sqrt(count)))
+    buckets = {}
+    for i, (x, y) in enumerate(nodes):
+        buckets.setdefault((int(x // cell), int(y // cell)), []).append(i)
+    max_ring = int(max(width, height) // cell) + 1
+
+    edges = set()
+    for i, (x, y) in enumerate(nodes):
+        bx, by = int(x // cell), int(y // cell)
+        candidates = []
+        for ring in range(max_ring + 1):
+            for gx in range(bx - ring, bx + ring + 1):
+                for gy in range(by - ring, by + ring + 1):
+                    if max(abs(gx - bx), abs(gy - by)) != ring:
+                        continue
+                    for j in buckets.get((gx, gy), ()):
+                        if j != i:
+                            candidates.append(((nodes[j][0] - x) ** 2 + (nodes[j][1] - y) ** 2, j))
+            # Anything outside this ring is at least ring * cell away
+            if len(candidates) >= neighbours:
+                candidates.sort()
+                if candidates[neighbours - 1][0] <= (ring * cell) ** 2:
+                    break
+        candidates.sort()
+        edges.update((min(i, j), max(i, j)) for _, j in candidates[:neighbours])
+    return nodes, sorted(edges)
+
+
+def translate_template(template, points):
+    """Place a path template at each point; returns one command list per point.
+
+    ``template`` is a parsed path (see parse_template) whose coordinates are
+    relative to the placement point.
+    """
+    placed = []
+    for px, py in points:
+        placed.append([
+            (cmd, [c + (py if i % 2 else px) for i, c in enumerate(coords)])
+            for cmd, coords in template
+        ])
+    return placed
+
+
+def parse_template(d):
+    """Parse absolute path data made of x,y pairs into [(cmd, [coords])]"""
+    commands = []
+    for token in d.replace(",", " ").split():
+        if token[0].isalpha():
+            commands.append((token[0], []))
+            token = token[1:]
+        if token:
+            commands[-1][1].append(float(token))
+    return commands
+
+
+# Serialization
+
+def commands_to_d(commands):
+    """Serialize [(cmd, [coords])] as path data in "M20,30 Q30,10 40,25" form"""
+    parts = []
+    for cmd, coords in commands:
+        values = fmt_all(coords)
+        pairs = " ".join(",".join(values[i:i + 2]) for i in range(0, len(values), 2))
+        parts.append(cmd + pairs)
+    return " ".join(parts)
+
+
+def polylines_d(polylines, closed=False):
+    """Serialize polylines as "M x,y L x,y ..." path data, one string each.
+
+    All coordinates are formatted in a single pass.
+    """
+    flat = fmt_all(v for points in polylines for point in points for v in point)
+    tail = " Z" if closed else ""
+    out = []
+    pos = 0
+    for points in polylines:
+        end = pos + 2 * len(points)
+        xs, ys = flat[pos:end:2], flat[pos + 1:end:2]
+        out.append("M" + " L".join([f"{x},{y}" for x, y in zip(xs, ys)]) + tail)
+        pos = end
+    return out
+
+
+def polyline_d(points, closed=False):
+    """Serialize one polyline as path data"""
+    return polylines_d([points], closed)[0]
+
+
+def merged_polyline_d(polylines, closed=False):
+    """Serialize many polylines as one path's data"""
+    return " ".join(polylines_d(polylines, closed))
+
+
+def elements(tag, columns, rows, attrs=None, cycle=None):
+    """Serialize one element per row with a single shared template.
+
+    ``columns`` names the attributes taken from each row, ``attrs`` are
+    constant attributes for every element and ``cycle`` maps an attribute
+    name to values cycled over the rows (e.g. alternating fills).
+    """
+    attrs = attrs or {}
+    cycle = cycle or {}
+    names = list(columns) + list(cycle)
+    constant = "".join(f' {k}="{v}"' for k, v in attrs.items())
+    template = f"<{tag} " + " ".join(f'{name}="{{{i}}}"' for i, name in enumerate(names))
+    template += constant + "/>"
+    count = len(rows)
+    if not names:
+        return [template] * count
+    width = len(columns)
+    flat = fmt_all(v for row in rows for v in row)
+    # One list per attribute: formatted columns, then cycled values
+    fields = [flat[i::width] for i in range(width)]
+    fields += [(values * (count // len(values) + 1))[:count] for values in cycle.values()]
+    return [template.format(*row) for row in zip(*fields)]
+
+
+def paths(ds, attrs=None, cycle=None):
+    """Serialize path data strings as <path> elements"""
+    return elements("path", [], [[]] * len(ds), attrs,
+                    {"d": ds, **(cycle or {})})
+
+
+def group(children, attrs=None):
+    """Wrap serialized elements in a <g> with shared presentation attributes"""
+    attrs = attrs or {}
+    open_tag = "<g" + "".join(f' {k}="{v}"' for k, v in attrs.items()) + ">"
+    return "\n".join([open_tag, *("    " + child for child in children), "</g>"])
+
+
+def gradient(kind, gradient_id, stops, r="50%"):
+    """Serialize a linear (top-left to bottom-right) or radial gradient"""
+    if kind == "radial":
+        open_tag = f'<radialGradient id="{gradient_id}" cx="50%" cy="50%" r="{r}">'
+        close_tag = "</radialGradient>"
+    else:
+        open_tag = f'<linearGradient id="{gradient_id}" x1="0%" y1="0%" x2="100%" y2="100%">'
+        close_tag = "</linearGradient>"
+    body = [f'    <stop offset="{offset}" style="stop-color:{color};stop-opacity:1" />'
+            for offset, color in stops]
+    return "\n".join([open_tag, *body, close_tag])
+
+
+def svg_document(width, height, body, defs=()):
+    """Assemble a tile document from serialized defs and body markup"""
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {fmt(width)} {fmt(height)}" '
+             f'width="{fmt(width)}" height="{fmt(height)}">']
+    if defs:
+        parts.append("<defs>")
+        parts.extend(defs)
+        parts.append("</defs>")
+    parts.extend(body)
+    parts.append("</svg>")
+    return "\n".join(parts)
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+The svgbackgrounds patterns as parameter presets of the tile geometry engine.
+
+Each family function draws one kind of tile from its parameters; PRESETS
+pins the parameters that reproduce the original twelve patterns. Any
+parameter can be overridden to generate the same design at another size or
+density, e.g. ``render_preset("radiant-grid", size=400, step=10)``.
+"""
+
+import tile_geometry as tg
+
+
+def _background(size, fill):
+    """Return the full-tile background rect"""
+    return f'<rect width="{tg.fmt(size)}" height="{tg.fmt(size)}" fill="{fill}"/>'
+
+
+def _gradient_layers(size, gradient):
+    """Return (defs, background) for a (kind, id, stops[, r]) gradient spec"""
+    kind, gradient_id, stops, *rest = gradient
+    defs = [tg.gradient(kind, gradient_id, stops, *rest)]
+    return defs, _background(size, f"url(#{gradient_id})")
+
+
+# Families
+
+def motif_tile(size, gradient, motif, points, fills):
+    """A path motif placed at each point (organic blobs)"""
+    defs, background = _gradient_layers(size, gradient)
+    placed = tg.translate_template(tg.parse_template(motif), points)
+    blobs = tg.paths([tg.commands_to_d(commands) for commands in placed],
+                     cycle={"fill": fills})
+    return tg.svg_document(size, size, [background, *blobs], defs)
+
+
+def cell_grid(size, background, origin, cols, rows, step, cell, fills, stroke, stroke_width):
+    """A lattice of square cells with cycling fills"""
+    x0, y0 = origin
+    rects = tg.elements(
+        "rect", ["x", "y", "width", "height"],
+        [(x, y, cell, cell) for x, y in tg.lattice(x0, y0, cols, rows, step, step)],
+        cycle={"fill": fills, "stroke": [stroke], "stroke-width": [stroke_width]},
+    )
+    return tg.svg_document(size, size, [_background(size, background), *rects])
+
+
+def sunburst(size, gradient, center, rays, fills, opacity, count=None, length=40, spread=8):
+    """Wedge rays radiating from a centre point.
+
+    ``rays`` lists each wedge as (tip, barb) offsets: the tip from the
+    centre, the barb from the tip. Pass ``count`` to space that many rays of
+    ``length`` and ``spread`` degrees evenly instead.
+    """
+    defs, background = _gradient_layers(size, gradient)
+    cx, cy = center
+    if count is not None:
+        polygons = tg.rays(cx, cy, count, length, spread)
+    else:
+        polygons = [[(cx, cy), (cx + tx, cy + ty), (cx + tx + bx, cy + ty + by)]
+                    for (tx, ty), (bx, by) in rays]
+    wedges = tg.polylines_d(polygons, closed=True)
+    layer = tg.group(tg.paths(wedges, cycle={"fill": fills}), {"opacity": opacity})
+    return tg.svg_document(size, size, [background, layer], defs)
+
+
+def triangle_rows(size, gradient, origin, cols, rows, side, height, row_step, fills, opacity):
+    """Rows of down-pointing triangles with alternating fills"""
+    defs, background = _gradient_layers(size, gradient)
+    triangles = tg.triangle_tiling(*origin, cols, rows, side, height, row_step)
+    layer = tg.group(tg.paths(tg.polylines_d(triangles, closed=True),
+                              cycle={"fill": fills}), {"opacity": opacity})
+    return tg.svg_document(size, size, [background, layer], defs)
+
+
+def concentric(size, gradient, center, ring_start, ring_step, rings, stroke, stroke_width):
+    """Concentric rings over a radial gradient"""
+    defs, background = _gradient_layers(size, gradient)
+    cx, cy = center
+    circles = tg.elements(
+        "circle", ["cx", "cy", "r"],
+        [(cx, cy, r) for r in tg.radii(ring_start, ring_step, rings)],
+        {"fill": "none", "stroke": stroke, "stroke-width": stroke_width},
+    )
+    return tg.svg_document(size, size, [background, *circles], defs)
+
+
+def stripes(size, gradient, start, step, count, thickness, fills, opacity):
+    """Full-width horizontal stripes with cycling fills"""
+    defs, background = _gradient_layers(size, gradient)
+    bands = tg.elements("rect", ["x", "y", "width", "height"],
+                        [(0, start + i * step, size, thickness) for i in range(count)],
+                        cycle={"fill": fills})
+    return tg.svg_document(size, size, [background, tg.group(bands, {"opacity": opacity})], defs)
+
+
+def fingerprint(size, gradient, wave, origin, rows, row_step, row_shift, wave_stroke,
+                center, ring_start, ring_step, rings, ring_stroke):
+    """Staggered wave strokes over concentric rings"""
+    defs, background = _gradient_layers(size, gradient)
+    points = tg.lattice(*origin, 1, rows, 0, row_step, row_shift)
+    placed = tg.translate_template(tg.parse_template(wave), points)
+    waves = tg.group(tg.paths([tg.commands_to_d(c) for c in placed]),
+                     {"stroke": wave_stroke, "stroke-width": "1", "fill": "none"})
+    cx, cy = center
+    circles = tg.elements("circle", ["cx", "cy", "r"],
+                          [(cx, cy, r) for r in tg.radii(ring_start, ring_step, rings)])
+    ring_layer = tg.group(circles, {"stroke": ring_stroke, "stroke-width": "0.5", "fill": "none"})
+    return tg.svg_document(size, size, [background, waves, ring_layer], defs)
+
+
+def node_grid(size, gradient, step, line_stroke, node_radius, node_fill):
+    """Grid lines with a node at every interior intersection"""
+    defs, background = _gradient_layers(size, gradient)
+    lines = tg.elements("line", ["x1", "y1", "x2", "y2"], tg.grid_lines(size, size, step))
+    positions = [line[0] for line in tg.grid_lines(size, size, step) if line[1] == 0]
+    nodes = tg.elements("circle", ["cx", "cy", "r"],
+                        [(x, y, node_radius) for y in positions for x in positions])
+    return tg.svg_document(size, size, [
+        background,
+        tg.group(lines, {"stroke": line_stroke, "stroke-width": "0.5"}),
+        tg.group(nodes, {"fill": node_fill}),
+    ], defs)
+
+
+def network(size, gradient, nodes, edges, node_radii, line_stroke, node_fill,
+            count=None, neighbours=2, seed=0):
+    """A node network; pass ``count`` to generate a seeded random one instead"""
+    defs, background = _gradient_layers(size, gradient)
+    if count is not None:
+        nodes, edges = tg.random_network(count, size, size, neighbours, seed)
+    lines = tg.elements("line", ["x1", "y1", "x2", "y2"],
+                        [(*nodes[a], *nodes[b]) for a, b in edges])
+    circles = tg.elements("circle", ["cx", "cy", "r"],
+                          [(x, y, node_radii[i % len(node_radii)])
+                           for i, (x, y) in enumerate(nodes)])
+    return tg.svg_document(size, size, [
+        background,
+        tg.group(lines, {"stroke": line_stroke, "stroke-width": "0.5"}),
+        tg.group(circles, {"fill": node_fill}),
+    ], defs)
+
+
+def chevrons(size, gradient, origin, segments, dx, amplitude, rows, row_step,
+             stroke, stroke_width, blocks=None):
+    """Zig-zag chevron strokes, optionally over a lattice of translucent blocks"""
+    defs, background = _gradient_layers(size, gradient)
+    lines = tg.chevron_rows(*origin, segments, dx, amplitude, rows, row_step)
+    body = [background, tg.group(tg.paths(tg.polylines_d(lines)),
+                                 {"stroke": stroke, "stroke-width": stroke_width, "fill": "none"})]
+    if blocks:
+        (bx, by), cols, block_rows, (step_x, step_y), (width, height), fill = blocks
+        rects = tg.elements("rect", ["x", "y", "width", "height"],
+                            [(x, y, width, height)
+                             for x, y in tg.lattice(bx, by, cols, block_rows, step_x, step_y)])
+        body.append(tg.group(rects, {"fill": fill}))
+    return tg.svg_document(size, size, body, defs)
+
+
+def triangle_fan(size, gradient, hub, fan, fan_fill, motif, origin, cols, rows, step, motif_fill):
+    """Large triangles fanned around a hub, with a lattice of small motifs.
+
+    ``fan`` lists the large triangles' vertices with None standing for the hub.
+    """
+    defs, background = _gradient_layers(size, gradient)
+    fan = tg.polylines_d([[hub if point is None else point for point in triangle]
+                          for triangle in fan], closed=True)
+    placed = tg.translate_template(tg.parse_template(motif),
+                                   tg.lattice(*origin, cols, rows, *step))
+    return tg.svg_document(size, size, [
+        background,
+        tg.group(tg.paths(fan), {"fill": fan_fill}),
+        tg.group(tg.paths([tg.commands_to_d(c) for c in placed]), {"fill": motif_fill}),
+    ], defs)
+
+
+def _white(alpha):
+    return f"rgba(255,255,255,{alpha})"
+
+
+PRESETS = {
+    "liquid-cheese": (motif_tile, {
+        "size": 100,
+        "gradient": ("linear", "cheeseGradient",
+                     [("0%", "#FFD700"), ("50%", "#FFA500"), ("100%", "#FF8C00")]),
+        "motif": "M0,0 Q10,-20 20,-5 T40,0 T60,-5 Q70,5 65,20 T40,25 T15,20 Q5,10 10,0 Z",
+        "points": [(20, 30), (10, 70)],
+        "fills": [_white(0.3), _white(0.2)],
+    }),
+    "protruding-squares": (cell_grid, {
+        "size": 100, "background": "#FF4500",
+        "origin": (10, 10), "cols": 3, "rows": 3, "step": 30, "cell": 25,
+        "fills": ["#FFA500", "#FFD700", "#FFA500", "#FF8C00"],
+        "stroke": "#FF6347", "stroke_width": "2",
+    }),
+    "wintery-sunburst": (sunburst, {
+        "size": 100,
+        "gradient": ("linear", "sunburst",
+                     [("0%", "#87CEEB"), ("50%", "#B0E0E6"), ("100%", "#E0F6FF")]),
+        "center": (50, 50),
+        "rays": [((0, -40), (5, 5)), ((-40, 0), (5, 5)), ((40, 0), (-5, 5)), ((0, 40), (-5, -5)),
+                 ((-25, -25), (5, 5)), ((25, -25), (-5, 5)), ((-25, 25), (5, -5)),
+                 ((25, 25), (-5, -5))],
+        "fills": [_white(0.4), _white(0.3), _white(0.3), _white(0.4)] + [_white(0.2)] * 4,
+        "opacity": "0.6",
+    }),
+    "subtle-triangles": (triangle_rows, {
+        "size": 100,
+        "gradient": ("linear", "triangleGradient", [("0%", "#E6E6FA"), ("100%", "#DDA0DD")]),
+        "origin": (20, 20), "cols": 3, "rows": 3, "side": 20, "height": 14.6, "row_step": 20,
+        "fills": ["rgba(138,43,226,0.3)", "rgba(75,0,130,0.3)"],
+        "opacity": "0.3",
+    }),
+    "bullseye-gradient": (concentric, {
+        "size": 100,
+        "gradient": ("radial", "bullseye",
+                     [("0%", "#FF0000"), ("25%", "#FFFFFF"), ("50%", "#FF0000"),
+                      ("75%", "#FFFFFF"), ("100%", "#FF0000")]),
+        "center": (50, 50), "ring_start": 15, "ring_step": 15, "rings": 3,
+        "stroke": "#8B0000", "stroke_width": "2",
+    }),
+    "spectrum-gradient": (stripes, {
+        "size": 100,
+        "gradient": ("linear", "spectrum",
+                     [("0%", "#FF0000"), ("16.66%", "#FF8000"), ("33.33%", "#FFFF00"),
+                      ("50%", "#00FF00"), ("66.66%", "#0080FF"), ("83.33%", "#8000FF"),
+                      ("100%", "#FF0000")]),
+        "start": 10, "step": 15, "count": 6, "thickness": 5,
+        "fills": [_white(0.5), _white(0.3)], "opacity": "0.3",
+    }),
+    "wavey-fingerprint": (fingerprint, {
+        "size": 100,
+        "gradient": ("linear", "fingerprint", [("0%", "#4B0082"), ("100%", "#8A2BE2")]),
+        "wave": "M0,0 Q20,-20 40,-10 T80,0",
+        "origin": (10, 30), "rows": 6, "row_step": 10, "row_shift": (0, -5, 5),
+        "wave_stroke": _white(0.4),
+        "center": (50, 50), "ring_start": 15, "ring_step": 10, "rings": 4,
+        "ring_stroke": _white(0.2),
+    }),
+    "radiant-grid": (node_grid, {
+        "size": 100,
+        "gradient": ("radial", "radiant",
+                     [("0%", "#FF4500"), ("30%", "#FFA500"), ("60%", "#FFD700"),
+                      ("100%", "#FF6347")], "70%"),
+        "step": 20, "line_stroke": _white(0.3), "node_radius": 2, "node_fill": _white(0.6),
+    }),
+    "constellation": (network, {
+        "size": 100,
+        "gradient": ("linear", "constellation",
+                     [("0%", "#4B0082"), ("50%", "#6A0DAD"), ("100%", "#8A2BE2")]),
+        "nodes": [(20, 20), (30, 50), (50, 30), (60, 60), (20, 70), (70, 20),
+                  (80, 70), (70, 80), (40, 80), (80, 40), (80, 90)],
+        "edges": [(0, 2), (0, 1), (2, 5), (2, 3), (1, 3), (1, 4),
+                  (3, 6), (3, 7), (4, 8), (5, 9), (7, 10)],
+        "node_radii": [2, 1.5, 2, 2, 1.5, 2, 1.5, 2, 1, 1, 1.5],
+        "line_stroke": _white(0.3), "node_fill": _white(0.8),
+    }),
+    "zig-zag-chevron": (chevrons, {
+        "size": 100,
+        "gradient": ("linear", "chevron", [("0%", "#000080"), ("100%", "#4169E1")]),
+        "origin": (10, 20), "segments": 4, "dx": 20, "amplitude": 10,
+        "rows": 4, "row_step": 20, "stroke": _white(0.8), "stroke_width": "3",
+    }),
+    "lime-chevron": (chevrons, {
+        "size": 100,
+        "gradient": ("linear", "limeChevron", [("0%", "#32CD32"), ("100%", "#228B22")]),
+        "origin": (10, 15), "segments": 4, "dx": 20, "amplitude": 10,
+        "rows": 4, "row_step": 20, "stroke": _white(0.9), "stroke_width": "4",
+        "blocks": ((5, 10), 3, 2, (30, 20), (25, 20), _white(0.2)),
+    }),
+    "large-triangles": (triangle_fan, {
+        "size": 100,
+        "gradient": ("linear", "triangles", [("0%", "#0000CD"), ("100%", "#4169E1")]),
+        "hub": (50, 30),
+        "fan": [[(0, 0), None, (0, 60)], [None, (100, 0), (100, 60)],
+                [(0, 60), None, (0, 100)], [(100, 60), None, (100, 100)]],
+        "fan_fill": _white(0.3),
+        "motif": "M0,0 L25,15 L0,30 Z", "origin": (15, 15), "cols": 2, "rows": 2,
+        "step": (45, 40), "motif_fill": _white(0.2),
+    }),
+}
+
+
+def render_preset(pattern_id, **overrides):
+    """Render a preset tile, with any of its parameters overridden"""
+    family, params = PRESETS[pattern_id]
+    return family(**{**params, **overrides})
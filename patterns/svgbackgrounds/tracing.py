@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Opt-in span tracing for the catalog pipeline.
+
+Pipeline stages wrap their per-pattern work in ``span(stage, pattern_id)``
+and annotate it with counts (``elements``, ``bytes``, ...). Tracing is off
+by default: the module-level tracer is then a null object whose spans are
+one shared no-op context manager, so an instrumented build pays a function
+call per span and records nothing.
+
+When enabled, every span becomes a Chrome trace "complete" event (the JSON
+format chrome://tracing, Perfetto and speedscope all open), and the same
+events drive a text report of per-stage totals and the slowest and largest
+patterns. Events recorded in worker processes are returned to the parent
+and merged, keeping their own pid so each worker gets its own lane.
+
+Usage:
+    python create_svg_patterns.py --no-cache --trace build.trace.json --top 5
+    python batch_build.py ../../public/svelte_patterns.json --trace batch.trace.json
+    python tracing.py build.trace.json --top 10      # report on a saved trace
+"""
+
+import argparse
+import atexit
+import json
+import os
+import threading
+import time
+
+
+class _NullSpan:
+    """The span handed out while tracing is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class NullTracer:
+    """A tracer that records nothing"""
+
+    enabled = False
+
+    def span(self, name, pattern=None, **args):
+        return NULL_SPAN
+
+    def extend(self, events):
+        pass
+
+
+class Span:
+    """A timed region; ``set`` adds or updates its arguments"""
+
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.record(self.name, self.start, end, self.args)
+        return False
+
+    def set(self, **args):
+        self.args.update(args)
+
+
+class Tracer:
+    """Collects spans as Chrome trace events"""
+
+    enabled = True
+
+    def __init__(self):
+        self.events = []
+        self.pid = os.getpid()
+
+    def span(self, name, pattern=None, **args):
+        """Return a span for a stage, optionally tied to a pattern id"""
+        if pattern is not None:
+            args["pattern"] = pattern
+        return Span(self, name, args)
+
+    def record(self, name, start_ns, end_ns, args):
+        """Record a finished span (times from time.perf_counter_ns)"""
+        self.events.append({
+            "name": name,
+            "cat": "pattern" if "pattern" in args else "pipeline",
+            "ph": "X",
+            "ts": start_ns / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": self.pid,
+            "tid": threading.get_native_id(),
+            "args": args,
+        })
+
+    def extend(self, events):
+        """Merge events recorded by another tracer, e.g. in a worker process"""
+        self.events.extend(events)
+
+    def chrome_trace(self):
+        """Return the events as a Chrome trace document"""
+        return {"traceEvents": self.events, "displayTimeUnit": "ms"}
+
+    def write(self, path):
+        """Write the Chrome trace JSON to path"""
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+NULL_TRACER = NullTracer()
+_tracer = NULL_TRACER
+
+
+def get_tracer():
+    """Return the active tracer (NULL_TRACER while tracing is disabled)"""
+    return _tracer
+
+
+def enable(tracer=None):
+    """Start recording spans into tracer (default: a new Tracer); returns it"""
+    global _tracer
+    _tracer = Tracer() if tracer is None else tracer
+    return _tracer
+
+
+def disable():
+    """Stop recording; returns the tracer that was active"""
+    global _tracer
+    previous, _tracer = _tracer, NULL_TRACER
+    return previous
+
+
+def span(name, pattern=None, **args):
+    """Return a span on the active tracer"""
+    return _tracer.span(name, pattern, **args)
+
+
+def trace_run(trace_path=None, top=None):
+    """Enable tracing for a command-line run.
+
+    At exit the trace is written to trace_path and a report of the top
+    patterns is printed, even when the run ends through sys.exit().
+    """
+    if not trace_path and not top:
+        return None
+    tracer = enable()
+
+    def finish():
+        if trace_path:
+            tracer.write(trace_path)
+            print(f"Wrote {len(tracer.events)} trace events to {trace_path}")
+        if top:
+            print(report(tracer.events, top))
+
+    atexit.register(finish)
+    return tracer
+
+
+# Reports
+
+def stage_totals(events):
+    """Return {stage: (span count, total ms)} in first-seen order"""
+    totals = {}
+    for event in events:
+        count, total = totals.get(event["name"], (0, 0.0))
+        totals[event["name"]] = (count + 1, total + event["dur"] / 1000)
+    return totals
+
+
+def pattern_totals(events):
+    """Return {pattern id: {"ms", "stages", "elements", "bytes"}} from per-pattern spans"""
+    patterns = {}
+    for event in events:
+        args = event.get("args", {})
+        pattern = args.get("pattern")
+        if pattern is None:
+            continue
+        totals = patterns.setdefault(pattern, {"ms": 0.0, "stages": {}, "elements": 0, "bytes": 0})
+        ms = event["dur"] / 1000
+        totals["ms"] += ms
+        totals["stages"][event["name"]] = totals["stages"].get(event["name"], 0.0) + ms
+        totals["elements"] = max(totals["elements"], args.get("elements", 0))
+        totals["bytes"] += args.get("bytes", 0)
+    return patterns
+
+
+def _pattern_line(pattern, totals):
+    stages = " ".join(f"{stage} {ms:.2f}" for stage, ms in totals["stages"].items())
+    return (f"{totals['ms']:10.2f} ms {totals['bytes']:10} B {totals['elements']:6} el  "
+            f"{pattern}  ({stages})")
+
+
+def report(events, top=10):
+    """Return a text report: per-stage totals, then the slowest and largest patterns"""
+    lines = [f"{'stage':12} {'spans':>7} {'total ms':>10} {'mean ms':>8}"]
+    for stage, (count, total) in stage_totals(events).items():
+        lines.append(f"{stage:12} {count:7} {total:10.2f} {total / count:8.3f}")
+    patterns = pattern_totals(events)
+    for title, key in (("slowest", "ms"), ("largest", "bytes")):
+        ranked = sorted(patterns.items(), key=lambda item: item[1][key], reverse=True)[:top]
+        lines.append(f"\n{title} {len(ranked)} of {len(patterns)} patterns:")
+        lines.extend(_pattern_line(pattern, totals) for pattern, totals in ranked)
+    return "\n".join(lines)
+
+
+def load_events(path):
+    """Load the events of a Chrome trace file (object or bare array form)"""
+    with open(path) as f:
+        data = json.load(f)
+    events = data.get("traceEvents", []) if isinstance(data, dict) else data
+    return [event for event in events if event.get("ph") == "X"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report on a pipeline trace file")
+    parser.add_argument("trace", help="Chrome trace JSON written with --trace")
+    parser.add_argument("--top", type=int, default=10, help="patterns per ranking (default: %(default)s)")
+    args = parser.parse_args()
+    print(report(load_events(args.trace), args.top))
+
+
+if __name__ == "__main__":
+    main()